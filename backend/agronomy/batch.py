@@ -0,0 +1,237 @@
+"""
+Offline batch emergence detection for season-wide backfills.
+Reads many fields' NDVI and rainfall series from Parquet or CSV, runs primary
+emergence, tillage and rainfall-failure detection in a process pool, and writes
+one result row per field. No Flask, Earth Engine or LLM calls are involved, and
+the production spatial prior store is left alone unless --use-spatial-priors is given.
+
+Input is long format, one row per field and date:
+    field_id, date, ndvi [, cloud_percentage, field_cloud_percentage]
+    [, rainfall] [, crop, irrigated, latitude, longitude]
+Rows without ndvi are treated as rainfall-only. Rainfall may also come from a
+separate file with field_id, date, rainfall.
+
+Usage (from backend/):
+    python -m agronomy.batch season.parquet planting_dates.parquet --rainfall rain.csv --workers 8
+"""
+
+import argparse
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .emergence import (
+    detect_primary_emergence_and_planting,
+    detect_rainfall_without_emergence,
+    detect_tillage_replanting_events
+)
+from .series import UNIX_EPOCH_ORDINAL, IndexSeries, RainfallSeries
+
+logger = logging.getLogger(__name__)
+
+RESULT_COLUMNS = [
+    "field_id", "crop", "irrigated", "ndvi_points",
+    "emergence_date", "planting_window_start", "planting_window_end",
+    "rainfall_adjusted_planting", "pre_established", "confidence",
+    "detection_method", "primary_emergence", "no_planting_detected",
+    "tillage_detected", "tillage_date",
+    "rainfall_failure_detected", "rainfall_failure_date", "rainfall_failure_amount",
+    "message", "error"
+]
+
+
+def read_table(path):
+    """Read a Parquet or CSV file into a DataFrame"""
+    if path.lower().endswith((".parquet", ".pq")):
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+
+def write_table(df, path):
+    """Write a DataFrame as Parquet or CSV depending on the extension"""
+    if path.lower().endswith((".parquet", ".pq")):
+        df.to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False)
+
+
+def normalize_dates(df):
+    """Add ISO date strings and day ordinals, dropping rows with unparseable dates"""
+    parsed = pd.to_datetime(df["date"].astype(str).str[:10], format="%Y-%m-%d", errors="coerce")
+    df = df.loc[parsed.notna()].copy()
+    parsed = parsed[parsed.notna()]
+    df["date"] = parsed.dt.strftime("%Y-%m-%d")
+    df["ordinal"] = (parsed.values.astype("datetime64[D]").astype(np.int64) + UNIX_EPOCH_ORDINAL)
+    return df
+
+
+def parse_irrigated(value):
+    """Irrigation flag as the detectors expect it ("Yes"/"No")"""
+    if isinstance(value, str):
+        return "Yes" if value.strip().lower() in ("yes", "true", "1", "y") else "No"
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return "No"
+    return "Yes" if bool(value) else "No"
+
+
+def build_field_tasks(observations, rainfall=None, default_crop="Maize", force_winter_detector=False,
+                      use_spatial_priors=False):
+    """Group long-format rows into one picklable detection task per field"""
+    observations = normalize_dates(observations)
+    if "rainfall" in observations.columns:
+        inline_rainfall = observations.loc[observations["rainfall"].notna(), ["field_id", "date", "ordinal", "rainfall"]]
+        rainfall = inline_rainfall if rainfall is None else pd.concat([normalize_dates(rainfall), inline_rainfall])
+    elif rainfall is not None:
+        rainfall = normalize_dates(rainfall)
+
+    ndvi_rows = observations.loc[observations["ndvi"].notna()] if "ndvi" in observations.columns else observations.iloc[0:0]
+    ndvi_rows = ndvi_rows.sort_values(["field_id", "date"], kind="mergesort")
+    ndvi_groups = {field_id: group for field_id, group in ndvi_rows.groupby("field_id", sort=False)}
+    rain_groups = {}
+    if rainfall is not None:
+        rainfall = rainfall.loc[rainfall["rainfall"].notna()].sort_values(["field_id", "date"], kind="mergesort")
+        rain_groups = {field_id: group for field_id, group in rainfall.groupby("field_id", sort=False)}
+
+    has_field_cloud = "field_cloud_percentage" in ndvi_rows.columns
+    tasks = []
+    for field_id, group in observations.groupby("field_id", sort=False):
+        meta = group.iloc[0]
+        ndvi_group = ndvi_groups.get(field_id, ndvi_rows.iloc[0:0])
+
+        # Field-level cloud preferred, scene-level fallback, 0 when neither column exists
+        cloud = pd.Series(0.0, index=ndvi_group.index)
+        if "cloud_percentage" in ndvi_group.columns:
+            cloud = ndvi_group["cloud_percentage"].astype(float)
+        if has_field_cloud:
+            cloud = ndvi_group["field_cloud_percentage"].astype(float).fillna(cloud)
+
+        coordinates = None
+        if "latitude" in group.columns and "longitude" in group.columns and pd.notna(meta["latitude"]) and pd.notna(meta["longitude"]):
+            coordinates = [[[float(meta["longitude"]), float(meta["latitude"])]]]
+
+        rain_group = rain_groups.get(field_id)
+        tasks.append({
+            "field_id": field_id,
+            "crop": meta["crop"] if "crop" in group.columns and pd.notna(meta["crop"]) else default_crop,
+            "irrigated": parse_irrigated(meta["irrigated"]) if "irrigated" in group.columns else "No",
+            "coordinates": coordinates,
+            "force_winter_detector": force_winter_detector,
+            "use_spatial_priors": use_spatial_priors,
+            "ndvi": IndexSeries(
+                ndvi_group["date"].tolist(),
+                ndvi_group["ordinal"].to_numpy(),
+                ndvi_group["ndvi"].to_numpy(dtype=float),
+                cloud.to_numpy(dtype=float),
+                has_field_cloud=has_field_cloud and len(ndvi_group) > 0 and pd.notna(ndvi_group["field_cloud_percentage"].iloc[0])
+            ),
+            "rainfall": RainfallSeries(
+                rain_group["date"].tolist(),
+                rain_group["ordinal"].to_numpy(),
+                rain_group["rainfall"].to_numpy(dtype=float)
+            ) if rain_group is not None else None
+        })
+    return tasks
+
+
+def detect_field(task):
+    """Run all detectors for one field; never raises so one bad field does not stop the batch"""
+    result = {column: None for column in RESULT_COLUMNS}
+    result.update({
+        "field_id": task["field_id"],
+        "crop": task["crop"],
+        "irrigated": task["irrigated"],
+        "ndvi_points": len(task["ndvi"])
+    })
+    try:
+        ndvi = task["ndvi"]
+        rainfall = task["rainfall"] if task["irrigated"] == "No" and task["rainfall"] is not None and len(task["rainfall"]) else None
+
+        primary = detect_primary_emergence_and_planting(
+            ndvi, task["crop"], task["irrigated"], rainfall, task["coordinates"],
+            task["force_winter_detector"], task["use_spatial_priors"]
+        )
+        tillage = detect_tillage_replanting_events(ndvi, primary.get("emergenceDate"))
+        rainfall_failure = detect_rainfall_without_emergence(ndvi, rainfall) if rainfall is not None else None
+
+        result.update({
+            "emergence_date": primary.get("emergenceDate"),
+            "planting_window_start": primary.get("plantingWindowStart"),
+            "planting_window_end": primary.get("plantingWindowEnd"),
+            "rainfall_adjusted_planting": primary.get("rainfallAdjustedPlanting"),
+            "pre_established": primary.get("preEstablished", False),
+            "confidence": primary.get("confidence"),
+            "detection_method": primary.get("detection_method"),
+            "primary_emergence": primary.get("primary_emergence", False),
+            "no_planting_detected": primary.get("no_planting_detected", False),
+            "tillage_detected": tillage["tillage_detected"],
+            "tillage_date": tillage.get("tillage_date"),
+            "rainfall_failure_detected": bool(rainfall_failure and rainfall_failure["detected"]),
+            "rainfall_failure_date": rainfall_failure["rainfall_date"] if rainfall_failure else None,
+            "rainfall_failure_amount": rainfall_failure["rainfall_amount"] if rainfall_failure else None,
+            "message": primary.get("message")
+        })
+    except Exception as e:
+        result["error"] = str(e)
+    return result
+
+
+def detect_fields(tasks, workers=None, chunksize=64):
+    """Run detection for many fields, in a process pool unless workers == 1"""
+    if workers == 1 or len(tasks) <= 1:
+        return [detect_field(task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(detect_field, tasks, chunksize=chunksize))
+
+
+def run_batch(input_path, output_path=None, rainfall_path=None, workers=None,
+              default_crop="Maize", force_winter_detector=False, use_spatial_priors=False):
+    """
+    Detect planting dates for every field in input_path and optionally write them to
+    output_path (Parquet or CSV by extension). Returns the results as a DataFrame.
+    Spatial priors are only read and updated with use_spatial_priors=True.
+    """
+    start_time = time.perf_counter()
+    observations = read_table(input_path)
+    rainfall = read_table(rainfall_path) if rainfall_path else None
+
+    tasks = build_field_tasks(observations, rainfall, default_crop, force_winter_detector, use_spatial_priors)
+    logger.info(f"[TIMING] Loaded {len(tasks)} fields: {time.perf_counter() - start_time:.3f}s")
+
+    detect_start_time = time.perf_counter()
+    results = pd.DataFrame(detect_fields(tasks, workers), columns=RESULT_COLUMNS)
+    logger.info(f"[TIMING] Detection for {len(tasks)} fields: {time.perf_counter() - detect_start_time:.3f}s")
+
+    if output_path:
+        write_table(results, output_path)
+        logger.info(f"Wrote {len(results)} field results to {output_path}")
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch emergence and planting date detection")
+    parser.add_argument("input", help="Parquet or CSV of field_id, date, ndvi[, rainfall, crop, irrigated, ...]")
+    parser.add_argument("output", help="Result file (.parquet or .csv)")
+    parser.add_argument("--rainfall", help="Separate Parquet or CSV of field_id, date, rainfall")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Worker processes (1 = in-process)")
+    parser.add_argument("--crop", default="Maize", help="Crop for fields without a crop column value")
+    parser.add_argument("--force-winter-detector", action="store_true", help="Always use the wheat winter detector for wheat")
+    parser.add_argument("--use-spatial-priors", action="store_true",
+                        help="Read and update the shared spatial prior store (off by default for backfills)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    # Per-field detector logs are too chatty for season-wide runs
+    logging.getLogger("agronomy.emergence").setLevel(logging.WARNING)
+
+    results = run_batch(args.input, args.output, args.rainfall, args.workers, args.crop,
+                        args.force_winter_detector, args.use_spatial_priors)
+    failed = int(results["error"].notna().sum())
+    logger.info(f"Done: {len(results)} fields, {int(results['primary_emergence'].fillna(False).sum())} with emergence, {failed} errors")
+
+
+if __name__ == "__main__":
+    main()
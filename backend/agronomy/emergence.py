@@ -0,0 +1,704 @@
+"""
+Emergence, tillage and rainfall event detection on columnar index series.
+All detectors accept either a list of API points or an IndexSeries, so a
+request parses its NDVI and rainfall data once and shares the series.
+"""
+
+import logging
+from collections import deque
+from datetime import date, datetime, timedelta
+
+import geohash2
+import numpy as np
+
+from .series import as_index_series, as_rainfall_series, parse_date_ordinal
+from .spatial_priors import spatial_prior_store
+
+logger = logging.getLogger(__name__)
+
+# Define crop-specific emergence windows (in days)
+EMERGENCE_WINDOWS = {
+    "Maize": (6, 10),
+    "Soyabeans": (7, 11),
+    "Sorghum": (6, 10),
+    "Cotton": (5, 9),
+    "Groundnuts": (6, 10),
+    "Barley": (7, 11),
+    "Wheat": (3,6),
+    "Millet": (4, 8),
+    "Tobacco": (7, 11)  # For nursery emergence
+}
+
+# Constants for emergence detection (existing)
+EMERGENCE_THRESHOLD = 0.2
+DEFAULT_EMERGENCE_WINDOW = (5, 10)  # Default for unknown crops
+SIGNIFICANT_RAINFALL = 10  # mm, threshold for significant rainfall
+
+# NEW: Constants for wheat winter detection
+THRESHOLD_WHEAT_WINTER = 0.15      # lower absolute NDVI trigger
+MIN_SLOPE_DELTA = 0.04             # minimum NDVI rise
+MAX_SLOPE_DAYS = 10                # window to realize the rise
+CLOUD_CANDIDATE_MAX = 30           # % cloud cap at candidate emergence
+SMOOTH_WINDOW = 3                  # 3-point median smoothing
+NDVI_AMPLITUDE_MIN = 0.15          # geometry/season sanity check
+
+def smooth_ndvi_series(ndvi_data, window=SMOOTH_WINDOW):
+    """Apply 3-point median smoothing to NDVI series"""
+    series = as_index_series(ndvi_data)
+    if len(series) < window:
+        return series
+    return series.median_smoothed()
+
+def is_winter_season(start_date, end_date, coordinates):
+    """Check if analysis period overlaps with winter season (Apr-Aug for Southern Hemisphere)"""
+    try:
+        start_obj = datetime.strptime(start_date, '%Y-%m-%d')
+        end_obj = datetime.strptime(end_date, '%Y-%m-%d')
+
+        # Determine hemisphere based on latitude
+        if coordinates and len(coordinates) > 0 and len(coordinates[0]) > 0:
+            lat = coordinates[0][0][1]  # Get latitude from first coordinate
+            is_southern_hemisphere = lat < 0
+        else:
+            # Default to Southern Hemisphere for Zimbabwe
+            is_southern_hemisphere = True
+
+        if is_southern_hemisphere:
+            # Winter months in Southern Hemisphere: April to August
+            winter_months = [4, 5, 6, 7, 8]
+        else:
+            # Winter months in Northern Hemisphere: November to March
+            winter_months = [11, 12, 1, 2, 3]
+
+        # Check if any month in the date range overlaps with winter
+        current_date = start_obj
+        while current_date <= end_obj:
+            if current_date.month in winter_months:
+                return True
+            # Move to next month
+            if current_date.month == 12:
+                current_date = current_date.replace(year=current_date.year + 1, month=1)
+            else:
+                current_date = current_date.replace(month=current_date.month + 1)
+
+        return False
+
+    except Exception as e:
+        logger.error(f"Error determining winter season: {e}")
+        return False
+
+def get_geohash_key(coordinates, crop, season_year):
+    """Generate geohash key for spatial adaptation"""
+    try:
+        # Get center point of polygon
+        if coordinates and len(coordinates) > 0 and len(coordinates[0]) > 0:
+            lats = [coord[1] for coord in coordinates[0]]
+            lons = [coord[0] for coord in coordinates[0]]
+            center_lat = sum(lats) / len(lats)
+            center_lon = sum(lons) / len(lons)
+
+            # Generate geohash at precision 5 (~5km)
+            geohash = geohash2.encode(center_lat, center_lon, precision=5)
+            key = f"{geohash}_{crop}_{season_year}"
+            return geohash, key
+
+        return None, None
+
+    except Exception as e:
+        logger.error(f"Error generating geohash key: {e}")
+        return None, None
+
+def apply_spatial_nudge(candidate_date, geohash, crop, season_year):
+    """
+    Apply spatial nudging if emergence is ambiguous. Returns
+    (date, cluster_prior_used, neighbor_prior_used).
+    """
+    try:
+        prior_ordinal, _, borrowed = spatial_prior_store.get_prior(geohash, crop, season_year)
+        if prior_ordinal is None:
+            return candidate_date, False, False
+
+        # Check if candidate is within ±3 days of the cluster median
+        days_diff = abs(parse_date_ordinal(candidate_date) - prior_ordinal)
+
+        if days_diff <= 3:
+            # Nudge toward median
+            nudged_date = date.fromordinal(prior_ordinal).strftime('%Y-%m-%d')
+            return nudged_date, True, borrowed
+
+        return candidate_date, False, False
+
+    except Exception as e:
+        logger.error(f"Error applying spatial nudge: {e}")
+        return candidate_date, False, False
+
+def update_spatial_prior(geohash, crop, season_year, emergence_date):
+    """Record a new emergence detection in the shared spatial prior store"""
+    try:
+        spatial_prior_store.add_detection(geohash, crop, season_year, parse_date_ordinal(emergence_date))
+    except Exception as e:
+        logger.error(f"Error updating spatial prior: {e}")
+
+def find_slope_baselines(series, eligible):
+    """
+    Slope rule: for each eligible point, a baseline among the previous MAX_SLOPE_DAYS
+    points that is below the wheat threshold, 1..MAX_SLOPE_DAYS days earlier, with a
+    rise of at least MIN_SLOPE_DELTA. Returns baseline indices (-1 = none).
+
+    Single pass with two pointers over the day ordinals and a monotonic deque holding
+    the running minimum of below-threshold baselines in the window, so each point is
+    pushed and popped at most once. The lowest baseline gives the largest rise, so a
+    point qualifies exactly when some baseline in its window does.
+    """
+    values = series.values.tolist()
+    ordinals = series.ordinals.tolist()
+    n = len(values)
+    baselines = np.full(n, -1, dtype=np.int64)
+
+    window = deque()  # below-threshold indices with increasing values
+    day_start = 0     # first index within MAX_SLOPE_DAYS days of the current point
+    pushed = 0        # next index to enter the window (same-day points stay out)
+
+    for i in range(n):
+        # Right edge: baselines must be at least one day before the current point
+        while pushed < i and ordinals[pushed] < ordinals[i]:
+            if values[pushed] < THRESHOLD_WHEAT_WINTER:
+                while window and values[window[-1]] > values[pushed]:
+                    window.pop()
+                window.append(pushed)
+            pushed += 1
+
+        # Left edge: within MAX_SLOPE_DAYS readings and MAX_SLOPE_DAYS days
+        while ordinals[day_start] < ordinals[i] - MAX_SLOPE_DAYS:
+            day_start += 1
+        left = max(i - MAX_SLOPE_DAYS, day_start)
+        while window and window[0] < left:
+            window.popleft()
+
+        if eligible[i] and window and values[i] - values[window[0]] >= MIN_SLOPE_DELTA:
+            baselines[i] = window[0]
+
+    return baselines
+
+def detect_wheat_winter_emergence(ndvi_data, coordinates=None, force_winter_detector=False, use_spatial_priors=True):
+    """
+    Wheat-specific winter emergence detection using remote sensing only.
+    Returns emergence_date, confidence, and metadata. With use_spatial_priors=False
+    the shared spatial prior store is neither read nor updated.
+    """
+    try:
+        logger.info("=== WHEAT WINTER EMERGENCE DETECTION ===")
+        series = as_index_series(ndvi_data)
+
+        # Check if winter detector should be used
+        if not force_winter_detector:
+            start_date = series.dates[0]
+            end_date = series.dates[-1]
+
+            if not is_winter_season(start_date, end_date, coordinates):
+                logger.info("Not winter season, falling back to standard detection")
+                return None, None, {}
+
+        # Validate minimum data requirements
+        if len(series) < 4:
+            return None, "low", {
+                "qa": {
+                    "valid": False,
+                    "reason": "sparse_data",
+                    "min_points": len(series)
+                }
+            }
+
+        # Apply 3-point median smoothing
+        smoothed = smooth_ndvi_series(series, SMOOTH_WINDOW)
+        logger.info(f"Applied smoothing to {len(smoothed)} points")
+
+        # Calculate NDVI amplitude for sanity check
+        values = smoothed.values
+        ndvi_amplitude = float(values.max() - values.min())
+
+        qa_info = {
+            "valid": True,
+            "ndvi_amplitude": round(ndvi_amplitude, 3),
+            "min_points": len(smoothed),
+            "reason": None
+        }
+
+        # Geometry/season sanity check
+        if ndvi_amplitude < NDVI_AMPLITUDE_MIN:
+            qa_info["valid"] = False
+            qa_info["reason"] = "low_signal"
+            return None, "low", {"qa": qa_info}
+
+        # Skip high cloud candidates (field-level cloud preferred, scene-level fallback)
+        cloud_ok = ~(smoothed.cloud > CLOUD_CANDIDATE_MAX)
+
+        # Rule 1: Crossing rule - smoothed NDVI crosses ≥ 0.15 from below
+        crossing = np.zeros(len(smoothed), dtype=bool)
+        crossing[1:] = (values[:-1] < THRESHOLD_WHEAT_WINTER) & (values[1:] >= THRESHOLD_WHEAT_WINTER)
+        crossing &= cloud_ok
+
+        # Rule 2: Slope rule - rise ≥ 0.04 within ≤ 10 days from low baseline
+        slope_eligible = cloud_ok & ~crossing & (values >= THRESHOLD_WHEAT_WINTER)
+        slope_baselines = find_slope_baselines(smoothed, slope_eligible)
+
+        candidates = []
+        for i in np.flatnonzero(crossing | (slope_baselines >= 0)):
+            current_date = smoothed.dates[i]
+            current_ndvi = float(values[i])
+            cloud_pct = None if np.isnan(smoothed.cloud[i]) else float(smoothed.cloud[i])
+
+            if crossing[i]:
+                prev_ndvi = float(values[i - 1])
+                candidates.append({
+                    'date': current_date,
+                    'method': 'crossing',
+                    'confidence': 'high',
+                    'cloud_pct': cloud_pct,
+                    'ndvi_value': current_ndvi,
+                    'prev_ndvi': prev_ndvi
+                })
+                logger.info(f"Crossing candidate: {current_date}, NDVI: {prev_ndvi:.3f} -> {current_ndvi:.3f}")
+            else:
+                j = slope_baselines[i]
+                baseline_ndvi = float(values[j])
+                ndvi_rise = current_ndvi - baseline_ndvi
+                days_diff = int(smoothed.ordinals[i] - smoothed.ordinals[j])
+                candidates.append({
+                    'date': current_date,
+                    'method': 'slope',
+                    'confidence': 'medium',
+                    'cloud_pct': cloud_pct,
+                    'ndvi_value': current_ndvi,
+                    'baseline_ndvi': baseline_ndvi,
+                    'rise': ndvi_rise,
+                    'days': days_diff
+                })
+                logger.info(f"Slope candidate: {current_date}, rise: {ndvi_rise:.3f} over {days_diff} days")
+
+        # Select best candidate (earliest valid wins)
+        if not candidates:
+            logger.info("No candidates found, falling back to significant rise heuristic")
+            fallback_result = detect_significant_rise_fallback(smoothed)
+            if fallback_result:
+                return fallback_result['date'], "low", {
+                    "qa": qa_info,
+                    "fallback_used": True,
+                    "detection_method": "significant_rise_fallback"
+                }
+            return None, "low", {"qa": qa_info}
+
+        # Candidates are generated chronologically, so the first is the earliest
+        best_candidate = candidates[0]
+
+        emergence_date = best_candidate['date']
+        confidence = best_candidate['confidence']
+
+        # Prepare spatial adaptation
+        geohash = None
+        cluster_prior_used = False
+        neighbor_prior_used = False
+
+        if coordinates and use_spatial_priors:
+            try:
+                season_year = datetime.strptime(emergence_date, '%Y-%m-%d').year
+                geohash, _ = get_geohash_key(coordinates, 'Wheat', season_year)
+
+                if geohash:
+                    # Apply spatial nudging if ambiguous
+                    if confidence == "medium" and len(candidates) > 1:
+                        nudged_date, cluster_prior_used, neighbor_prior_used = apply_spatial_nudge(
+                            emergence_date, geohash, 'Wheat', season_year
+                        )
+                        if cluster_prior_used:
+                            emergence_date = nudged_date
+                            logger.info(f"Applied spatial nudge to: {emergence_date}")
+
+                    # Record this detection in the shared prior store
+                    update_spatial_prior(geohash, 'Wheat', season_year, emergence_date)
+
+            except Exception as e:
+                logger.error(f"Error in spatial adaptation: {e}")
+
+        metadata = {
+            "qa": qa_info,
+            "detection_method": best_candidate['method'],
+            "cloud_at_emergence_pct": best_candidate['cloud_pct'],
+            "used_field_cloud": smoothed.has_field_cloud,
+            "spatial_adaptation": {
+                "geohash": geohash,
+                "cluster_prior_used": cluster_prior_used,
+                "neighbor_prior_used": neighbor_prior_used
+            },
+            "candidates_found": len(candidates)
+        }
+
+        logger.info(f"Selected emergence: {emergence_date}, confidence: {confidence}")
+        return emergence_date, confidence, metadata
+
+    except Exception as e:
+        logger.error(f"Error in wheat winter emergence detection: {e}")
+        return None, "low", {
+            "qa": {
+                "valid": False,
+                "reason": "processing_error",
+                "error": str(e)
+            }
+        }
+
+def find_first_rise(series, low_threshold=0.15, min_rise=0.05):
+    """Index of the first point rising more than min_rise from a value below low_threshold, or None"""
+    values = series.values
+    rises = np.flatnonzero((values[:-1] < low_threshold) & (values[1:] > values[:-1] + min_rise))
+    return int(rises[0]) + 1 if len(rises) else None
+
+def detect_significant_rise_fallback(sorted_data):
+    """Fallback method using significant NDVI rise"""
+    try:
+        series = as_index_series(sorted_data)
+        i = find_first_rise(series)
+        if i is not None:
+            return {
+                'date': series.dates[i],
+                'ndvi_rise': float(series.values[i] - series.values[i - 1])
+            }
+        return None
+    except Exception as e:
+        logger.error(f"Error in fallback detection: {e}")
+        return None
+
+def find_rainfall_adjusted_planting(rainfall_data, planting_window_start, emergence_date):
+    """Earliest significant rainfall date in [planting window start, emergence), or None"""
+    rainfall = as_rainfall_series(rainfall_data)
+    in_window = (
+        (rainfall.ordinals >= parse_date_ordinal(planting_window_start))
+        & (rainfall.ordinals < parse_date_ordinal(emergence_date))
+        & (rainfall.amounts >= SIGNIFICANT_RAINFALL)
+    )
+    matches = np.flatnonzero(in_window)
+    return rainfall.dates[matches[0]] if len(matches) else None
+
+# MODIFIED: Enhanced primary emergence detection with wheat winter path
+def detect_primary_emergence_and_planting(ndvi_data, crop_type, irrigated, rainfall_data=None, coordinates=None,
+                                          force_winter_detector=False, use_spatial_priors=True):
+    """
+    Detects the FIRST emergence event and estimates the primary planting window.
+    Now includes wheat-specific winter detection path. use_spatial_priors=False keeps
+    the wheat path from reading or updating the shared spatial prior store.
+    """
+    logger.info(f"=== PRIMARY EMERGENCE DETECTION for {crop_type} ===")
+    series = as_index_series(ndvi_data)
+
+    # NEW: Wheat winter detection path
+    if crop_type.lower() == 'wheat':
+        logger.info("Attempting wheat-specific winter detection...")
+        wheat_emergence, wheat_confidence, wheat_metadata = detect_wheat_winter_emergence(
+            series, coordinates, force_winter_detector, use_spatial_priors
+        )
+
+        if wheat_emergence:
+            logger.info(f"Wheat winter detector succeeded: {wheat_emergence}")
+
+            # Calculate planting window (keep 5-day width)
+            emergence_window = EMERGENCE_WINDOWS.get(crop_type, DEFAULT_EMERGENCE_WINDOW)
+            emergence_date_obj = datetime.strptime(wheat_emergence, '%Y-%m-%d')
+            planting_window_end = (emergence_date_obj - timedelta(days=emergence_window[0])).strftime('%Y-%m-%d')
+            planting_window_start = (emergence_date_obj - timedelta(days=emergence_window[1])).strftime('%Y-%m-%d')
+
+            # For rainfed fields, check for rainfall events
+            rainfall_adjusted_planting = None
+            if irrigated == "No" and rainfall_data:
+                rainfall_adjusted_planting = find_rainfall_adjusted_planting(
+                    rainfall_data, planting_window_start, wheat_emergence
+                )
+
+            # Create message
+            emergence_display = format_date_for_display(wheat_emergence)
+            planting_start_display = format_date_for_display(planting_window_start)
+            planting_end_display = format_date_for_display(planting_window_end)
+
+            if rainfall_adjusted_planting:
+                rainfall_date_display = format_date_for_display(rainfall_adjusted_planting)
+                message = f"Winter wheat emergence detected around {emergence_display}, indicating planting likely occurred between {planting_start_display} and {planting_end_display}. Rainfall data suggests planting occurred around {rainfall_date_display}."
+            else:
+                message = f"Winter wheat emergence detected around {emergence_display}, indicating planting likely occurred between {planting_start_display} and {planting_end_display}."
+
+            result = {
+                "emergenceDate": wheat_emergence,
+                "plantingWindowStart": planting_window_start,
+                "plantingWindowEnd": planting_window_end,
+                "rainfallAdjustedPlanting": rainfall_adjusted_planting,
+                "preEstablished": False,
+                "confidence": wheat_confidence,
+                "message": message,
+                "primary_emergence": True,
+                "detection_method": "wheat_winter_detector"
+            }
+
+            # Add wheat-specific metadata
+            result.update(wheat_metadata)
+
+            return result
+        else:
+            logger.info("Wheat winter detector failed, falling back to standard detection")
+
+    # EXISTING: Standard emergence detection for non-wheat crops or wheat fallback
+    values = series.values
+
+    emergence_date = None
+    emergence_index = -1
+
+    # Look for the first time NDVI crosses the emergence threshold
+    crossings = np.flatnonzero((values[:-1] < EMERGENCE_THRESHOLD) & (values[1:] >= EMERGENCE_THRESHOLD))
+    if len(crossings):
+        emergence_index = int(crossings[0]) + 1
+        emergence_date = series.dates[emergence_index]
+        logger.info(f"Primary emergence detected on {emergence_date} at index {emergence_index}")
+
+    # If no clear threshold crossing, look for significant NDVI rise from low values
+    if not emergence_date:
+        rise_index = find_first_rise(series)
+        if rise_index is not None:
+            emergence_index = rise_index
+            emergence_date = series.dates[emergence_index]
+            logger.info(f"Alternative emergence detection on {emergence_date} - significant rise from low NDVI")
+
+    # Check if crop was pre-established (all values already high)
+    if not emergence_date and len(series) and values[0] >= EMERGENCE_THRESHOLD:
+        high_count = int(np.count_nonzero(values >= EMERGENCE_THRESHOLD))
+        if high_count >= len(series) * 0.8:  # 80% of values are high
+            return {
+                "emergenceDate": None,
+                "plantingWindowStart": None,
+                "plantingWindowEnd": None,
+                "preEstablished": True,
+                "confidence": "high",
+                "message": "Crop was already established before the analysis period began.",
+                "primary_emergence": False,
+                "detection_method": "standard"
+            }
+
+    # If still no emergence detected
+    if not emergence_date:
+        if irrigated == "No" and rainfall_data:
+            rainfall_failure = detect_rainfall_without_emergence(series, rainfall_data)
+            if rainfall_failure and rainfall_failure['detected']:
+                return {
+                    "emergenceDate": None,
+                    "plantingWindowStart": None,
+                    "plantingWindowEnd": None,
+                    "preEstablished": False,
+                    "confidence": "medium",
+                    "message": rainfall_failure['message'],
+                    "rainfall_without_emergence": True,
+                    "rainfall_date": rainfall_failure['rainfall_date'],
+                    "primary_emergence": False,
+                    "no_planting_detected": True,
+                    "detection_method": "rainfall_analysis"
+                }
+
+        if len(series):
+            start_date = format_date_for_display(series.dates[0])
+            end_date = format_date_for_display(series.dates[-1])
+            message = f"No planting activity detected from {start_date} to {end_date}."
+        else:
+            message = "No planting activity detected during the analysis period."
+
+        return {
+            "emergenceDate": None,
+            "plantingWindowStart": None,
+            "plantingWindowEnd": None,
+            "preEstablished": False,
+            "confidence": "high",
+            "message": message,
+            "primary_emergence": False,
+            "no_planting_detected": True,
+            "detection_method": "standard"
+        }
+
+    # Calculate planting window based on crop-specific emergence timing
+    emergence_window = EMERGENCE_WINDOWS.get(crop_type, DEFAULT_EMERGENCE_WINDOW)
+
+    # Calculate planting window by rolling back from emergence date
+    emergence_date_obj = datetime.strptime(emergence_date, '%Y-%m-%d')
+    planting_window_end = (emergence_date_obj - timedelta(days=emergence_window[0])).strftime('%Y-%m-%d')
+    planting_window_start = (emergence_date_obj - timedelta(days=emergence_window[1])).strftime('%Y-%m-%d')
+
+    logger.info(f"Calculated planting window: {planting_window_start} to {planting_window_end}")
+
+    # For rainfed fields, check for rainfall events in the planting window
+    rainfall_adjusted_planting = None
+    if irrigated == "No" and rainfall_data:
+        rainfall_adjusted_planting = find_rainfall_adjusted_planting(
+            rainfall_data, planting_window_start, emergence_date
+        )
+        if rainfall_adjusted_planting:
+            logger.info(f"Found rainfall-adjusted planting date: {rainfall_adjusted_planting}")
+
+    # Determine confidence level
+    confidence = "medium"
+    n = len(series)
+
+    # Higher confidence for good data quality and clear patterns
+    if n >= 6 and emergence_index > 0 and emergence_index < n - 1:
+        confidence = "high"
+
+    # Lower confidence for sparse data or edge cases
+    if n < 4 or emergence_index <= 1 or emergence_index >= n - 2:
+        confidence = "low"
+
+    # Create primary planting message
+    emergence_display = format_date_for_display(emergence_date)
+    planting_start_display = format_date_for_display(planting_window_start)
+    planting_end_display = format_date_for_display(planting_window_end)
+
+    if rainfall_adjusted_planting:
+        rainfall_date_display = format_date_for_display(rainfall_adjusted_planting)
+        message = f"Primary emergence detected around {emergence_display}, indicating planting likely occurred between {planting_start_display} and {planting_end_display}. Rainfall data suggests planting occurred around {rainfall_date_display}."
+    else:
+        message = f"Primary emergence detected around {emergence_display}, indicating planting likely occurred between {planting_start_display} and {planting_end_display}."
+
+    return {
+        "emergenceDate": emergence_date,
+        "plantingWindowStart": planting_window_start,
+        "plantingWindowEnd": planting_window_end,
+        "rainfallAdjustedPlanting": rainfall_adjusted_planting,
+        "preEstablished": False,
+        "confidence": confidence,
+        "message": message,
+        "primary_emergence": True,
+        "detection_method": "standard"
+    }
+
+# SECONDARY FUNCTION: Detect tillage/replanting events
+def detect_tillage_replanting_events(ndvi_data, primary_emergence_date=None):
+    """
+    Detects tillage or replanting events AFTER the primary emergence.
+    This is secondary analysis to complement the primary planting date.
+    """
+    series = as_index_series(ndvi_data)
+    n = len(series)
+    if n < 4:
+        return {"tillage_detected": False, "message": ""}
+
+    values = series.values
+    before, current = values[:-2], values[1:-1]
+    drops = before - current
+
+    # Criteria for tillage: significant drop from established vegetation
+    is_drop = (drops > 0.15) & (before > 0.3) & (current < 0.25)
+
+    # Check for subsequent recovery within the next 3 readings
+    recovery = np.zeros(n - 2, dtype=bool)
+    for ahead in range(1, 4):
+        later = values[1 + ahead:]
+        recovery[:len(later)] |= later > current[:len(later)] + 0.1
+
+    events = is_drop & recovery
+
+    # Avoid counting tillage that's close to primary emergence
+    if primary_emergence_date:
+        try:
+            primary_ordinal = parse_date_ordinal(primary_emergence_date)
+            events &= np.abs(series.ordinals[1:-1] - primary_ordinal) >= 14
+        except (ValueError, TypeError):
+            pass
+
+    event_indices = np.flatnonzero(events)
+    if len(event_indices):
+        # Use the most significant tillage event (first on ties)
+        k = event_indices[np.argmax(drops[event_indices])]
+        tillage_date = series.dates[k + 1]
+        tillage_date_display = format_date_for_display(tillage_date)
+
+        return {
+            "tillage_detected": True,
+            "tillage_date": tillage_date,
+            "message": f"Subsequently, a tillage or replanting event was detected around {tillage_date_display}, where NDVI dropped from {before[k]:.2f} to {current[k]:.2f}, followed by recovery."
+        }
+
+    return {"tillage_detected": False, "message": ""}
+
+# FUNCTION: Detect rainfall without emergence
+def detect_rainfall_without_emergence(ndvi_data, rainfall_data, min_rainfall_threshold=10, ndvi_threshold=0.2, response_window_days=14):
+    """
+    Detect significant rainfall events that aren't followed by crop emergence.
+    """
+    if not rainfall_data or not ndvi_data:
+        return None
+
+    series = as_index_series(ndvi_data)
+    rainfall = as_rainfall_series(rainfall_data)
+
+    significant = np.flatnonzero(rainfall.amounts >= min_rainfall_threshold)
+    if not len(significant):
+        return None
+
+    # Response window [rain day, rain day + window] of each event as slices of the sorted NDVI
+    rain_ordinals = rainfall.ordinals[significant]
+    window_starts = np.searchsorted(series.ordinals, rain_ordinals, side='left')
+    window_ends = np.searchsorted(series.ordinals, rain_ordinals + response_window_days, side='right')
+
+    # Prefix count of readings not below the threshold: a window is all-below when it adds none
+    above_counts = np.concatenate(([0], np.cumsum(~(series.values < ndvi_threshold))))
+
+    failure_events = []
+
+    for r, start, end in zip(significant, window_starts, window_ends):
+        if end - start >= 2:
+            all_below_threshold = above_counts[end] == above_counts[start]
+            days_span = int(series.ordinals[end - 1] - series.ordinals[start])
+
+            if all_below_threshold and days_span >= 7:
+                failure_events.append({
+                    'rainfall_date': rainfall.dates[r],
+                    'rainfall_amount': float(rainfall.amounts[r]),
+                    'ndvi_readings': int(end - start),
+                    'max_ndvi': float(series.values[start:end].max()),
+                    'days_monitored': days_span
+                })
+
+    if failure_events:
+        failure_events.sort(key=lambda x: x['rainfall_date'], reverse=True)
+        selected_event = failure_events[0]
+        rainfall_date = format_date_for_display(selected_event['rainfall_date'])
+
+        return {
+            'detected': True,
+            'message': f"Significant rainfall occurred around {rainfall_date} ({selected_event['rainfall_amount']:.1f}mm), which may have provided a planting opportunity. However, no NDVI response was observed in the following {selected_event['days_monitored']} days, suggesting either planting did not occur or the crop failed to emerge.",
+            'confidence': "low",
+            'rainfall_date': selected_event['rainfall_date'],
+            'rainfall_amount': selected_event['rainfall_amount'],
+            'max_ndvi': selected_event['max_ndvi']
+        }
+
+    return None
+
+def calculate_change_rates(ndvi_data):
+    """Per-interval NDVI change rates between consecutive readings on different days"""
+    series = as_index_series(ndvi_data)
+    if len(series) < 2:
+        return []
+
+    days = np.diff(series.ordinals)
+    changes = np.diff(series.values)
+    valid = np.flatnonzero(days > 0)
+
+    return [
+        {
+            'start_date': series.dates[i],
+            'end_date': series.dates[i + 1],
+            'days': int(days[i]),
+            'change_rate': float(changes[i] / days[i]),
+            'total_change': float(changes[i])
+        }
+        for i in valid
+    ]
+
+# Format date for display (Month Day format)
+def format_date_for_display(date_str):
+    try:
+        date_obj = datetime.strptime(date_str, '%Y-%m-%d')
+        return date_obj.strftime('%B %d')
+    except Exception:
+        return date_str
@@ -0,0 +1,149 @@
+"""
+Cache for LLM agronomic insights keyed by a canonical fingerprint of the
+prompt-relevant inputs (prompt version, model, crop, detected events and rounded
+stats). Entries live in a process-local TTLCache in front of a SQLite table shared
+by all workers, and concurrent requests for the same fingerprint share one LLM call.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+from cachetools import TTLCache
+
+from .sqlite_store import SQLiteStore
+
+logger = logging.getLogger(__name__)
+
+INSIGHT_CACHE_DB = os.environ.get(
+    "INSIGHT_CACHE_DB",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "insight_cache.sqlite3")
+)
+INSIGHT_CACHE_TTL = int(os.environ.get("INSIGHT_CACHE_TTL_DAYS", 30)) * 86400
+INSIGHT_INFLIGHT_TIMEOUT = 60  # seconds a duplicate request waits for the first one
+
+
+def insight_fingerprint(**inputs):
+    """SHA-256 over the canonical JSON of the inputs (key order and float noise removed)"""
+    def canonical(value):
+        if isinstance(value, float):
+            return round(value, 4)
+        if isinstance(value, dict):
+            return {str(k): canonical(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [canonical(v) for v in value]
+        return value
+
+    payload = json.dumps(canonical(inputs), sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class InsightCache(SQLiteStore):
+    """Insight text by fingerprint, with a memory tier and in-flight deduplication"""
+
+    schema = ("""
+        CREATE TABLE IF NOT EXISTS insight_cache (
+            fingerprint TEXT PRIMARY KEY,
+            insight TEXT NOT NULL,
+            model TEXT,
+            prompt_version TEXT,
+            created_at REAL NOT NULL,
+            expires_at REAL NOT NULL
+        )
+    """,)
+
+    def __init__(self, path=INSIGHT_CACHE_DB, ttl=INSIGHT_CACHE_TTL):
+        super().__init__(path)
+        self.ttl = ttl
+        self.memory = TTLCache(maxsize=2000, ttl=min(ttl, 3600))
+        self.memory_lock = threading.Lock()
+        self.inflight = {}
+        self.inflight_lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "store_hits": 0, "misses": 0, "deduplicated": 0}
+
+    def get(self, fingerprint):
+        """Cached insight text or None"""
+        with self.memory_lock:
+            if fingerprint in self.memory:
+                self.stats["memory_hits"] += 1
+                return self.memory[fingerprint]
+
+        try:
+            row = self._connection().execute(
+                "SELECT insight FROM insight_cache WHERE fingerprint = ? AND expires_at > ?",
+                (fingerprint, time.time())
+            ).fetchone()
+        except Exception as e:
+            logger.error(f"Error reading insight cache: {e}")
+            row = None
+
+        if row:
+            with self.memory_lock:
+                self.memory[fingerprint] = row[0]
+                self.stats["store_hits"] += 1
+            return row[0]
+        return None
+
+    def put(self, fingerprint, insight, model=None, prompt_version=None):
+        """Store insight text in both tiers"""
+        with self.memory_lock:
+            self.memory[fingerprint] = insight
+        try:
+            now = time.time()
+            self._connection().execute(
+                "INSERT OR REPLACE INTO insight_cache "
+                "(fingerprint, insight, model, prompt_version, created_at, expires_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (fingerprint, insight, model, prompt_version, now, now + self.ttl)
+            )
+        except Exception as e:
+            logger.error(f"Error writing insight cache: {e}")
+
+    def get_or_create(self, fingerprint, create, model=None, prompt_version=None):
+        """
+        Cached insight for the fingerprint, or the result of create() stored under it.
+        Concurrent callers with the same fingerprint wait for the first caller's result.
+        Returns (insight, cached).
+        """
+        insight = self.get(fingerprint)
+        if insight is not None:
+            return insight, True
+
+        with self.inflight_lock:
+            waiter = self.inflight.get(fingerprint)
+            if waiter is None:
+                self.inflight[fingerprint] = threading.Event()
+
+        if waiter is not None:
+            waiter.wait(INSIGHT_INFLIGHT_TIMEOUT)
+            insight = self.get(fingerprint)
+            if insight is not None:
+                with self.memory_lock:
+                    self.stats["deduplicated"] += 1
+                return insight, True
+            # The first request failed or timed out: make our own call and store it
+            insight = create()
+            self.put(fingerprint, insight, model, prompt_version)
+            return insight, False
+
+        try:
+            with self.memory_lock:
+                self.stats["misses"] += 1
+            insight = create()
+            self.put(fingerprint, insight, model, prompt_version)
+            return insight, False
+        finally:
+            with self.inflight_lock:
+                self.inflight.pop(fingerprint).set()
+
+    def purge_expired(self):
+        """Delete expired rows from the shared store"""
+        try:
+            self._connection().execute("DELETE FROM insight_cache WHERE expires_at <= ?", (time.time(),))
+        except Exception as e:
+            logger.error(f"Error purging insight cache: {e}")
+
+
+insight_cache = InsightCache()
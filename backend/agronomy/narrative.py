@@ -0,0 +1,78 @@
+"""
+Rule-based field narrative built from the detector results.
+Produces the same kind of 2-3 sentence assessment as the LLM insight, in
+milliseconds and without any network call, so it can be returned immediately
+or used when the LLM is slow or unavailable.
+"""
+
+from .emergence import format_date_for_display
+
+
+def field_status(primary_results, tillage_results):
+    """Single status label for the field from the primary and tillage results"""
+    if primary_results.get("rainfall_without_emergence"):
+        return "rainfall_without_emergence"
+    if primary_results.get("no_planting_detected"):
+        return "no_planting"
+    if primary_results.get("preEstablished"):
+        return "pre_established"
+    if tillage_results and tillage_results.get("tillage_detected"):
+        return "replanted"
+    return "emerged"
+
+
+def field_recommendation(status, crop, irrigated, confidence=None):
+    """One actionable recommendation for the field status"""
+    crop_text = crop if crop and crop != "Unknown crop" else "the crop"
+    if status == "rainfall_without_emergence":
+        return ("Scout the field to confirm whether seed was sown, and if the stand failed, "
+                "plan replanting on the next effective rains while soil moisture allows.")
+    if status == "no_planting":
+        if irrigated == "Yes":
+            return f"If {crop_text} is still planned for this field, schedule pre-plant irrigation and planting so it establishes within the season window."
+        return f"If {crop_text} is still planned for this field, complete land preparation now so planting can follow the next effective rains."
+    if status == "pre_established":
+        return "Keep scouting for pests, disease and nutrient stress, and compare crop vigour against previous seasons."
+    if status == "replanted":
+        return "Check that the replanted stand is uniform and gap-fill thin patches early so the field matures evenly."
+    if confidence == "low":
+        return "Confirm the planting date against field records, as satellite observations around emergence are sparse."
+    if irrigated == "Yes":
+        return "Plan irrigation scheduling, top-dressing and weed control from the estimated planting date."
+    return "Plan top-dressing and weed control from the estimated planting date, and watch soil moisture as the crop develops."
+
+
+def build_field_narrative(primary_results, tillage_results, crop, irrigated, field_name=None, date_range=None):
+    """
+    Structured narrative for the agronomic report:
+    {"status", "headline", "findings", "recommendation", "text"}.
+    """
+    tillage_results = tillage_results or {}
+    status = field_status(primary_results, tillage_results)
+
+    findings = []
+    if primary_results.get("message"):
+        findings.append(primary_results["message"])
+    if status != "no_planting" and tillage_results.get("tillage_detected") and tillage_results.get("message"):
+        findings.append(tillage_results["message"])
+
+    field_text = field_name if field_name and field_name != "Unknown field" else "This field"
+    if status in ("emerged", "replanted") and primary_results.get("emergenceDate"):
+        headline = f"{field_text}: emergence around {format_date_for_display(primary_results['emergenceDate'])}"
+    elif status == "pre_established":
+        headline = f"{field_text}: crop established before the analysis period"
+    elif status == "rainfall_without_emergence":
+        headline = f"{field_text}: rainfall without crop emergence"
+    else:
+        headline = f"{field_text}: no planting detected"
+    if date_range and date_range != "Unknown period":
+        headline += f" ({date_range})"
+
+    recommendation = field_recommendation(status, crop, irrigated, primary_results.get("confidence"))
+    return {
+        "status": status,
+        "headline": headline,
+        "findings": findings,
+        "recommendation": recommendation,
+        "text": " ".join(findings + [recommendation])
+    }
@@ -0,0 +1,228 @@
+"""
+Columnar time series types shared by the emergence and event detectors.
+Dates are parsed once into day ordinals so detectors work on NumPy arrays
+instead of re-sorting lists of dicts and calling strptime in nested loops.
+"""
+
+import base64
+from datetime import datetime
+
+import numpy as np
+
+UNIX_EPOCH_ORDINAL = 719163  # date(1970, 1, 1).toordinal()
+
+
+def parse_date_ordinal(date_str):
+    """Day ordinal for a YYYY-MM-DD date string"""
+    return datetime.strptime(date_str, '%Y-%m-%d').toordinal()
+
+
+def date_ordinals(dates):
+    """Day ordinals for a sequence of YYYY-MM-DD strings in one vectorized pass"""
+    return np.asarray(dates, dtype='datetime64[D]').astype(np.int64) + UNIX_EPOCH_ORDINAL
+
+
+def decode_columns(data):
+    """
+    Parallel-array columns from a columnar payload: either a dict of equal-length
+    lists ({"date": [...], "ndvi": [...]}) or a base64 Arrow IPC stream.
+    """
+    if isinstance(data, str):
+        import pyarrow as pa
+        table = pa.ipc.open_stream(base64.b64decode(data)).read_all()
+        return {name: table.column(name).to_pylist() for name in table.column_names}
+    if not isinstance(data, dict):
+        raise ValueError("Columnar payload must be an object of arrays or a base64 Arrow IPC stream")
+    if len({len(column) for column in data.values()}) > 1:
+        raise ValueError("Columnar payload arrays must all have the same length")
+    return data
+
+
+def column_values(column):
+    """Float array for a column, with nulls as NaN"""
+    return np.array([np.nan if value is None else value for value in column], dtype=float)
+
+
+def column_dates(column):
+    """YYYY-MM-DD strings for a date column (strings, dates or datetimes from Arrow)"""
+    return np.array([str(value)[:10] if value is not None else '' for value in column], dtype=str)
+
+
+class IndexSeries:
+    """
+    Chronologically sorted vegetation index series: ISO date strings, day ordinals,
+    index values and per-point cloud percentages (field-level when available,
+    scene-level otherwise; missing cloud is NaN). scene_cloud holds the scene-level
+    cloud percentages when every point carried one, otherwise None.
+    """
+
+    def __init__(self, dates, ordinals, values, cloud, has_field_cloud=False, scene_cloud=None):
+        self.dates = list(dates)
+        self.ordinals = np.asarray(ordinals, dtype=np.int64)
+        self.values = np.asarray(values, dtype=float)
+        self.cloud = np.asarray(cloud, dtype=float)
+        self.has_field_cloud = has_field_cloud
+        self.scene_cloud = None if scene_cloud is None else np.asarray(scene_cloud, dtype=float)
+
+    @classmethod
+    def from_points(cls, points, value_key='ndvi'):
+        """Build a series from API points ({"date", "ndvi", "cloud_percentage", ...})"""
+        # Stable sort on the date string, same order as sorted(points, key=date)
+        order = sorted(range(len(points)), key=lambda i: points[i]['date'])
+        sorted_points = [points[i] for i in order]
+
+        dates = [point['date'] for point in sorted_points]
+        values = [point[value_key] for point in sorted_points]
+        cloud = []
+        for point in sorted_points:
+            cloud_pct = point.get('field_cloud_percentage')
+            if cloud_pct is None:
+                cloud_pct = point.get('cloud_percentage', 0)
+            cloud.append(np.nan if cloud_pct is None else cloud_pct)
+
+        scene_cloud = None
+        if all('cloud_percentage' in point for point in sorted_points):
+            scene_cloud = [np.nan if point['cloud_percentage'] is None else point['cloud_percentage'] for point in sorted_points]
+
+        return cls(
+            dates,
+            [parse_date_ordinal(date) for date in dates],
+            values,
+            cloud,
+            has_field_cloud=bool(sorted_points) and 'field_cloud_percentage' in sorted_points[0],
+            scene_cloud=scene_cloud
+        )
+
+    @classmethod
+    def from_columns(cls, columns, value_key='ndvi'):
+        """
+        Build a series from parallel arrays ({"date": [...], "ndvi": [...],
+        "cloud_percentage": [...], "field_cloud_percentage": [...]}) or a base64
+        Arrow IPC stream with those columns. Rows without a value are dropped.
+        """
+        columns = decode_columns(columns)
+        dates = column_dates(columns.get('date', []))
+        values = column_values(columns.get(value_key, [None] * len(dates)))
+        scene_cloud = column_values(columns['cloud_percentage']) if 'cloud_percentage' in columns else None
+        field_cloud = column_values(columns['field_cloud_percentage']) if 'field_cloud_percentage' in columns else None
+
+        keep = ~np.isnan(values) & (dates != '')
+        order = np.flatnonzero(keep)[np.argsort(dates[keep], kind='stable')]
+
+        # Field-level cloud preferred, scene-level fallback, 0 when neither was sent
+        cloud = scene_cloud[order] if scene_cloud is not None else np.zeros(len(order))
+        if field_cloud is not None:
+            cloud = np.where(np.isnan(field_cloud[order]), cloud, field_cloud[order])
+
+        return cls(
+            dates[order].tolist(),
+            date_ordinals(dates[order]),
+            values[order],
+            cloud,
+            has_field_cloud=field_cloud is not None and len(order) > 0,
+            scene_cloud=scene_cloud[order] if scene_cloud is not None else None
+        )
+
+    def __len__(self):
+        return len(self.dates)
+
+    def with_values(self, values):
+        """Same dates and cloud cover with replaced index values"""
+        return IndexSeries(self.dates, self.ordinals, values, self.cloud, self.has_field_cloud, self.scene_cloud)
+
+    def mean_scene_cloud(self):
+        """Average scene-level cloud percentage, or None when not reported for every point"""
+        if self.scene_cloud is None or not np.any(~np.isnan(self.scene_cloud)):
+            return None
+        return float(np.nanmean(self.scene_cloud))
+
+    def median_smoothed(self):
+        """3-point median smoothing; the first and last points keep their original values"""
+        if len(self) < 3:
+            return self
+
+        values = self.values.copy()
+        prev_values, current, next_values = self.values[:-2], self.values[1:-1], self.values[2:]
+        # Median of three without averaging: max(min(a, b), min(max(a, b), c))
+        values[1:-1] = np.maximum(
+            np.minimum(prev_values, current),
+            np.minimum(np.maximum(prev_values, current), next_values)
+        )
+        return self.with_values(values)
+
+    def to_points(self, value_key='ndvi'):
+        """Plain list of {"date", value_key} points"""
+        return [{'date': date, value_key: float(value)} for date, value in zip(self.dates, self.values)]
+
+
+class RainfallSeries:
+    """
+    Chronologically sorted daily rainfall events. Events without a date or with a
+    non-numeric rainfall amount are dropped, as the detectors already skipped them.
+    """
+
+    def __init__(self, dates, ordinals, amounts):
+        self.dates = list(dates)
+        self.ordinals = np.asarray(ordinals, dtype=np.int64)
+        self.amounts = np.asarray(amounts, dtype=float)
+
+    @classmethod
+    def from_events(cls, events):
+        """Build a series from API rainfall events ({"date", "rainfall"})"""
+        parsed = []
+        for event in events or []:
+            date = event.get('date')
+            amount = event.get('rainfall', 0)
+            if not date or isinstance(amount, bool) or not isinstance(amount, (int, float)):
+                continue
+            try:
+                parsed.append((date, parse_date_ordinal(date), amount))
+            except (ValueError, TypeError):
+                continue
+
+        parsed.sort(key=lambda event: event[0])
+        return cls(
+            [event[0] for event in parsed],
+            [event[1] for event in parsed],
+            [event[2] for event in parsed]
+        )
+
+    @classmethod
+    def from_columns(cls, columns):
+        """Build a series from parallel {"date": [...], "rainfall": [...]} arrays or an Arrow IPC stream"""
+        columns = decode_columns(columns)
+        dates = column_dates(columns.get('date', []))
+        amounts = column_values(columns.get('rainfall', [None] * len(dates)))
+
+        keep = ~np.isnan(amounts) & (dates != '')
+        order = np.flatnonzero(keep)[np.argsort(dates[keep], kind='stable')]
+        return cls(dates[order].tolist(), date_ordinals(dates[order]), amounts[order])
+
+    def __len__(self):
+        return len(self.dates)
+
+    def weekly_totals(self):
+        """Rainfall totals per month-week key (YYYY-MM-Wn, days 1-7 are week 1)"""
+        totals = {}
+        for date, amount in zip(self.dates, self.amounts.tolist()):
+            week_key = date[:7] + "-W" + str((int(date[8:10]) - 1) // 7 + 1)
+            totals[week_key] = totals.get(week_key, 0) + amount
+        return totals
+
+
+def as_index_series(data, value_key='ndvi'):
+    """Accept an IndexSeries, a list of API points or a columnar payload"""
+    if isinstance(data, IndexSeries):
+        return data
+    if isinstance(data, (dict, str)):
+        return IndexSeries.from_columns(data, value_key)
+    return IndexSeries.from_points(data or [], value_key)
+
+
+def as_rainfall_series(data):
+    """Accept a RainfallSeries, a list of API rainfall events or a columnar payload"""
+    if isinstance(data, RainfallSeries):
+        return data
+    if isinstance(data, (dict, str)):
+        return RainfallSeries.from_columns(data)
+    return RainfallSeries.from_events(data)
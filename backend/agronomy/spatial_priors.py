@@ -0,0 +1,128 @@
+"""
+Durable spatial prior store for wheat emergence nudging.
+Recent emergence dates are kept as day ordinals per geohash cell, crop and season
+in a SQLite database (WAL mode) shared by all worker processes on the host, with
+the median maintained on write so lookups need no parsing or sorting.
+"""
+
+import json
+import logging
+import os
+import time
+
+import geohash2
+
+from .sqlite_store import SQLiteStore
+
+logger = logging.getLogger(__name__)
+
+SPATIAL_PRIOR_DB = os.environ.get(
+    "SPATIAL_PRIOR_DB",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "spatial_priors.sqlite3")
+)
+MAX_PRIOR_DETECTIONS = 10   # most recent detections kept per cell
+MIN_PRIOR_DETECTIONS = 2    # detections needed before a prior is used
+
+
+def median_ordinal(ordinals):
+    """Upper median of day ordinals (same pick as the original sorted-list median)"""
+    ordered = sorted(ordinals)
+    return ordered[len(ordered) // 2]
+
+
+def neighbor_geohashes(geohash):
+    """The eight geohash cells surrounding a cell, at the same precision"""
+    lat, lon, lat_err, lon_err = geohash2.decode_exactly(geohash)
+    neighbors = []
+    for lat_step in (-1, 0, 1):
+        for lon_step in (-1, 0, 1):
+            if lat_step == 0 and lon_step == 0:
+                continue
+            neighbor_lat = lat + lat_step * 2 * lat_err
+            neighbor_lon = ((lon + lon_step * 2 * lon_err + 180) % 360) - 180
+            if -90 <= neighbor_lat <= 90:
+                neighbors.append(geohash2.encode(neighbor_lat, neighbor_lon, precision=len(geohash)))
+    return neighbors
+
+
+class SpatialPriorStore(SQLiteStore):
+    """Emergence-date priors per (geohash, crop, season) backed by SQLite"""
+
+    schema = ("""
+        CREATE TABLE IF NOT EXISTS spatial_priors (
+            geohash TEXT NOT NULL,
+            crop TEXT NOT NULL,
+            season INTEGER NOT NULL,
+            ordinals TEXT NOT NULL,
+            median_ordinal INTEGER NOT NULL,
+            detections INTEGER NOT NULL,
+            updated_at REAL NOT NULL,
+            PRIMARY KEY (geohash, crop, season)
+        )
+    """,)
+
+    def __init__(self, path=SPATIAL_PRIOR_DB):
+        super().__init__(path)
+
+    def add_detection(self, geohash, crop, season, ordinal):
+        """Record an emergence detection, keeping the most recent MAX_PRIOR_DETECTIONS"""
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT ordinals FROM spatial_priors WHERE geohash = ? AND crop = ? AND season = ?",
+                (geohash, crop, season)
+            ).fetchone()
+            ordinals = json.loads(row[0]) if row else []
+            ordinals.append(int(ordinal))
+            ordinals = ordinals[-MAX_PRIOR_DETECTIONS:]
+
+            conn.execute(
+                "INSERT OR REPLACE INTO spatial_priors "
+                "(geohash, crop, season, ordinals, median_ordinal, detections, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (geohash, crop, season, json.dumps(ordinals), median_ordinal(ordinals), len(ordinals), time.time())
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def get_prior(self, geohash, crop, season, use_neighbors=True):
+        """
+        Median emergence ordinal for a cell, or None. Cells with fewer than
+        MIN_PRIOR_DETECTIONS borrow detections from their eight neighbors.
+        Returns (median_ordinal, detections, borrowed_from_neighbors).
+        """
+        conn = self._connection()
+        row = conn.execute(
+            "SELECT median_ordinal, detections FROM spatial_priors WHERE geohash = ? AND crop = ? AND season = ?",
+            (geohash, crop, season)
+        ).fetchone()
+        if row and row[1] >= MIN_PRIOR_DETECTIONS:
+            return row[0], row[1], False
+
+        if not use_neighbors:
+            return None, row[1] if row else 0, False
+
+        cells = [geohash] + neighbor_geohashes(geohash)
+        placeholders = ",".join("?" for _ in cells)
+        rows = conn.execute(
+            f"SELECT ordinals FROM spatial_priors WHERE crop = ? AND season = ? AND geohash IN ({placeholders})",
+            [crop, season] + cells
+        ).fetchall()
+        ordinals = [ordinal for (cell_ordinals,) in rows for ordinal in json.loads(cell_ordinals)]
+        if len(ordinals) < MIN_PRIOR_DETECTIONS:
+            return None, len(ordinals), False
+        return median_ordinal(ordinals), len(ordinals), True
+
+    def size(self):
+        """Number of cells with stored priors"""
+        try:
+            return self._connection().execute("SELECT COUNT(*) FROM spatial_priors").fetchone()[0]
+        except Exception as e:
+            logger.error(f"Error reading spatial prior store size: {e}")
+            return None
+
+
+spatial_prior_store = SpatialPriorStore()
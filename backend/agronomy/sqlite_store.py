@@ -0,0 +1,43 @@
+"""
+Base for small SQLite-backed stores shared by all worker processes on a host.
+Connections are opened per thread and per process (never shared across a fork)
+in WAL mode so concurrent readers do not block the writer.
+"""
+
+import os
+import sqlite3
+import threading
+
+
+class SQLiteStore:
+    """Per-thread WAL connections with a one-time schema setup"""
+
+    schema = ()  # CREATE statements run once per process
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._schema_pid = None
+        self._schema_lock = threading.Lock()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+            self._ensure_schema(conn)
+        return conn
+
+    def _ensure_schema(self, conn):
+        with self._schema_lock:
+            if self._schema_pid == os.getpid():
+                return
+            for statement in self.schema:
+                conn.execute(statement)
+            self._schema_pid = os.getpid()
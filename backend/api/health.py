@@ -15,6 +15,10 @@ from ..database import get_db, test_connection
 from ..models import get_system_stats, SystemHealth
 from ..config import settings
 from ..celery_app import get_active_tasks
+from ..http_client import http_client
+from ..scheduling import queue_stats
+from ..instrumentation import prometheus_summary, stage_summaries
+from ..worker_memory import worker_memory_stats
 
 router = APIRouter(tags=["health"])
 
@@ -214,8 +218,12 @@ async def get_system_metrics(db: Session = Depends(get_db)):
             },
             "jobs": stats,
             "workers": {
-                "active_tasks": task_count
-            }
+                "active_tasks": task_count,
+                "memory_limit_mb": settings.WORKER_MAX_MEMORY_MB,
+                "processes": worker_memory_stats()
+            },
+            "queues": queue_stats(db),
+            "http_clients": http_client.stats()  # outbound calls made by this API process
         }
         
     except Exception as e:
@@ -253,6 +261,35 @@ async def prometheus_metrics(db: Session = Depends(get_db)):
         except:
             pass
         
+        # Queue metrics per cost class
+        for queue_class, queue in queue_stats(db).items():
+            metrics.append(f'yieldera_queue_depth{{queue="{queue_class}"}} {queue["depth"]}')
+            metrics.append(f'yieldera_queue_oldest_wait_seconds{{queue="{queue_class}"}} {queue["oldest_wait_seconds"]}')
+            metrics.append(f'yieldera_queue_avg_wait_seconds{{queue="{queue_class}"}} {queue["avg_wait_seconds"]}')
+        
+        # Per-stage percentiles over the last 24 hours of JobMetrics
+        summaries = stage_summaries(db)
+        metrics.append("# TYPE yieldera_job_queue_seconds summary")
+        metrics.extend(prometheus_summary("yieldera_job_queue_seconds", summaries['queue_time']))
+        metrics.append("# TYPE yieldera_job_total_seconds summary")
+        metrics.extend(prometheus_summary("yieldera_job_total_seconds", summaries['total']))
+        for metric, key in (("yieldera_job_stage_seconds", 'seconds'),
+                            ("yieldera_job_stage_peak_rss_mb", 'peak_rss_mb'),
+                            ("yieldera_job_stage_bytes", 'bytes')):
+            metrics.append(f"# TYPE {metric} summary")
+            for stage_name, series in summaries['stages'].items():
+                if series[key]:
+                    metrics.extend(prometheus_summary(metric, series[key], f'stage="{stage_name}"'))
+        
+        # Worker process memory and leak growth
+        for worker in worker_memory_stats():
+            label = f'worker="{worker["worker"]}"'
+            metrics.append(f"yieldera_worker_rss_mb{{{label}}} {worker['rss_mb']}")
+            metrics.append(f"yieldera_worker_rss_growth_mb{{{label}}} {worker['growth_mb']}")
+            metrics.append(f"yieldera_worker_rss_growth_per_task_mb{{{label}}} {worker['growth_per_task_mb']}")
+            metrics.append(f"yieldera_worker_last_task_rss_delta_mb{{{label}}} {worker['last_task_delta_mb']}")
+            metrics.append(f"yieldera_worker_tasks_total{{{label}}} {worker['tasks']}")
+        
         # Worker metrics
         try:
             active_tasks = get_active_tasks()
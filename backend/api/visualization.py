@@ -4,6 +4,7 @@ Visualization API endpoints for job management
 
 from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, File, UploadFile
 from fastapi.responses import FileResponse, StreamingResponse
+from sqlalchemy import or_, select
 from sqlalchemy.orm import Session
 from pydantic import BaseModel, Field
 from typing import Dict, List, Optional, Any
@@ -16,8 +17,15 @@ import io
 import base64
 
 from ..database import get_db
-from ..models import VisualizationJob, AnalysisPreset, get_job_by_id, get_jobs_by_user
-from ..celery_app import process_visualization_job, get_task_status, cancel_task
+from ..models import VisualizationJob, AnalysisPreset, BatchJob, get_job_by_id, get_jobs_by_user
+from ..celery_app import (
+    process_visualization_job, process_visualization_batch, run_visualization_job, run_visualization_batch,
+    dispatch_task, get_task_status, cancel_task, enforce_cancellation
+)
+from ..cancellation import request_cancellation
+from ..job_events import publish_job_event
+from ..deduplication import job_fingerprint, find_reusable_job, clone_completed_job
+from ..scheduling import FairShareExceeded, check_fair_share, estimate_queue_class, job_priority
 
 from ..config import settings
 from ..services.region_service import get_all_regions, get_region_by_id
@@ -39,6 +47,8 @@ class VisualizationRequest(BaseModel):
     baseline_config: Optional[Dict[str, Any]] = None
     analysis_type: str = Field(default='anomaly', pattern=r'^(anomaly|absolute|percentage|trend|risk)$')
     visualization_config: Optional[Dict[str, Any]] = None
+    force_refresh: bool = Field(default=False, description="Recompute even if an identical job exists")
+    priority: str = Field(default='normal', pattern=r'^(high|normal|low)$')
 
 class JobResponse(BaseModel):
     job_id: str
@@ -55,6 +65,24 @@ class JobStatusResponse(BaseModel):
     statistics: Optional[Dict[str, Any]] = None
     map_preview_available: bool = False
 
+class BatchVisualizationRequest(BaseModel):
+    region_ids: List[str] = Field(..., min_length=1, description="Predefined province/district region IDs")
+    start_date: str = Field(..., pattern=r'^\d{4}-\d{2}-\d{2}$')
+    end_date: str = Field(..., pattern=r'^\d{4}-\d{2}-\d{2}$')
+    baseline_type: str = Field(default='same-period')
+    baseline_config: Optional[Dict[str, Any]] = None
+    analysis_type: str = Field(default='anomaly', pattern=r'^(anomaly|absolute|percentage|trend|risk)$')
+    visualization_config: Optional[Dict[str, Any]] = None
+    force_refresh: bool = Field(default=False, description="Recompute even if identical jobs exist")
+    priority: str = Field(default='low', pattern=r'^(high|normal|low)$')
+
+class BatchJobResponse(BaseModel):
+    batch_id: str
+    status: str
+    message: str
+    created_at: str
+    jobs: List[Dict[str, Any]]
+
 class ExportRequest(BaseModel):
     job_id: str = Field(..., description="Job ID to export")
     format: str = Field(default='png', pattern=r'^(png|pdf|svg|geotiff)$')
@@ -105,6 +133,50 @@ async def generate_visualization(
         # Generate job ID
         job_id = str(uuid.uuid4())
         
+        fingerprint = job_fingerprint(
+            region_name=request.region_name,
+            start_date=request.start_date,
+            end_date=request.end_date,
+            analysis_type=request.analysis_type,
+            baseline_type=request.baseline_type,
+            baseline_config=request.baseline_config,
+            geometry=request.geometry,
+            region_id=request.region_id,
+            region_type=request.region_type,
+            visualization_config=request.visualization_config
+        )
+        
+        # Reuse an identical job instead of queueing duplicate work
+        existing = None if request.force_refresh else find_reusable_job(db, fingerprint, user_id)
+        if existing and existing.status in ('pending', 'running'):
+            return JobResponse(
+                job_id=existing.id,
+                status=existing.status,
+                message="Attached to an identical job already in progress",
+                created_at=existing.created_at.isoformat()
+            )
+        if existing:
+            job = clone_completed_job(db, existing, job_id, user_id)
+            return JobResponse(
+                job_id=job_id,
+                status="completed",
+                message="Reused the result of an identical completed job",
+                created_at=job.created_at.isoformat()
+            )
+        
+        # Fair share: cap in-flight jobs per user and deprioritise heavy submitters
+        try:
+            active_jobs = check_fair_share(db, user_id)
+        except FairShareExceeded as e:
+            raise HTTPException(
+                status_code=429,
+                detail=f"Too many active jobs ({e.active_jobs}/{e.limit}); wait for some to finish",
+                headers={"Retry-After": "30"}
+            )
+        
+        queue_class = estimate_queue_class(geometry)
+        priority = job_priority(request.priority, active_jobs)
+        
         # Create job record
         job = VisualizationJob(
             id=job_id,
@@ -120,6 +192,8 @@ async def generate_visualization(
             baseline_type=request.baseline_type,
             baseline_config=request.baseline_config,
             visualization_config=request.visualization_config,
+            fingerprint=fingerprint,
+            queue_class=queue_class,
             status='pending',
             message='Job queued for processing'
         )
@@ -140,10 +214,12 @@ async def generate_visualization(
             'visualization_config': request.visualization_config or {}
         }
         
-        # Start Celery task (will run synchronously if configured as eager)
-        task = process_visualization_job.delay(job_id, job_data)
-        
-        job.celery_task_id = task.id
+        # Start Celery task on its cost-class queue (local executor without Redis)
+        job.celery_task_id = dispatch_task(
+            process_visualization_job, run_visualization_job, [job_id, job_data],
+            queue=queue_class,
+            priority=priority
+        )
         job.message = 'Job queued for processing'
 
         db.commit()
@@ -155,11 +231,205 @@ async def generate_visualization(
             created_at=job.created_at.isoformat()
         )
         
+    except HTTPException:
+        raise
     except ValueError as e:
         raise HTTPException(status_code=400, detail=f"Invalid date format: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to start visualization job: {str(e)}")
 
+def batch_status(statuses) -> str:
+    """Overall batch status: in flight while any job is, otherwise the shared final status or 'partial'"""
+    statuses = set(statuses)
+    for status in ('running', 'pending'):
+        if status in statuses:
+            return status
+    return statuses.pop() if len(statuses) == 1 else 'partial'
+
+@router.post("/generate/batch", response_model=BatchJobResponse)
+async def generate_visualization_batch(
+    request: BatchVisualizationRequest,
+    db: Session = Depends(get_db),
+    user_id: str = "default_user"  # In production, get from authentication
+):
+    """
+    Start one visualization job per region, processed together against shared composites
+    """
+    
+    try:
+        # Validate date range
+        start_date = datetime.strptime(request.start_date, '%Y-%m-%d')
+        end_date = datetime.strptime(request.end_date, '%Y-%m-%d')
+        
+        if start_date >= end_date:
+            raise HTTPException(status_code=400, detail="Start date must be before end date")
+        
+        if (end_date - start_date).days > 366:
+            raise HTTPException(status_code=400, detail="Date range cannot exceed 366 days")
+        
+        region_ids = list(dict.fromkeys(request.region_ids))
+        if len(region_ids) > settings.BATCH_MAX_REGIONS:
+            raise HTTPException(status_code=400, detail=f"A batch cannot exceed {settings.BATCH_MAX_REGIONS} regions")
+        
+        regions = []
+        for region_id in region_ids:
+            region = get_region_by_id(region_id)
+            if not region:
+                raise HTTPException(status_code=404, detail=f"Region ID not found: {region_id}")
+            if region['category'] not in ('province', 'district'):
+                raise HTTPException(status_code=400, detail=f"Batches support provinces and districts only: {region_id}")
+            regions.append(region)
+        
+        # A batch takes one fair-share slot
+        try:
+            active_jobs = check_fair_share(db, user_id)
+        except FairShareExceeded as e:
+            raise HTTPException(
+                status_code=429,
+                detail=f"Too many active jobs ({e.active_jobs}/{e.limit}); wait for some to finish",
+                headers={"Retry-After": "30"}
+            )
+        
+        batch_id = str(uuid.uuid4())
+        jobs = []
+        queued = []
+        
+        for region in regions:
+            job_id = str(uuid.uuid4())
+            fingerprint = job_fingerprint(
+                region_name=region['name'],
+                start_date=request.start_date,
+                end_date=request.end_date,
+                analysis_type=request.analysis_type,
+                baseline_type=request.baseline_type,
+                baseline_config=request.baseline_config,
+                region_id=region['id'],
+                region_type=region['category'],
+                visualization_config=request.visualization_config
+            )
+            
+            # Reuse identical jobs instead of recomputing them
+            existing = None if request.force_refresh else find_reusable_job(db, fingerprint, user_id)
+            if existing and existing.status in ('pending', 'running'):
+                jobs.append({'region_id': region['id'], 'region_name': region['name'], 'job_id': existing.id, 'status': existing.status})
+                continue
+            if existing:
+                clone_completed_job(db, existing, job_id, user_id, batch_id=batch_id)
+                jobs.append({'region_id': region['id'], 'region_name': region['name'], 'job_id': job_id, 'status': 'completed'})
+                continue
+            
+            job = VisualizationJob(
+                id=job_id,
+                user_id=user_id,
+                region_name=region['name'],
+                geometry=region['geometry'],
+                start_date=request.start_date,
+                end_date=request.end_date,
+                analysis_type=request.analysis_type,
+                region_id=region['id'],
+                region_type=region['category'],
+                baseline_type=request.baseline_type,
+                baseline_config=request.baseline_config,
+                visualization_config=request.visualization_config,
+                fingerprint=fingerprint,
+                batch_id=batch_id,
+                status='pending',
+                message='Job queued for batch processing'
+            )
+            db.add(job)
+            queued.append(job)
+            jobs.append({'region_id': region['id'], 'region_name': region['name'], 'job_id': job_id, 'status': 'pending'})
+        
+        # Every region's job is listed on the batch, including in-flight jobs it attached to
+        db.add_all([BatchJob(batch_id=batch_id, job_id=entry['job_id']) for entry in jobs])
+        db.commit()
+        
+        if queued:
+            # The shared composites cover every queued region, so the batch is costed on their combined area
+            queue_class = estimate_queue_class({
+                'type': 'GeometryCollection',
+                'geometries': [job.geometry for job in queued]
+            })
+            for job in queued:
+                job.queue_class = queue_class
+            db.commit()
+            
+            batch_data = {
+                'start_date': request.start_date,
+                'end_date': request.end_date,
+                'analysis_type': request.analysis_type,
+                'baseline_type': request.baseline_type,
+                'baseline_config': request.baseline_config,
+                'visualization_config': request.visualization_config or {}
+            }
+            
+            task_id = dispatch_task(
+                process_visualization_batch, run_visualization_batch, [batch_id, [job.id for job in queued], batch_data],
+                queue=queue_class,
+                priority=job_priority(request.priority, active_jobs)
+            )
+            
+            for job in queued:
+                job.celery_task_id = task_id
+            db.commit()
+        
+        return BatchJobResponse(
+            batch_id=batch_id,
+            status=batch_status(entry['status'] for entry in jobs),
+            message=f"{len(queued)} of {len(jobs)} regions queued for batch processing",
+            created_at=datetime.utcnow().isoformat(),
+            jobs=jobs
+        )
+        
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid date format: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to start visualization batch: {str(e)}")
+
+@router.get("/batches/{batch_id}")
+async def get_batch_status(batch_id: str, db: Session = Depends(get_db)):
+    """
+    Get the status of every job in a batch
+    """
+    
+    try:
+        # Batches created before the membership table only have batch_id on their jobs
+        member_ids = select(BatchJob.job_id).where(BatchJob.batch_id == batch_id)
+        jobs = db.query(VisualizationJob)\
+                 .filter(or_(VisualizationJob.id.in_(member_ids), VisualizationJob.batch_id == batch_id))\
+                 .order_by(VisualizationJob.region_name)\
+                 .all()
+        
+        if not jobs:
+            raise HTTPException(status_code=404, detail="Batch not found")
+        
+        counts = {}
+        for job in jobs:
+            counts[job.status] = counts.get(job.status, 0) + 1
+        
+        return {
+            "batch_id": batch_id,
+            "status": batch_status(job.status for job in jobs),
+            "total": len(jobs),
+            "status_counts": counts,
+            "progress": round(sum(job.progress or 0 for job in jobs) / len(jobs)),
+            "jobs": [{
+                "job_id": job.id,
+                "region_id": job.region_id,
+                "region_name": job.region_name,
+                "status": job.status,
+                "progress": job.progress,
+                "message": job.message
+            } for job in jobs]
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get batch status: {str(e)}")
+
 @router.get("/jobs/{job_id}/status", response_model=JobStatusResponse)
 async def get_job_status(job_id: str, db: Session = Depends(get_db)):
     """
@@ -211,9 +481,11 @@ async def get_job_details(job_id: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"Failed to get job details: {str(e)}")
 
 @router.post("/jobs/{job_id}/cancel")
-async def cancel_job(job_id: str, db: Session = Depends(get_db)):
+async def cancel_job(job_id: str, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
     """
-    Cancel a running visualization job
+    Cancel a running visualization job.
+    The worker stops at its next progress boundary; the task is only
+    terminated if it is still running after CANCEL_GRACE_SECONDS.
     """
     
     try:
@@ -225,17 +497,19 @@ async def cancel_job(job_id: str, db: Session = Depends(get_db)):
         if job.status not in ['pending', 'running']:
             raise HTTPException(status_code=400, detail=f"Cannot cancel job with status: {job.status}")
         
-        # Cancel Celery task
-        if job.celery_task_id:
-            cancel_success = cancel_task(job.celery_task_id)
-            if not cancel_success:
-                raise HTTPException(status_code=500, detail="Failed to cancel background task")
-        
-        # Update job status
+        # Flag the job and update its status; the worker checks both at each progress tick
+        request_cancellation(job_id)
         job.status = 'cancelled'
         job.message = 'Job cancelled by user'
         job.completed_at = datetime.utcnow()
         db.commit()
+        publish_job_event(job_id, {'type': 'status_update', 'status': 'cancelled', 'message': job.message})
+        
+        # Batch tasks serve other jobs too, so only standalone tasks are revoked
+        if job.celery_task_id and not job.batch_id:
+            if not cancel_task(job.celery_task_id):
+                raise HTTPException(status_code=500, detail="Failed to cancel background task")
+            background_tasks.add_task(enforce_cancellation, job.celery_task_id)
         
         return {"message": "Job cancelled successfully"}
         
@@ -0,0 +1,55 @@
+"""
+Cooperative cancellation for visualization jobs
+Cancelling a job sets a flag (in Redis, falling back to the job row) that the
+worker checks at every progress tick and stops at with JobCancelled, so temp
+files are cleaned up and the worker process keeps its Earth Engine session.
+Terminating the task is only a last resort once the grace period has passed.
+"""
+
+import logging
+
+from .config import settings
+from .job_events import get_redis_client
+
+CANCEL_KEY_PREFIX = "yieldera:visualization:cancel:"
+
+logger = logging.getLogger(__name__)
+
+
+class JobCancelled(Exception):
+    """Raised at a progress boundary when the job has been cancelled"""
+
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        super().__init__(f"Job {job_id} was cancelled")
+
+
+def request_cancellation(job_id: str):
+    """Set the Redis cancel flag; the caller marks the job row cancelled"""
+    try:
+        client = get_redis_client()
+        if client is not None:
+            client.set(f"{CANCEL_KEY_PREFIX}{job_id}", 1, ex=settings.CANCEL_FLAG_TTL_SECONDS)
+    except Exception as e:
+        logger.error(f"Failed to set cancel flag for job {job_id}: {e}")
+
+
+def is_cancelled(job_id: str) -> bool:
+    """True once the job has been cancelled (Redis flag, or the job row without Redis)"""
+    try:
+        client = get_redis_client()
+        if client is not None:
+            return bool(client.exists(f"{CANCEL_KEY_PREFIX}{job_id}"))
+    except Exception as e:
+        logger.warning(f"⚠️ Cancel flag lookup failed for job {job_id}, checking database: {e}")
+
+    from .database import SessionLocal
+    from .models import VisualizationJob
+
+    try:
+        with SessionLocal() as db:
+            status = db.query(VisualizationJob.status).filter(VisualizationJob.id == job_id).scalar()
+            return status == 'cancelled'
+    except Exception as e:
+        logger.error(f"Failed to check cancellation for job {job_id}: {e}")
+        return False
@@ -4,11 +4,15 @@ Optimized for Render.com deployment
 """
 
 from celery import Celery
-from celery.signals import worker_ready, task_prerun, task_postrun
+from celery.signals import worker_ready, worker_process_init, task_prerun, task_postrun
+from sqlalchemy import func
 import logging
 import os
+import time
 from datetime import datetime, timedelta
 from .config import settings
+from .job_events import publish_job_event
+from .websocket_manager import format_job_completion_message, format_job_error_message
 
 # Create Celery instance
 # Configure broker and backend with explicit fallbacks
@@ -48,73 +52,80 @@ def process_visualization_job(self, job_id: str, job_data: dict):
     """
     Main task for processing visualization jobs
     """
+    return run_visualization_job(self, job_id, job_data)
+
+@celery_app.task(bind=True, max_retries=2)
+def process_visualization_batch(self, batch_id: str, job_ids: list, batch_data: dict):
+    """
+    Process a multi-region batch against shared composites
+    """
+    return run_visualization_batch(self, batch_id, job_ids, batch_data)
+
+@celery_app.task(bind=True, max_retries=2)
+def generate_job_commentary(self, job_id: str):
+    """
+    Follow-up task that attaches the AI Executive Summary to a completed job
+    """
+    return run_job_commentary(self, job_id)
+
+def dispatch_task(task, body, args: list, **options) -> str:
+    """
+    Queue a task and return its id. Without Redis the body runs on the
+    in-process local executor instead of Celery; options (queue, priority)
+    only apply to Celery.
+    """
+    if settings.local_executor_enabled:
+        from .local_executor import get_local_executor
+        return get_local_executor().submit(task.name, body, args, max_retries=task.max_retries)
+    return task.apply_async(args=args, **options).id
+
+def run_visualization_job(task, job_id: str, job_data: dict):
+    """
+    Body of process_visualization_job. task is the bound Celery task or its
+    local executor stand-in (request, max_retries, retry, update_state).
+    """
     from .models import VisualizationJob
-    from .database import SessionLocal
-    from .visualization.processor import VisualizationProcessor
+    from .cancellation import JobCancelled
+    from .job_progress import JobProgressReporter
+    from .instrumentation import JobInstrumentation, record_job_metrics
+    from .visualization.processor import get_processor
     import traceback
     
-    # Update job status to running
-    with SessionLocal() as db:
-        job = db.query(VisualizationJob).filter(VisualizationJob.id == job_id).first()
-        if job:
-            job.status = 'running'
-            job.started_at = datetime.utcnow()
-            job.celery_task_id = self.request.id
-            job.message = 'Initializing processing...'
-            job.progress = 0
-            db.commit()
+    # Progress is coalesced: at most one DB/result-backend write per interval,
+    # plus the pending tick as each stage starts
+    reporter = JobProgressReporter(job_id, task=task)
+    instrumentation = JobInstrumentation(job_id, on_stage_start=reporter.flush)
     
-    # Define callback for processor
-    def update_progress_callback(progress: int, message: str):
-        """Update progress both in Celery and database"""
-        # Update Celery state
-        self.update_state(
-            state='PROGRESS',
-            meta={'progress': progress, 'message': message}
+    try:
+        # Cancelled while queued: never start
+        reporter.check_cancelled()
+        
+        # Update job status to running
+        reporter.finish(
+            'running', 'Initializing processing...',
+            started_at=datetime.utcnow(),
+            celery_task_id=task.request.id,
+            progress=0
         )
         
-        # Update database
-        try:
-            with SessionLocal() as db:
-                job = db.query(VisualizationJob).filter(VisualizationJob.id == job_id).first()
-                if job:
-                    job.progress = progress
-                    job.message = message
-                    db.commit()
-        except Exception as e:
-            logging.error(f"Failed to update progress for job {job_id}: {e}")
-
-    try:
-        # Initialize processor
-        processor = VisualizationProcessor()
+        # Processor and Earth Engine session are shared by all tasks in this worker process
+        processor = get_processor()
         
         # Update progress
-        update_progress_callback(5, 'Connecting to Google Earth Engine...')
+        reporter.report(5, 'Connecting to Google Earth Engine...')
         
-        # Process the visualization
+        # Process the visualization (stages are timed into this job's metrics)
         start_time = datetime.utcnow()
-        result = processor.process_job(job_id, job_data, progress_callback=update_progress_callback)
+        with instrumentation.activate():
+            result = processor.process_job(job_id, job_data, progress_callback=reporter.report)
         processing_time = (datetime.utcnow() - start_time).total_seconds()
         
         if not result['success']:
             raise Exception(result['error'])
         
-        # Update final status
-        with SessionLocal() as db:
-            job = db.query(VisualizationJob).filter(VisualizationJob.id == job_id).first()
-            if job:
-                job.status = 'completed'
-                job.completed_at = datetime.utcnow()
-                job.progress = 100
-                job.message = 'Processing completed successfully'
-                # Combine statistics with AI commentary for storage
-                stats = result.get('statistics', {})
-                stats['ai_commentary'] = result.get('ai_commentary', '')
-                job.statistics = stats
-                job.map_image_path = result.get('map_image_path')
-                job.export_paths = result.get('export_paths', {})
-                job.processing_time_seconds = processing_time
-                db.commit()
+        record_job_metrics(job_id, instrumentation, processing_time,
+                           job_data.get('geometry'), result.get('export_paths'))
+        complete_job(reporter, job_id, result, processing_time)
         
         return {
             'success': True,
@@ -123,40 +134,279 @@ def process_visualization_job(self, job_id: str, job_data: dict):
             'result': result
         }
         
+    except JobCancelled:
+        # Stopped cleanly at a progress boundary; the job row is already cancelled
+        from .visualization.checkpoints import clear_checkpoints
+        clear_checkpoints(job_id)
+        logging.info(f"🛑 Job {job_id} cancelled")
+        return {'success': False, 'job_id': job_id, 'cancelled': True}
+        
     except Exception as exc:
         # Log the full error for debugging
         error_details = traceback.format_exc()
         logging.error(f"Job {job_id} failed: {error_details}")
         
         # Update database with error
-        with SessionLocal() as db:
-            job = db.query(VisualizationJob).filter(VisualizationJob.id == job_id).first()
-            if job:
-                job.status = 'failed'
-                job.completed_at = datetime.utcnow()
-                job.error_message = str(exc)
-                job.message = f'Processing failed: {str(exc)}'
-                job.retry_count = getattr(job, 'retry_count', 0) + 1
-                db.commit()
+        reporter.finish(
+            'failed', f'Processing failed: {str(exc)}',
+            event=format_job_error_message(str(exc), task.request.retries),
+            completed_at=datetime.utcnow(),
+            error_message=str(exc),
+            retry_count=func.coalesce(VisualizationJob.retry_count, 0) + 1
+        )
         
         # Retry if within retry limit
-        if self.request.retries < self.max_retries:
+        if task.request.retries < task.max_retries:
             # Exponential backoff: 60s, 180s, 540s
-            retry_delay = 60 * (3 ** self.request.retries)
-            raise self.retry(countdown=retry_delay, exc=exc)
+            retry_delay = 60 * (3 ** task.request.retries)
+            raise task.retry(countdown=retry_delay, exc=exc)
+        
+        # Final failure: nothing left to resume
+        from .visualization.checkpoints import clear_checkpoints
+        clear_checkpoints(job_id)
+        record_job_metrics(job_id, instrumentation, instrumentation.elapsed_seconds(), job_data.get('geometry'))
         
-        # Final failure
-        self.update_state(
+        task.update_state(
             state='FAILURE',
             meta={
                 'error': str(exc),
                 'job_id': job_id,
-                'retry_count': self.request.retries
+                'retry_count': task.request.retries
             }
         )
         
         raise exc
 
+def complete_job(reporter, job_id: str, result: dict, processing_time: float):
+    """Store a successful processor result on the job and queue its AI commentary"""
+    from .visualization.checkpoints import clear_checkpoints
+    
+    # Map is ready: store the template summary now, AI commentary follows
+    stats = result.get('statistics', {})
+    stats['ai_commentary'] = result.get('ai_commentary', '')
+    stats['ai_commentary_source'] = result.get('ai_commentary_source', 'template')
+    stats['ai_commentary_status'] = 'pending'
+    
+    # Update final status (no row is updated if the job was cancelled meanwhile)
+    updated = reporter.finish(
+        'completed', 'Processing completed successfully',
+        event=format_job_completion_message(stats, result.get('export_paths')),
+        completed_at=datetime.utcnow(),
+        progress=100,
+        statistics=stats,
+        map_image_path=result.get('map_image_path'),
+        export_paths=result.get('export_paths', {}),
+        processing_time_seconds=processing_time
+    )
+    
+    # Stage checkpoints are only needed to resume a retried job
+    clear_checkpoints(job_id)
+    if not updated:
+        return
+    
+    # Generate AI Commentary (Executive Summary) without holding this worker slot
+    try:
+        dispatch_task(generate_job_commentary, run_job_commentary, [job_id])
+    except Exception as e:
+        logging.error(f"Failed to queue AI commentary for job {job_id}: {e}")
+
+def run_visualization_batch(task, batch_id: str, job_ids: list, batch_data: dict):
+    """
+    Body of process_visualization_batch: process a multi-region batch against
+    shared composites; each job is completed as soon as its map is rendered
+    """
+    from .models import VisualizationJob
+    from .database import SessionLocal
+    from .cancellation import JobCancelled
+    from .job_progress import JobProgressReporter
+    from .instrumentation import JobInstrumentation, record_job_metrics
+    from .visualization.processor import get_processor
+    from .visualization.batch import process_batch
+    import traceback
+    
+    # Completed and cancelled jobs are skipped (e.g. when the batch is retried)
+    with SessionLocal() as db:
+        jobs = db.query(VisualizationJob)\
+                 .filter(VisualizationJob.id.in_(job_ids))\
+                 .filter(VisualizationJob.status.notin_(['completed', 'cancelled']))\
+                 .all()
+        regions = [{
+            'job_id': job.id,
+            'region_name': job.region_name,
+            'region_type': job.region_type,
+            'geometry': job.geometry
+        } for job in jobs]
+    
+    if not regions:
+        return {'success': True, 'batch_id': batch_id, 'completed': 0, 'failed': 0}
+    
+    reporters = {region['job_id']: JobProgressReporter(region['job_id']) for region in regions}
+    geometries = {region['job_id']: region['geometry'] for region in regions}
+    finished = {}
+    cancelled = set()
+    
+    def flush_progress():
+        for job_id, reporter in reporters.items():
+            if job_id not in finished and job_id not in cancelled:
+                reporter.flush()
+    
+    # Shared stages (composites, statistics, download) are recorded against every job in the batch
+    instrumentation = JobInstrumentation(batch_id, on_stage_start=flush_progress)
+    
+    for job_id, reporter in reporters.items():
+        reporter.finish(
+            'running', 'Computing shared batch composites...',
+            started_at=datetime.utcnow(),
+            celery_task_id=task.request.id,
+            progress=0
+        )
+    
+    def report(progress: int, message: str):
+        try:
+            task.update_state(state='PROGRESS', meta={'progress': progress, 'message': message})
+        except Exception as e:
+            logging.error(f"Failed to update task state for batch {batch_id}: {e}")
+        for job_id, reporter in reporters.items():
+            if job_id in finished or job_id in cancelled:
+                continue
+            try:
+                reporter.report(progress, message)
+            except JobCancelled:
+                # Other regions carry on; the cancelled job's result is discarded
+                cancelled.add(job_id)
+        if len(cancelled) == len(reporters):
+            raise JobCancelled(batch_id)
+    
+    start_time = datetime.utcnow()
+    
+    def on_result(job_id: str, result: dict):
+        if job_id in cancelled:
+            return
+        finished[job_id] = result['success']
+        processing_time = (datetime.utcnow() - start_time).total_seconds()
+        record_job_metrics(job_id, instrumentation, processing_time,
+                           geometries[job_id], result.get('export_paths'))
+        if result['success']:
+            complete_job(reporters[job_id], job_id, result, processing_time)
+        else:
+            reporters[job_id].finish(
+                'failed', f"Processing failed: {result['error']}",
+                event=format_job_error_message(result['error'], task.request.retries),
+                completed_at=datetime.utcnow(),
+                error_message=result['error'],
+                retry_count=func.coalesce(VisualizationJob.retry_count, 0) + 1
+            )
+    
+    try:
+        with instrumentation.activate():
+            process_batch(get_processor(), batch_id, regions, batch_data,
+                          progress_callback=report, result_callback=on_result)
+    
+    except JobCancelled:
+        logging.info(f"🛑 Batch {batch_id} cancelled")
+        return {'success': False, 'batch_id': batch_id, 'cancelled': True}
+    
+    except Exception as exc:
+        logging.error(f"Batch {batch_id} failed: {traceback.format_exc()}")
+        
+        for job_id in reporters:
+            if job_id not in finished and job_id not in cancelled:
+                on_result(job_id, {'success': False, 'error': str(exc)})
+        
+        if task.request.retries < task.max_retries:
+            raise task.retry(countdown=60 * (3 ** task.request.retries), exc=exc)
+        raise exc
+    
+    completed = sum(1 for success in finished.values() if success)
+    logging.info(f"✅ Batch {batch_id}: {completed} completed, {len(finished) - completed} failed")
+    
+    return {
+        'success': True,
+        'batch_id': batch_id,
+        'completed': completed,
+        'failed': len(finished) - completed,
+        'cancelled': len(cancelled),
+        'processing_time': (datetime.utcnow() - start_time).total_seconds()
+    }
+
+def run_job_commentary(task, job_id: str):
+    """
+    Body of generate_job_commentary: attaches the AI Executive Summary to a completed job.
+    Failures are retried; after the last one the job keeps its template summary and is
+    marked completed, so its commentary never stays pending.
+    """
+    try:
+        return attach_job_commentary(job_id)
+    except Exception as exc:
+        if task.request.retries < task.max_retries:
+            # Backoff: 30s, 60s
+            retry_delay = 30 * (2 ** task.request.retries)
+            logging.warning(f"⚠️ Commentary for job {job_id} failed ({exc}), retrying in {retry_delay}s")
+            raise task.retry(countdown=retry_delay, exc=exc)
+        
+        logging.error(f"Commentary for job {job_id} failed after {task.request.retries} retries: {exc}")
+        try:
+            store_job_commentary(job_id)
+        except Exception as e:
+            logging.error(f"Failed to close commentary for job {job_id}: {e}")
+        return {'success': False, 'job_id': job_id}
+
+def attach_job_commentary(job_id: str):
+    """Generate the AI commentary for a completed job and store it"""
+    from .models import VisualizationJob
+    from .database import SessionLocal
+    from .visualization.intelligence import ai_intel
+    from .instrumentation import add_stage_metrics
+    
+    with SessionLocal() as db:
+        job = db.query(VisualizationJob).filter(VisualizationJob.id == job_id).first()
+        if not job or not job.statistics:
+            logging.warning(f"No statistics to comment on for job {job_id}")
+            return {'success': False, 'job_id': job_id}
+        statistics = dict(job.statistics)
+        region_name = job.region_name
+        analysis_type = job.analysis_type
+    
+    started = time.perf_counter()
+    commentary = ai_intel.generate_commentary_result(
+        statistics=statistics,
+        region_name=region_name,
+        analysis_type=analysis_type
+    )
+    add_stage_metrics(job_id, 'ai_commentary', time.perf_counter() - started)
+    
+    if not store_job_commentary(job_id, commentary):
+        return {'success': False, 'job_id': job_id}
+    return {'success': True, 'job_id': job_id, 'source': commentary['source']}
+
+def store_job_commentary(job_id: str, commentary: dict = None) -> bool:
+    """
+    Mark the job's commentary completed, with the generated commentary or (None)
+    the template summary stored when the job completed. False if the job is gone.
+    """
+    from .models import VisualizationJob
+    from .database import SessionLocal
+    
+    with SessionLocal() as db:
+        job = db.query(VisualizationJob).filter(VisualizationJob.id == job_id).first()
+        if not job:
+            return False
+        # Assign a new dict so SQLAlchemy sees the JSON column change
+        stats = dict(job.statistics or {})
+        if commentary is not None:
+            stats['ai_commentary'] = commentary['commentary']
+            stats['ai_commentary_source'] = commentary['source']
+        stats['ai_commentary_status'] = 'completed'
+        job.statistics = stats
+        db.commit()
+    
+    publish_job_event(job_id, {
+        'type': 'commentary_ready',
+        'ai_commentary': stats.get('ai_commentary', ''),
+        'ai_commentary_source': stats.get('ai_commentary_source', 'template')
+    })
+    return True
+
 @celery_app.task
 def cleanup_old_jobs():
     """
@@ -291,16 +541,39 @@ def worker_ready_handler(sender=None, **kwargs):
     """Handler when worker is ready"""
     logging.info("🚀 Celery worker ready for processing visualization jobs")
 
+@worker_process_init.connect
+def worker_process_init_handler(**kwargs):
+    """Initialize the processor, Earth Engine session and static caches once per worker process"""
+    try:
+        from .visualization.processor import (
+            DISTRICT_SHAPEFILE, PROVINCE_SHAPEFILE, get_processor, load_color_scheme, load_shapefile
+        )
+        get_processor()
+        for analysis_type in ('anomaly', 'percentage', 'absolute'):
+            load_color_scheme(analysis_type)
+        for shp_path in (PROVINCE_SHAPEFILE, DISTRICT_SHAPEFILE):
+            if os.path.exists(shp_path):
+                load_shapefile(shp_path)
+        logging.info(f"🔧 Worker process {os.getpid()} initialized visualization processor")
+    except Exception as e:
+        # Tasks fall back to lazy initialization
+        logging.error(f"Worker process initialization failed: {e}")
+
 @task_prerun.connect
 def task_prerun_handler(sender=None, task_id=None, task=None, args=None, kwargs=None, **kwds):
     """Handler before task execution"""
+    from .worker_memory import task_started
     logging.info(f"📋 Starting task: {task.name} (ID: {task_id})")
+    task_started(task_id)
 
 @task_postrun.connect
 def task_postrun_handler(sender=None, task_id=None, task=None, args=None, kwargs=None, 
                         retval=None, state=None, **kwds):
     """Handler after task execution"""
+    from .worker_memory import task_finished
     logging.info(f"✅ Completed task: {task.name} (ID: {task_id}, State: {state})")
+    # Release render leftovers and log the RSS delta; the pool recycles the child above the ceiling
+    task_finished(task_id, task.name)
 
 # =====================================
 # UTILITY FUNCTIONS
@@ -310,6 +583,10 @@ def get_task_status(task_id: str) -> dict:
     """Get status of a specific task"""
     from celery.result import AsyncResult
     
+    if settings.local_executor_enabled:
+        from .local_executor import get_local_executor
+        return get_local_executor().status(task_id)
+    
     result = AsyncResult(task_id, app=celery_app)
     
     return {
@@ -320,17 +597,47 @@ def get_task_status(task_id: str) -> dict:
         'info': result.info
     }
 
-def cancel_task(task_id: str) -> bool:
-    """Cancel a running task"""
+def cancel_task(task_id: str, terminate: bool = False) -> bool:
+    """
+    Revoke a task: a queued task never starts and a running one is not retried.
+    A running task stops itself at its next progress check; terminate kills it.
+    """
+    if settings.local_executor_enabled:
+        # Local tasks skip cancelled jobs when they start and cannot be killed
+        return True
     try:
-        celery_app.control.revoke(task_id, terminate=True)
+        celery_app.control.revoke(task_id, terminate=terminate)
         return True
     except Exception as e:
         logging.error(f"Failed to cancel task {task_id}: {e}")
         return False
 
+async def enforce_cancellation(task_id: str, grace_seconds: int = None):
+    """
+    Last resort for a cancelled task: terminate it if it is still running after
+    the grace period (e.g. stuck in a long download or render)
+    """
+    import asyncio
+    from celery.result import AsyncResult
+    
+    await asyncio.sleep(settings.CANCEL_GRACE_SECONDS if grace_seconds is None else grace_seconds)
+    try:
+        state = get_task_status(task_id)['status'] if settings.local_executor_enabled \
+            else AsyncResult(task_id, app=celery_app).state
+    except Exception as e:
+        logging.error(f"Failed to check cancelled task {task_id}: {e}")
+        return
+    if state in ('STARTED', 'PROGRESS') and settings.local_executor_enabled:
+        logging.warning(f"⚠️ Local task {task_id} still running {settings.CANCEL_GRACE_SECONDS}s after cancel; threads cannot be terminated")
+    elif state in ('STARTED', 'PROGRESS'):
+        logging.warning(f"⚠️ Task {task_id} still running {settings.CANCEL_GRACE_SECONDS}s after cancel, terminating")
+        cancel_task(task_id, terminate=True)
+
 def get_active_tasks() -> list:
     """Get list of currently active tasks"""
+    if settings.local_executor_enabled:
+        from .local_executor import get_local_executor
+        return {'local': get_local_executor().active()}
     try:
         inspect = celery_app.control.inspect()
         active_tasks = inspect.active()
@@ -26,6 +26,16 @@ class Settings:
     
     # AI Intelligence
     OPENAI_API_KEY: Optional[str] = os.getenv("OPENAI_API_KEY")
+    # Seconds to wait for the LLM before falling back to the template summary
+    AI_COMMENTARY_BUDGET_SECONDS: float = float(os.getenv("AI_COMMENTARY_BUDGET_SECONDS", "25"))
+    # Point at a local stub server for testing
+    OPENAI_BASE_URL: str = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1").rstrip('/')
+    
+    # Outbound HTTP client (connection pooling, retries, circuit breaker)
+    HTTP_MAX_RETRIES: int = int(os.getenv("HTTP_MAX_RETRIES", "3"))
+    HTTP_POOL_MAXSIZE: int = int(os.getenv("HTTP_POOL_MAXSIZE", "20"))
+    HTTP_CIRCUIT_FAILURES: int = int(os.getenv("HTTP_CIRCUIT_FAILURES", "5"))
+    HTTP_CIRCUIT_RESET_SECONDS: float = float(os.getenv("HTTP_CIRCUIT_RESET_SECONDS", "30"))
     
     # Storage Configuration
     VISUALIZATION_STORAGE_PATH: str = os.getenv("VISUALIZATION_STORAGE_PATH", "/tmp/visualizations")
@@ -59,6 +69,27 @@ class Settings:
     # Performance Settings
     MAX_WORKERS: int = int(os.getenv("MAX_WORKERS", "4"))
     WORKER_CONCURRENCY: int = int(os.getenv("WORKER_CONCURRENCY", "1"))
+    # Without Redis, jobs run on this many threads in the API process (cartography uses pyplot, keep it low)
+    LOCAL_EXECUTOR_WORKERS: int = int(os.getenv("LOCAL_EXECUTOR_WORKERS", "1"))
+    # Worker child recycling: peak RSS ceiling checked after each task (0 disables) and a task count cap
+    WORKER_MAX_MEMORY_MB: int = int(os.getenv("WORKER_MAX_MEMORY_MB", "400"))
+    WORKER_MAX_TASKS_PER_CHILD: int = int(os.getenv("WORKER_MAX_TASKS_PER_CHILD", "1000"))
+    # Minimum seconds between job progress writes (ticks in between are coalesced)
+    PROGRESS_MIN_INTERVAL_SECONDS: float = float(os.getenv("PROGRESS_MIN_INTERVAL_SECONDS", "2"))
+    
+    # Scheduling: cost-class queues by region area and per-user fair share
+    DISTRICT_MAX_AREA_KM2: float = float(os.getenv("DISTRICT_MAX_AREA_KM2", "15000"))
+    PROVINCE_MAX_AREA_KM2: float = float(os.getenv("PROVINCE_MAX_AREA_KM2", "120000"))
+    USER_MAX_ACTIVE_JOBS: int = int(os.getenv("USER_MAX_ACTIVE_JOBS", "5"))
+    
+    # Batch jobs: regions per batch and render processes (1 renders inline; each
+    # extra process holds its own matplotlib/cartopy heap next to the worker's)
+    BATCH_MAX_REGIONS: int = int(os.getenv("BATCH_MAX_REGIONS", "100"))
+    BATCH_RENDER_WORKERS: int = int(os.getenv("BATCH_RENDER_WORKERS", "1"))
+    
+    # Cancellation: flag lifetime and how long a cancelled task may run before it is terminated
+    CANCEL_FLAG_TTL_SECONDS: int = int(os.getenv("CANCEL_FLAG_TTL_SECONDS", "86400"))
+    CANCEL_GRACE_SECONDS: int = int(os.getenv("CANCEL_GRACE_SECONDS", "120"))
     
     # API Configuration
     API_V1_STR: str = "/api/v1"
@@ -97,7 +128,7 @@ class Settings:
             raise ValueError("DATABASE_URL is required. Please set up PostgreSQL in Render.")
             
         if self.ENVIRONMENT == "production" and not self.REDIS_URL:
-            logging.warning("REDIS_URL not set. Background tasks will not function.")
+            logging.warning("REDIS_URL not set. Jobs will run on the in-process local executor.")
             
         if self.ENVIRONMENT == "production" and not self.GOOGLE_APPLICATION_CREDENTIALS_JSON:
             logging.warning("GOOGLE_APPLICATION_CREDENTIALS_JSON not set. GEE functionality will be limited.")
@@ -155,7 +186,7 @@ class Settings:
             "task_track_started": True,
             "task_acks_late": True,
             "worker_prefetch_multiplier": 1,
-            "worker_max_tasks_per_child": 1000,
+            "worker_max_tasks_per_child": self.WORKER_MAX_TASKS_PER_CHILD,
             "worker_concurrency": self.WORKER_CONCURRENCY,
             "result_expires": 3600,  # Results expire after 1 hour
             "task_compression": "gzip",
@@ -164,15 +195,27 @@ class Settings:
             "broker_use_ssl": {"ssl_cert_reqs": 0} if "rediss://" in self.CELERY_BROKER_URL else False,
         }
         
-        # If Redis is not configured, run tasks synchronously (eager mode)
-        if not self.REDIS_URL:
-            config.update({
-                "task_always_eager": True,
-                "task_eager_propagates": True,
-            })
-            
+        # Replace the child process after the task that pushed its peak RSS (ru_maxrss) over the ceiling (KiB)
+        if self.WORKER_MAX_MEMORY_MB:
+            config["worker_max_memory_per_child"] = self.WORKER_MAX_MEMORY_MB * 1024
+        
+        # Honour per-message priorities on the Redis transport (0 is served first).
+        # Queues keep the default round_robin order so a busy viz_district queue
+        # cannot starve viz_country on a worker consuming both.
+        if self.CELERY_BROKER_URL.startswith(("redis://", "rediss://")):
+            config["broker_transport_options"] = {
+                "priority_steps": list(range(10)),
+                "sep": ":",
+                "queue_order_strategy": "round_robin",
+            }
+        
         return config
     
+    @property
+    def local_executor_enabled(self) -> bool:
+        """Without Redis there is no broker for workers, so the API runs jobs itself"""
+        return not self.REDIS_URL
+    
     @property
     def gee_config(self) -> Optional[dict]:
         """Get Google Earth Engine configuration"""
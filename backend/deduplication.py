@@ -0,0 +1,120 @@
+"""
+Result deduplication for visualization jobs
+Jobs are fingerprinted from everything that determines their output, so an
+identical submission can reuse a completed result or attach to the job that
+is already computing it instead of queueing duplicate work.
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from .config import settings
+from .models import VisualizationJob
+
+# Bump when processor output changes so older results are not reused
+PROCESSOR_VERSION = "1"
+
+# Coordinates are rounded so float noise from the client does not defeat matching
+COORDINATE_PRECISION = 6
+
+
+def normalize_geometry(value: Any) -> Any:
+    """Geometry with coordinates rounded and keys in a stable order"""
+    if isinstance(value, float):
+        return round(value, COORDINATE_PRECISION)
+    if isinstance(value, dict):
+        return {key: normalize_geometry(value[key]) for key in sorted(value)}
+    if isinstance(value, (list, tuple)):
+        return [normalize_geometry(item) for item in value]
+    return value
+
+
+def job_fingerprint(region_name: str, start_date: str, end_date: str, analysis_type: str,
+                    baseline_type: str, baseline_config: Optional[Dict] = None,
+                    geometry: Optional[Dict] = None, region_id: Optional[str] = None,
+                    region_type: Optional[str] = None, visualization_config: Optional[Dict] = None) -> str:
+    """SHA-256 over the normalized job parameters and the processor version"""
+    payload = {
+        'processor_version': PROCESSOR_VERSION,
+        # Predefined regions are identified by id, custom areas by their geometry
+        'region': f"region:{region_id}" if region_id and not geometry else normalize_geometry(geometry),
+        'region_name': region_name,
+        'region_type': region_type,
+        'start_date': start_date,
+        'end_date': end_date,
+        'analysis_type': analysis_type,
+        'baseline_type': baseline_type,
+        'baseline_config': normalize_geometry(baseline_config or {}),
+        'visualization_config': normalize_geometry(visualization_config or {})
+    }
+    canonical = json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def find_reusable_job(db: Session, fingerprint: str, user_id: str) -> Optional[VisualizationJob]:
+    """
+    Most recent job with the fingerprint that user_id's submission can share: one of
+    the user's own jobs still in flight (attached jobs can be cancelled, so other
+    users' are never shared), or a job completed within the retention window with
+    its map file still on disk and its AI commentary finished (a clone copies the
+    statistics once and would keep the pending commentary forever)
+    """
+    cutoff = datetime.utcnow() - timedelta(days=settings.CLEANUP_DAYS)
+    candidates = db.query(VisualizationJob)\
+        .filter(VisualizationJob.fingerprint == fingerprint)\
+        .filter(VisualizationJob.status.in_(['pending', 'running', 'completed']))\
+        .filter(VisualizationJob.created_at >= cutoff)\
+        .order_by(VisualizationJob.created_at.desc())\
+        .limit(5)\
+        .all()
+
+    for job in candidates:
+        if job.status in ('pending', 'running'):
+            if job.user_id == user_id:
+                return job
+            continue
+        if (job.statistics or {}).get('ai_commentary_status') == 'pending':
+            continue
+        if job.map_image_path and os.path.exists(job.map_image_path):
+            return job
+    return None
+
+
+def clone_completed_job(db: Session, source: VisualizationJob, job_id: str, user_id: str,
+                        batch_id: Optional[str] = None) -> VisualizationJob:
+    """New completed job record for user_id that shares the source job's outputs"""
+    now = datetime.utcnow()
+    job = VisualizationJob(
+        id=job_id,
+        user_id=user_id,
+        region_name=source.region_name,
+        geometry=source.geometry,
+        start_date=source.start_date,
+        end_date=source.end_date,
+        analysis_type=source.analysis_type,
+        region_id=source.region_id,
+        region_type=source.region_type,
+        baseline_type=source.baseline_type,
+        baseline_config=source.baseline_config,
+        visualization_config=source.visualization_config,
+        fingerprint=source.fingerprint,
+        queue_class=source.queue_class,
+        batch_id=batch_id,
+        status='completed',
+        progress=100,
+        message=f'Reused result of identical job {source.id}',
+        statistics=source.statistics,
+        map_image_path=source.map_image_path,
+        export_paths=source.export_paths,
+        started_at=now,
+        completed_at=now,
+        processing_time_seconds=0.0
+    )
+    db.add(job)
+    db.commit()
+    return job
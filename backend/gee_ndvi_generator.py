@@ -4,6 +4,31 @@ All print() statements replaced with logger.info() for immediate DigitalOcean co
 Cloud cover calculation updated to use Google Earth Engine's standard S2_CLOUD_PROBABILITY method.
 Authentication middleware integrated for API security.
 Performance timing logs added for deployment speed measurement.
+
+Concurrent serving: Earth Engine calls (getInfo/getMapId) block for seconds. Run under
+gevent workers (gunicorn.conf.py) so each request is a greenlet and hundreds of requests
+can wait on Earth Engine cooperatively in one process. GEE endpoints run inline behind
+per-endpoint concurrency limits. Do not use --preload: the app must be imported after
+the gevent worker has monkey-patched threading and sockets.
+
+    gunicorn -c gunicorn.conf.py gee_ndvi_generator:app
+
+GEE_LIMIT_<ENDPOINT>       in-flight limit per endpoint (TILES, TIMESERIES, BATCH, INSIGHT, WARMUP)
+GEE_QUEUE_TIMEOUT_SECONDS  max wait for a slot before answering 503 (default 30)
+Queue depth and in-flight counts are exposed on /api/concurrency.
+
+Field warm-up: known fields (a GeoJSON FeatureCollection, e.g. the export behind the
+dashboard's api/get_fields.php) are pre-computed into the response cache for the
+dashboard's default date range, so the first load of the day is a cache hit.
+
+WARMUP_FIELDS_URL / WARMUP_FIELDS_FILE  field source for scheduled runs
+WARMUP_INTERVAL_MINUTES    check interval for new imagery, 0 disables the schedule (default 0)
+WARMUP_TILE_INDICES        tile indices to warm (default RGB,NDVI)
+WARMUP_TIMESERIES_INDEX    time series index to warm, empty to skip (default NDVI)
+WARMUP_DATE_RANGE_DAYS     must match the dashboard default range (default 14)
+WARMUP_CONCURRENCY         parallel warm-up computations (default 4)
+Progress is reported on /api/warmup/status. Caches are per process, so each worker
+warms its own; run one gevent worker per instance to warm once.
 """
 
 import os
@@ -11,11 +36,10 @@ import json
 import ee
 import traceback
 import hashlib
-import geohash2
-import statistics
 import logging
 import sys
 import time
+import urllib.request
 from datetime import datetime, timedelta
 from flask import Flask, request, jsonify
 from flask_cors import CORS
@@ -24,7 +48,24 @@ from openai import OpenAI
 from dotenv import load_dotenv
 from cachetools import TTLCache
 import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from functools import wraps
 from middleware.auth import require_auth, log_authentication_status
+from agronomy.emergence import (
+    detect_wheat_winter_emergence,
+    detect_primary_emergence_and_planting,
+    detect_tillage_replanting_events,
+    calculate_change_rates
+)
+from agronomy.series import (
+    as_index_series,
+    as_rainfall_series,
+    column_values,
+    decode_columns
+)
+from agronomy.spatial_priors import spatial_prior_store
+from agronomy.insight_cache import insight_cache, insight_fingerprint
+from agronomy.narrative import build_field_narrative
 
 # Configure real-time logging for Gunicorn multi-worker setup
 logging.basicConfig(
@@ -68,14 +109,70 @@ log_authentication_status()
 
 # Initialize OpenAI client
 openai_client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
+INSIGHT_MODEL = "gpt-4o-mini"
+INSIGHT_PROMPT_VERSION = "2"  # bump when the insight prompts change so cached text is not reused
+# Seconds the report waits for the LLM before answering with the template narrative.
+# The LLM call keeps running in the background and fills the insight cache, so the
+# next identical request gets the LLM text. 0 always answers with the template first.
+INSIGHT_LATENCY_BUDGET_SECONDS = float(os.environ.get("INSIGHT_LATENCY_BUDGET_SECONDS", 8))
+insight_executor = ThreadPoolExecutor(max_workers=int(os.environ.get("INSIGHT_EXECUTOR_WORKERS", 8)), thread_name_prefix="insight")
 
 # In-memory caching with TTL (Time To Live)
 cache = TTLCache(maxsize=1000, ttl=3600)  # Cache for 1 hour, max 1000 items
 cache_lock = threading.Lock()
 
-# Geohash spatial adaptation cache for wheat emergence patterns
-spatial_cache = TTLCache(maxsize=500, ttl=86400)  # 24 hour TTL for spatial patterns
-spatial_cache_lock = threading.Lock()
+# Per-field observation store for incremental time series, keyed by image date.
+# Past Sentinel-2 observations never change, so they are kept much longer than responses.
+OBSERVATION_STORE_TTL = 30 * 86400  # 30 days
+OBSERVATION_SETTLE_DAYS = 5         # recent ranges are refetched until the archive settles
+observation_store = TTLCache(maxsize=2000, ttl=OBSERVATION_STORE_TTL)
+observation_store_lock = threading.Lock()
+
+# Batch time series limits
+BATCH_MAX_FIELDS = 500
+BATCH_MISSING_VALUE = -9999  # null placeholder that keeps reduceColumns lists aligned
+
+# Per-endpoint concurrency limits for blocking GEE calls
+GEE_QUEUE_TIMEOUT_SECONDS = float(os.environ.get("GEE_QUEUE_TIMEOUT_SECONDS", 30))
+GEE_ENDPOINT_LIMITS = {
+    "tiles": int(os.environ.get("GEE_LIMIT_TILES", 32)),
+    "timeseries": int(os.environ.get("GEE_LIMIT_TIMESERIES", 32)),
+    "batch": int(os.environ.get("GEE_LIMIT_BATCH", 4)),
+    "insight": int(os.environ.get("GEE_LIMIT_INSIGHT", 16)),
+    "warmup": int(os.environ.get("GEE_LIMIT_WARMUP", 2))
+}
+gee_endpoint_semaphores = {name: threading.BoundedSemaphore(limit) for name, limit in GEE_ENDPOINT_LIMITS.items()}
+gee_endpoint_stats = {
+    name: {"in_flight": 0, "waiting": 0, "completed": 0, "rejected": 0, "max_wait_seconds": 0.0}
+    for name in GEE_ENDPOINT_LIMITS
+}
+gee_endpoint_stats_lock = threading.Lock()
+
+# Field warm-up: pre-compute dashboard responses for known fields
+WARMUP_FIELDS_URL = os.environ.get("WARMUP_FIELDS_URL")
+WARMUP_FIELDS_FILE = os.environ.get("WARMUP_FIELDS_FILE")
+WARMUP_INTERVAL_MINUTES = float(os.environ.get("WARMUP_INTERVAL_MINUTES", 0))
+WARMUP_TILE_INDICES = [i.strip() for i in os.environ.get("WARMUP_TILE_INDICES", "RGB,NDVI").split(",") if i.strip()]
+WARMUP_TIMESERIES_INDEX = os.environ.get("WARMUP_TIMESERIES_INDEX", "NDVI").strip()
+WARMUP_DATE_RANGE_DAYS = int(os.environ.get("WARMUP_DATE_RANGE_DAYS", 14))
+WARMUP_CONCURRENCY = int(os.environ.get("WARMUP_CONCURRENCY", 4))
+WARMUP_MAX_FIELDS = int(os.environ.get("WARMUP_MAX_FIELDS", 2000))
+warmup_state = {
+    "status": "idle",
+    "trigger": None,
+    "started_at": None,
+    "finished_at": None,
+    "fields": 0,
+    "total_tasks": 0,
+    "completed_tasks": 0,
+    "cache_hits": 0,
+    "failed_tasks": 0,
+    "date_range": None,
+    "latest_image_date": None,
+    "last_error": None
+}
+warmup_state_lock = threading.Lock()
+warmup_scheduler_pid = None
 
 # FINAL SCIENTIFIC COLOR AND RANGE CONFIGURATION FOR AFRICAN CROPLANDS
 INDEX_CONFIGS = {
@@ -115,32 +212,6 @@ INDEX_CONFIGS = {
     }
 }
 
-# Define crop-specific emergence windows (in days)
-EMERGENCE_WINDOWS = {
-    "Maize": (6, 10),
-    "Soyabeans": (7, 11),
-    "Sorghum": (6, 10),
-    "Cotton": (5, 9),
-    "Groundnuts": (6, 10),
-    "Barley": (7, 11),
-    "Wheat": (3,6),
-    "Millet": (4, 8),
-    "Tobacco": (7, 11)  # For nursery emergence
-}
-
-# Constants for emergence detection (existing)
-EMERGENCE_THRESHOLD = 0.2
-DEFAULT_EMERGENCE_WINDOW = (5, 10)  # Default for unknown crops
-SIGNIFICANT_RAINFALL = 10  # mm, threshold for significant rainfall
-
-# NEW: Constants for wheat winter detection
-THRESHOLD_WHEAT_WINTER = 0.15      # lower absolute NDVI trigger
-MIN_SLOPE_DELTA = 0.04             # minimum NDVI rise
-MAX_SLOPE_DAYS = 10                # window to realize the rise
-CLOUD_CANDIDATE_MAX = 30           # % cloud cap at candidate emergence
-SMOOTH_WINDOW = 3                  # 3-point median smoothing
-NDVI_AMPLITUDE_MIN = 0.15          # geometry/season sanity check
-
 # Global variable to track GEE initialization
 gee_initialization_time = None
 gee_initialized = False
@@ -291,371 +362,89 @@ def calculate_dynamic_range(index_image, polygon, index_type):
         default_min, default_max = config["range"]
         return default_min, default_max, None, None
 
-def smooth_ndvi_series(ndvi_data, window=SMOOTH_WINDOW):
-    """Apply 3-point median smoothing to NDVI series"""
-    if len(ndvi_data) < window:
-        return ndvi_data
-    
-    smoothed_data = []
-    sorted_data = sorted(ndvi_data, key=lambda x: x['date'])
-    
-    for i in range(len(sorted_data)):
-        if i == 0:
-            # First point: use original value
-            smoothed_data.append(sorted_data[i].copy())
-        elif i == len(sorted_data) - 1:
-            # Last point: use original value
-            smoothed_data.append(sorted_data[i].copy())
-        else:
-            # Middle points: median of 3-point window
-            window_values = [
-                sorted_data[i-1]['ndvi'],
-                sorted_data[i]['ndvi'],
-                sorted_data[i+1]['ndvi']
-            ]
-            smoothed_value = statistics.median(window_values)
-            
-            smoothed_point = sorted_data[i].copy()
-            smoothed_point['ndvi'] = smoothed_value
-            smoothed_data.append(smoothed_point)
+def attach_cloud_probability(collection, polygon, start_date, end_date):
+    """
+    Attach the matching S2_CLOUD_PROBABILITY image to every Sentinel-2 image
+    with a single ee.Join.saveFirst on system:index, instead of filtering the
+    whole cloud probability collection once per image.
+    Images without a match are kept (outer join) and fall back to QA60.
+    """
+    cloud_prob_collection = (
+        ee.ImageCollection('COPERNICUS/S2_CLOUD_PROBABILITY')
+        .filterBounds(polygon)
+        .filterDate(start_date, end_date)
+    )
     
-    return smoothed_data
-
-def is_winter_season(start_date, end_date, coordinates):
-    """Check if analysis period overlaps with winter season (Apr-Aug for Southern Hemisphere)"""
-    try:
-        start_obj = datetime.strptime(start_date, '%Y-%m-%d')
-        end_obj = datetime.strptime(end_date, '%Y-%m-%d')
-        
-        # Determine hemisphere based on latitude
-        if coordinates and len(coordinates) > 0 and len(coordinates[0]) > 0:
-            lat = coordinates[0][0][1]  # Get latitude from first coordinate
-            is_southern_hemisphere = lat < 0
-        else:
-            # Default to Southern Hemisphere for Zimbabwe
-            is_southern_hemisphere = True
-        
-        if is_southern_hemisphere:
-            # Winter months in Southern Hemisphere: April to August
-            winter_months = [4, 5, 6, 7, 8]
-        else:
-            # Winter months in Northern Hemisphere: November to March
-            winter_months = [11, 12, 1, 2, 3]
-        
-        # Check if any month in the date range overlaps with winter
-        current_date = start_obj
-        while current_date <= end_obj:
-            if current_date.month in winter_months:
-                return True
-            # Move to next month
-            if current_date.month == 12:
-                current_date = current_date.replace(year=current_date.year + 1, month=1)
-            else:
-                current_date = current_date.replace(month=current_date.month + 1)
-        
-        return False
-        
-    except Exception as e:
-        logger.error(f"Error determining winter season: {e}")
-        return False
-
-def get_geohash_key(coordinates, crop, season_year):
-    """Generate geohash key for spatial adaptation"""
-    try:
-        # Get center point of polygon
-        if coordinates and len(coordinates) > 0 and len(coordinates[0]) > 0:
-            lats = [coord[1] for coord in coordinates[0]]
-            lons = [coord[0] for coord in coordinates[0]]
-            center_lat = sum(lats) / len(lats)
-            center_lon = sum(lons) / len(lons)
-            
-            # Generate geohash at precision 5 (~5km)
-            geohash = geohash2.encode(center_lat, center_lon, precision=5)
-            key = f"{geohash}_{crop}_{season_year}"
-            return geohash, key
-        
-        return None, None
-        
-    except Exception as e:
-        logger.error(f"Error generating geohash key: {e}")
-        return None, None
-
-def get_spatial_prior(geohash_key):
-    """Get emergence date cluster prior from spatial cache"""
-    try:
-        with spatial_cache_lock:
-            if geohash_key in spatial_cache:
-                return spatial_cache[geohash_key]
-        return None
-    except Exception as e:
-        logger.error(f"Error getting spatial prior: {e}")
-        return None
-
-def update_spatial_prior(geohash_key, emergence_date):
-    """Update spatial cache with new emergence detection"""
-    try:
-        with spatial_cache_lock:
-            if geohash_key not in spatial_cache:
-                spatial_cache[geohash_key] = []
-            
-            # Add new emergence date
-            spatial_cache[geohash_key].append(emergence_date)
-            
-            # Keep only recent detections (max 10)
-            if len(spatial_cache[geohash_key]) > 10:
-                spatial_cache[geohash_key] = spatial_cache[geohash_key][-10:]
-                
-    except Exception as e:
-        logger.error(f"Error updating spatial prior: {e}")
-
-def apply_spatial_nudge(candidate_date, geohash_key):
-    """Apply spatial nudging if emergence is ambiguous"""
-    try:
-        prior_dates = get_spatial_prior(geohash_key)
-        if not prior_dates or len(prior_dates) < 2:
-            return candidate_date, False
-        
-        # Calculate cluster median
-        date_objects = []
-        for date_str in prior_dates:
-            try:
-                date_objects.append(datetime.strptime(date_str, '%Y-%m-%d'))
-            except:
-                continue
-        
-        if len(date_objects) < 2:
-            return candidate_date, False
-        
-        # Get median date
-        date_objects.sort()
-        median_idx = len(date_objects) // 2
-        median_date = date_objects[median_idx]
-        
-        # Check if candidate is within ±3 days of median
-        candidate_obj = datetime.strptime(candidate_date, '%Y-%m-%d')
-        days_diff = abs((candidate_obj - median_date).days)
-        
-        if days_diff <= 3:
-            # Nudge toward median
-            nudged_date = median_date.strftime('%Y-%m-%d')
-            return nudged_date, True
-        
-        return candidate_date, False
-        
-    except Exception as e:
-        logger.error(f"Error applying spatial nudge: {e}")
-        return candidate_date, False
+    join = ee.Join.saveFirst(matchKey='cloud_probability', outer=True)
+    joined = join.apply(
+        primary=collection,
+        secondary=cloud_prob_collection,
+        condition=ee.Filter.equals(leftField='system:index', rightField='system:index')
+    )
+    return ee.ImageCollection(joined)
 
-def detect_wheat_winter_emergence(ndvi_data, coordinates=None, force_winter_detector=False):
+def calculate_field_cloud(image, polygon):
     """
-    Wheat-specific winter emergence detection using remote sensing only.
-    Returns emergence_date, confidence, and metadata.
+    Field-level cloud percentage for an image prepared by attach_cloud_probability.
+    Returns (field_cloud, cloud_prob_exists) as server-side values.
     """
-    try:
-        logger.info("=== WHEAT WINTER EMERGENCE DETECTION ===")
-        
-        # Check if winter detector should be used
-        if not force_winter_detector:
-            start_date = min(item['date'] for item in ndvi_data)
-            end_date = max(item['date'] for item in ndvi_data)
-            
-            if not is_winter_season(start_date, end_date, coordinates):
-                logger.info("Not winter season, falling back to standard detection")
-                return None, None, {}
-        
-        # Validate minimum data requirements
-        if len(ndvi_data) < 4:
-            return None, "low", {
-                "qa": {
-                    "valid": False,
-                    "reason": "sparse_data",
-                    "min_points": len(ndvi_data)
-                }
-            }
-        
-        # Apply 3-point median smoothing
-        smoothed_data = smooth_ndvi_series(ndvi_data, SMOOTH_WINDOW)
-        logger.info(f"Applied smoothing to {len(smoothed_data)} points")
-        
-        # Calculate NDVI amplitude for sanity check
-        ndvi_values = [item['ndvi'] for item in smoothed_data]
-        ndvi_amplitude = max(ndvi_values) - min(ndvi_values)
-        
-        qa_info = {
-            "valid": True,
-            "ndvi_amplitude": round(ndvi_amplitude, 3),
-            "min_points": len(smoothed_data),
-            "reason": None
-        }
-        
-        # Geometry/season sanity check
-        if ndvi_amplitude < NDVI_AMPLITUDE_MIN:
-            qa_info["valid"] = False
-            qa_info["reason"] = "low_signal"
-            return None, "low", {"qa": qa_info}
-        
-        # Sort by date for chronological scanning
-        sorted_data = sorted(smoothed_data, key=lambda x: x['date'])
-        
-        candidates = []
-        
-        # Scan chronologically for emergence candidates
-        for i in range(len(sorted_data)):
-            current_point = sorted_data[i]
-            current_ndvi = current_point['ndvi']
-            current_date = current_point['date']
-            
-            # Get cloud percentage (prefer field-level, fallback to scene-level)
-            cloud_pct = current_point.get('field_cloud_percentage')
-            if cloud_pct is None:
-                cloud_pct = current_point.get('cloud_percentage', 0)
-                
-            # Skip high cloud candidates
-            if cloud_pct > CLOUD_CANDIDATE_MAX:
-                continue
-            
-            candidate_confidence = "medium"
-            detection_method = None
+    cloud_prob_exists = image.propertyNames().contains('cloud_probability')
+    
+    def calculate_with_probability():
+        # Get probability band of the joined image and calculate mean for the field
+        cloud_prob_image = ee.Image(image.get('cloud_probability'))
+        probability = cloud_prob_image.select('probability').clip(polygon)
+        mean_cloud_prob = probability.reduceRegion(
+            reducer=ee.Reducer.mean(),
+            geometry=polygon,
+            scale=20,
+            maxPixels=1e9
+        ).get('probability')
+        return mean_cloud_prob
+    
+    def calculate_with_qa60():
+        # Fallback to QA60 method
+        band_names = image.bandNames()
+        qa60_exists = band_names.contains('QA60')
+        
+        def qa60_calculation():
+            qa60 = image.select('QA60').clip(polygon)
+            cloud_bit_10 = qa60.bitwiseAnd(1 << 10).gt(0)
+            cloud_bit_11 = qa60.bitwiseAnd(1 << 11).gt(0)
+            cloud_mask = cloud_bit_10.Or(cloud_bit_11)
+            
+            total_pixels = qa60.gte(0).reduceRegion(
+                reducer=ee.Reducer.count(),
+                geometry=polygon,
+                scale=20,
+                maxPixels=1e9
+            ).get('QA60')
             
-            # Rule 1: Crossing rule - smoothed NDVI crosses ≥ 0.15 from below
-            if i > 0:
-                prev_ndvi = sorted_data[i-1]['ndvi']
-                if prev_ndvi < THRESHOLD_WHEAT_WINTER and current_ndvi >= THRESHOLD_WHEAT_WINTER:
-                    candidates.append({
-                        'date': current_date,
-                        'method': 'crossing',
-                        'confidence': 'high',
-                        'cloud_pct': cloud_pct,
-                        'ndvi_value': current_ndvi,
-                        'prev_ndvi': prev_ndvi
-                    })
-                    logger.info(f"Crossing candidate: {current_date}, NDVI: {prev_ndvi:.3f} -> {current_ndvi:.3f}")
-                    continue
+            cloudy_pixels = cloud_mask.reduceRegion(
+                reducer=ee.Reducer.sum(),
+                geometry=polygon,
+                scale=20,
+                maxPixels=1e9
+            ).get('QA60')
             
-            # Rule 2: Slope rule - rise ≥ 0.04 within ≤ 10 days from low baseline
-            if current_ndvi < THRESHOLD_WHEAT_WINTER:
-                continue
-                
-            # Look back for slope calculation
-            for j in range(max(0, i - MAX_SLOPE_DAYS), i):
-                baseline_point = sorted_data[j]
-                baseline_ndvi = baseline_point['ndvi']
-                
-                if baseline_ndvi >= THRESHOLD_WHEAT_WINTER:
-                    continue
-                    
-                # Calculate days between points
-                try:
-                    baseline_date = datetime.strptime(baseline_point['date'], '%Y-%m-%d')
-                    current_date_obj = datetime.strptime(current_date, '%Y-%m-%d')
-                    days_diff = (current_date_obj - baseline_date).days
-                    
-                    if days_diff <= MAX_SLOPE_DAYS and days_diff > 0:
-                        ndvi_rise = current_ndvi - baseline_ndvi
-                        
-                        if ndvi_rise >= MIN_SLOPE_DELTA:
-                            candidates.append({
-                                'date': current_date,
-                                'method': 'slope',
-                                'confidence': 'medium',
-                                'cloud_pct': cloud_pct,
-                                'ndvi_value': current_ndvi,
-                                'baseline_ndvi': baseline_ndvi,
-                                'rise': ndvi_rise,
-                                'days': days_diff
-                            })
-                            logger.info(f"Slope candidate: {current_date}, rise: {ndvi_rise:.3f} over {days_diff} days")
-                            break
-                            
-                except Exception as e:
-                    logger.error(f"Error calculating slope: {e}")
-                    continue
-        
-        # Select best candidate (earliest valid wins)
-        if not candidates:
-            logger.info("No candidates found, falling back to significant rise heuristic")
-            fallback_result = detect_significant_rise_fallback(sorted_data)
-            if fallback_result:
-                return fallback_result['date'], "low", {
-                    "qa": qa_info,
-                    "fallback_used": True,
-                    "detection_method": "significant_rise_fallback"
-                }
-            return None, "low", {"qa": qa_info}
-        
-        # Sort candidates by date and pick earliest
-        candidates.sort(key=lambda x: x['date'])
-        best_candidate = candidates[0]
-        
-        emergence_date = best_candidate['date']
-        confidence = best_candidate['confidence']
-        
-        # Prepare spatial adaptation
-        geohash = None
-        geohash_key = None
-        cluster_prior_used = False
-        
-        if coordinates:
-            try:
-                season_year = datetime.strptime(emergence_date, '%Y-%m-%d').year
-                geohash, geohash_key = get_geohash_key(coordinates, 'Wheat', season_year)
-                
-                # Apply spatial nudging if ambiguous
-                if confidence == "medium" and len(candidates) > 1:
-                    nudged_date, used_prior = apply_spatial_nudge(emergence_date, geohash_key)
-                    if used_prior:
-                        emergence_date = nudged_date
-                        cluster_prior_used = True
-                        logger.info(f"Applied spatial nudge to: {emergence_date}")
-                
-                # Update spatial cache with this detection
-                update_spatial_prior(geohash_key, emergence_date)
-                
-            except Exception as e:
-                logger.error(f"Error in spatial adaptation: {e}")
-        
-        metadata = {
-            "qa": qa_info,
-            "detection_method": best_candidate['method'],
-            "cloud_at_emergence_pct": best_candidate['cloud_pct'],
-            "used_field_cloud": 'field_cloud_percentage' in sorted_data[0],
-            "spatial_adaptation": {
-                "geohash": geohash,
-                "cluster_prior_used": cluster_prior_used
-            },
-            "candidates_found": len(candidates)
-        }
-        
-        logger.info(f"Selected emergence: {emergence_date}, confidence: {confidence}")
-        return emergence_date, confidence, metadata
+            cloud_percentage = ee.Algorithms.If(
+                ee.Number(total_pixels).gt(0),
+                ee.Number(cloudy_pixels).divide(ee.Number(total_pixels)).multiply(100),
+                0
+            )
+            return cloud_percentage
         
-    except Exception as e:
-        logger.error(f"Error in wheat winter emergence detection: {e}")
-        return None, "low", {
-            "qa": {
-                "valid": False,
-                "reason": "processing_error",
-                "error": str(e)
-            }
-        }
-
-def detect_significant_rise_fallback(sorted_data):
-    """Fallback method using significant NDVI rise"""
-    try:
-        for i in range(1, len(sorted_data)):
-            current_ndvi = sorted_data[i]['ndvi']
-            prev_ndvi = sorted_data[i-1]['ndvi']
-            
-            # Look for significant rise from low values
-            if prev_ndvi < 0.15 and current_ndvi > prev_ndvi + 0.05:
-                return {
-                    'date': sorted_data[i]['date'],
-                    'ndvi_rise': current_ndvi - prev_ndvi
-                }
-        return None
-    except Exception as e:
-        logger.error(f"Error in fallback detection: {e}")
-        return None
+        # Return QA60 calculation if QA60 exists, otherwise return 0
+        return ee.Algorithms.If(qa60_exists, qa60_calculation(), 0)
+    
+    # Use cloud probability if available, otherwise fallback to QA60
+    field_cloud = ee.Algorithms.If(
+        cloud_prob_exists,
+        calculate_with_probability(),
+        calculate_with_qa60()
+    )
+    
+    return field_cloud, cloud_prob_exists
 
 def calculate_collection_cloud_cover(collection, polygon, start_date, end_date):
     """
@@ -664,85 +453,14 @@ def calculate_collection_cloud_cover(collection, polygon, start_date, end_date):
     try:
         logger.info("Calculating collection-wide cloud cover using S2_CLOUD_PROBABILITY")
         
-        # Get cloud probability collection for the same time period
-        cloud_prob_collection = (
-            ee.ImageCollection('COPERNICUS/S2_CLOUD_PROBABILITY')
-            .filterBounds(polygon)
-            .filterDate(start_date, end_date)
-        )
-        
         # Function to calculate cloud cover for each image
         def add_cloud_cover(image):
-            system_index = image.get('system:index')
-            
-            # Find matching cloud probability image
-            cloud_prob_filtered = cloud_prob_collection.filter(
-                ee.Filter.eq('system:index', system_index)
-            )
-            
-            # Check if any cloud probability images exist for this index
-            cloud_prob_size = cloud_prob_filtered.size()
-            cloud_prob_exists = cloud_prob_size.gt(0)
-            
-            def calculate_with_probability():
-                # Get the first (and should be only) matching cloud probability image
-                cloud_prob_image = cloud_prob_filtered.first()
-                # Get probability band and calculate mean for the field
-                probability = cloud_prob_image.select('probability').clip(polygon)
-                mean_cloud_prob = probability.reduceRegion(
-                    reducer=ee.Reducer.mean(),
-                    geometry=polygon,
-                    scale=20,
-                    maxPixels=1e9
-                ).get('probability')
-                return mean_cloud_prob
-            
-            def calculate_with_qa60():
-                # Fallback to QA60 method
-                band_names = image.bandNames()
-                qa60_exists = band_names.contains('QA60')
-                
-                def qa60_calculation():
-                    qa60 = image.select('QA60').clip(polygon)
-                    cloud_bit_10 = qa60.bitwiseAnd(1 << 10).gt(0)
-                    cloud_bit_11 = qa60.bitwiseAnd(1 << 11).gt(0)
-                    cloud_mask = cloud_bit_10.Or(cloud_bit_11)
-                    
-                    total_pixels = qa60.gte(0).reduceRegion(
-                        reducer=ee.Reducer.count(),
-                        geometry=polygon,
-                        scale=20,
-                        maxPixels=1e9
-                    ).get('QA60')
-                    
-                    cloudy_pixels = cloud_mask.reduceRegion(
-                        reducer=ee.Reducer.sum(),
-                        geometry=polygon,
-                        scale=20,
-                        maxPixels=1e9
-                    ).get('QA60')
-                    
-                    cloud_percentage = ee.Algorithms.If(
-                        ee.Number(total_pixels).gt(0),
-                        ee.Number(cloudy_pixels).divide(ee.Number(total_pixels)).multiply(100),
-                        0
-                    )
-                    return cloud_percentage
-                
-                # Return QA60 calculation if QA60 exists, otherwise return 0
-                return ee.Algorithms.If(qa60_exists, qa60_calculation(), 0)
-            
-            # Use cloud probability if available, otherwise fallback to QA60
-            field_cloud = ee.Algorithms.If(
-                cloud_prob_exists,
-                calculate_with_probability(),
-                calculate_with_qa60()
-            )
-            
+            field_cloud, _ = calculate_field_cloud(image, polygon)
             return image.set('field_cloud', field_cloud)
         
-        # Map function over collection and get mean cloud cover
-        collection_with_cloud = collection.map(add_cloud_cover)
+        # Join cloud probability once, then map over collection
+        collection_with_prob = attach_cloud_probability(collection, polygon, start_date, end_date)
+        collection_with_cloud = collection_with_prob.map(add_cloud_cover)
         
         # Calculate average cloud cover across all images
         avg_cloud_cover = collection_with_cloud.aggregate_mean('field_cloud')
@@ -753,8 +471,27 @@ def calculate_collection_cloud_cover(collection, polygon, start_date, end_date):
         logger.error(f"Error calculating collection cloud cover: {e}")
         return None
 
-def get_optimized_collection(polygon, start_date, end_date, limit_images=True):
-    """Get optimized Sentinel-2 collection with smart cloud filtering and pre-sorting"""
+# Fallback thresholds tried in order when the progressive threshold leaves no images
+CLOUD_FALLBACK_THRESHOLDS = (50, 80)
+
+def select_cloud_threshold(total_size):
+    """Progressive cloud threshold and image cap for a collection of the given size"""
+    if total_size > 50:
+        return 10, 15
+    elif total_size > 20:
+        return 20, 20
+    elif total_size > 10:
+        return 30, 25
+    else:
+        return 80, total_size
+
+def get_optimized_collection(polygon, start_date, end_date, limit_images=True, include_cloud_cover=True):
+    """
+    Get optimized Sentinel-2 collection with smart cloud filtering and pre-sorting.
+    Callers that compute their own per-image cloud cover can skip the
+    collection-wide average. Returns
+    (collection, collection_size, avg_cloud_cover, cloud_threshold).
+    """
     
     # Start with base collection
     base_collection = (
@@ -768,21 +505,10 @@ def get_optimized_collection(polygon, start_date, end_date, limit_images=True):
     logger.info(f"Total available images: {total_size}")
     
     if total_size == 0:
-        return None, 0, None
+        return None, 0, None, None
     
     # Smart cloud filtering with progressive thresholds
-    if total_size > 50:
-        cloud_threshold = 10
-        max_images = 15
-    elif total_size > 20:
-        cloud_threshold = 20
-        max_images = 20
-    elif total_size > 10:
-        cloud_threshold = 30
-        max_images = 25
-    else:
-        cloud_threshold = 80
-        max_images = total_size
+    cloud_threshold, max_images = select_cloud_threshold(total_size)
     
     # Apply cloud filtering and pre-sort by cloud percentage
     collection = (
@@ -801,7 +527,7 @@ def get_optimized_collection(polygon, start_date, end_date, limit_images=True):
     # Fallback if no images after filtering
     if collection_size == 0:
         logger.info("No images found with initial cloud threshold, trying fallback...")
-        for fallback_threshold in [50, 80]:
+        for fallback_threshold in CLOUD_FALLBACK_THRESHOLDS:
             collection = (
                 base_collection
                 .filter(ee.Filter.lt("CLOUDY_PIXEL_PERCENTAGE", fallback_threshold))
@@ -810,12 +536,13 @@ def get_optimized_collection(polygon, start_date, end_date, limit_images=True):
             )
             collection_size = collection.size().getInfo()
             if collection_size > 0:
+                cloud_threshold = fallback_threshold
                 logger.info(f"Fallback successful: {collection_size} images with cloud < {fallback_threshold}%")
                 break
     
     # Calculate collection-wide cloud cover using new method
     avg_cloud_cover = None
-    if collection_size > 0:
+    if collection_size > 0 and include_cloud_cover:
         try:
             avg_cloud_cover_calc = calculate_collection_cloud_cover(collection, polygon, start_date, end_date)
             if avg_cloud_cover_calc is not None:
@@ -824,7 +551,53 @@ def get_optimized_collection(polygon, start_date, end_date, limit_images=True):
         except Exception as e:
             logger.error(f"Error calculating collection cloud cover: {e}")
     
-    return collection, collection_size, avg_cloud_cover
+    return collection, collection_size, avg_cloud_cover, cloud_threshold
+
+def limit_gee_concurrency(endpoint):
+    """
+    Run a GEE-bound view while holding one of the endpoint's concurrency slots.
+    The view runs in the request's own thread (a greenlet under gevent workers).
+    Requests that cannot get a slot within the queue timeout get a 503.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            semaphore = gee_endpoint_semaphores[endpoint]
+            stats = gee_endpoint_stats[endpoint]
+            
+            with gee_endpoint_stats_lock:
+                stats["waiting"] += 1
+            wait_start_time = time.perf_counter()
+            acquired = semaphore.acquire(timeout=GEE_QUEUE_TIMEOUT_SECONDS)
+            wait_elapsed = time.perf_counter() - wait_start_time
+            with gee_endpoint_stats_lock:
+                stats["waiting"] -= 1
+                stats["max_wait_seconds"] = max(stats["max_wait_seconds"], wait_elapsed)
+                if acquired:
+                    stats["in_flight"] += 1
+                else:
+                    stats["rejected"] += 1
+            
+            if not acquired:
+                logger.warning(f"[TIMING] {endpoint} rejected after waiting {wait_elapsed:.3f}s for a slot")
+                return jsonify({
+                    "success": False,
+                    "error": "Server busy, please retry shortly",
+                    "retry_after_seconds": 5
+                }), 503, {"Retry-After": "5"}
+            
+            if wait_elapsed > 0.05:
+                logger.info(f"[TIMING] {endpoint} queued for {wait_elapsed:.3f}s")
+            
+            try:
+                return view(*args, **kwargs)
+            finally:
+                semaphore.release()
+                with gee_endpoint_stats_lock:
+                    stats["in_flight"] -= 1
+                    stats["completed"] += 1
+        return wrapper
+    return decorator
 
 @app.route("/")
 def index():
@@ -843,7 +616,7 @@ def health_check():
                 "gee_initialized": False,
                 "gee_initializing": True,
                 "cache_size": len(cache),
-                "spatial_cache_size": len(spatial_cache),
+                "spatial_cache_size": spatial_prior_store.size(),
                 "supported_indices": ["NDVI", "EVI", "SAVI", "NDMI", "NDWI", "RGB"]
             }), 200
         
@@ -864,7 +637,7 @@ def health_check():
             "gee_initializing": False,
             "gee_init_time": gee_initialization_time.isoformat() if gee_initialization_time else None,
             "cache_size": len(cache),
-            "spatial_cache_size": len(spatial_cache),
+            "spatial_cache_size": spatial_prior_store.size(),
             "supported_indices": ["NDVI", "EVI", "SAVI", "NDMI", "NDWI", "RGB"]
         })
         
@@ -885,11 +658,29 @@ def ping():
         "message": "Pong",
         "timestamp": datetime.now().isoformat(),
         "cache_size": len(cache),
-        "spatial_cache_size": len(spatial_cache)
+        "spatial_cache_size": spatial_prior_store.size()
+    })
+
+@app.route("/api/concurrency", methods=["GET"])
+def concurrency_metrics():
+    """In-flight and queue-depth metrics for the GEE endpoint limits"""
+    with gee_endpoint_stats_lock:
+        endpoints = {
+            name: dict(stats, limit=GEE_ENDPOINT_LIMITS[name])
+            for name, stats in gee_endpoint_stats.items()
+        }
+    return jsonify({
+        "success": True,
+        "timestamp": datetime.now().isoformat(),
+        "queue_timeout_seconds": GEE_QUEUE_TIMEOUT_SECONDS,
+        "total_in_flight": sum(stats["in_flight"] for stats in endpoints.values()),
+        "total_waiting": sum(stats["waiting"] for stats in endpoints.values()),
+        "endpoints": endpoints
     })
 
 @app.route("/api/warmup", methods=["POST"])
 @require_auth
+@limit_gee_concurrency("warmup")
 def warmup():
     """Dedicated warmup endpoint"""
     try:
@@ -912,6 +703,22 @@ def warmup():
                     "timestamp": datetime.now().isoformat()
                 }), 500
         
+        # Optionally pre-compute dashboard responses for fields in the background
+        data = request.get_json(silent=True) or {}
+        prewarm = None
+        if data.get("fields") is not None or data.get("prewarm"):
+            try:
+                if data.get("fields") is not None:
+                    fields = parse_warmup_fields(data["fields"])
+                else:
+                    fields = load_configured_warmup_fields()
+            except ValueError as e:
+                return jsonify({"success": False, "message": str(e)}), 400
+            started = start_field_warmup(fields, "request") if fields else False
+            prewarm = {"started": started, "fields": len(fields)}
+            if fields and not started:
+                prewarm["message"] = "A warm-up run is already in progress"
+        
         # Test a simple Sentinel-2 operation to warm up
         logger.info("Warming up with test Sentinel-2 query...")
         start_time = datetime.now()
@@ -929,7 +736,7 @@ def warmup():
         warmup_duration = (datetime.now() - start_time).total_seconds()
         logger.info(f"Warmup completed in {warmup_duration:.2f} seconds")
         
-        return jsonify({
+        response = {
             "success": True,
             "message": f"Backend warmed up successfully.",
             "warmup_duration_seconds": warmup_duration,
@@ -937,7 +744,10 @@ def warmup():
             "gee_initialized": True,
             "cache_size": len(cache),
             "supported_indices": ["NDVI", "EVI", "SAVI", "NDMI", "NDWI", "RGB"]
-        })
+        }
+        if prewarm is not None:
+            response["prewarm"] = prewarm
+        return jsonify(response)
         
     except Exception as e:
         logger.error(f"Warmup error: {str(e)}")
@@ -947,454 +757,97 @@ def warmup():
             "timestamp": datetime.now().isoformat()
         }), 500
 
-# MODIFIED: Enhanced primary emergence detection with wheat winter path
-def detect_primary_emergence_and_planting(ndvi_data, crop_type, irrigated, rainfall_data=None, coordinates=None, force_winter_detector=False):
-    """
-    Detects the FIRST emergence event and estimates the primary planting window.
-    Now includes wheat-specific winter detection path.
-    """
-    logger.info(f"=== PRIMARY EMERGENCE DETECTION for {crop_type} ===")
-    
-    # NEW: Wheat winter detection path
-    if crop_type.lower() == 'wheat':
-        logger.info("Attempting wheat-specific winter detection...")
-        wheat_emergence, wheat_confidence, wheat_metadata = detect_wheat_winter_emergence(
-            ndvi_data, coordinates, force_winter_detector
-        )
+@app.route("/api/warmup/status", methods=["GET"])
+@require_auth
+def warmup_status():
+    """Progress of the current or last field warm-up run"""
+    with warmup_state_lock:
+        state = dict(warmup_state)
+    state["progress_pct"] = round(100 * state["completed_tasks"] / state["total_tasks"], 1) if state["total_tasks"] else None
+    state["scheduled"] = WARMUP_INTERVAL_MINUTES > 0
+    return jsonify({"success": True, "timestamp": datetime.now().isoformat(), "warmup": state})
+
+def calculate_std_dev(values):
+    if not values:
+        return 0
+    mean = sum(values) / len(values)
+    variance = sum((x - mean) ** 2 for x in values) / len(values)
+    return variance ** 0.5
+
+@app.route("/api/agronomic_insight", methods=["POST"])
+@require_auth
+@limit_gee_concurrency("insight")
+def generate_agronomic_report():
+    try:
+        if not gee_initialized:
+            return jsonify({
+                "success": False,
+                "error": "GEE not initialized"
+            }), 500
         
-        if wheat_emergence:
-            logger.info(f"Wheat winter detector succeeded: {wheat_emergence}")
-            
-            # Calculate planting window (keep 5-day width)
-            emergence_window = EMERGENCE_WINDOWS.get(crop_type, DEFAULT_EMERGENCE_WINDOW)
-            emergence_date_obj = datetime.strptime(wheat_emergence, '%Y-%m-%d')
-            planting_window_end = (emergence_date_obj - timedelta(days=emergence_window[0])).strftime('%Y-%m-%d')
-            planting_window_start = (emergence_date_obj - timedelta(days=emergence_window[1])).strftime('%Y-%m-%d')
-            
-            # For rainfed fields, check for rainfall events
-            rainfall_adjusted_planting = None
-            if irrigated == "No" and rainfall_data:
-                significant_rainfall_events = []
-                planting_start_obj = datetime.strptime(planting_window_start, '%Y-%m-%d')
-                
-                for event in rainfall_data:
-                    event_date = event.get('date')
-                    if not event_date:
-                        continue
-                    
-                    try:
-                        event_date_obj = datetime.strptime(event_date, '%Y-%m-%d')
-                        if (planting_start_obj <= event_date_obj < emergence_date_obj and
-                            event.get('rainfall', 0) >= SIGNIFICANT_RAINFALL):
-                            significant_rainfall_events.append(event)
-                    except Exception as e:
-                        continue
-                
-                if significant_rainfall_events:
-                    significant_rainfall_events.sort(key=lambda x: x['date'])
-                    rainfall_adjusted_planting = significant_rainfall_events[0]['date']
-            
-            # Create message
-            emergence_display = format_date_for_display(wheat_emergence)
-            planting_start_display = format_date_for_display(planting_window_start)
-            planting_end_display = format_date_for_display(planting_window_end)
-            
-            if rainfall_adjusted_planting:
-                rainfall_date_display = format_date_for_display(rainfall_adjusted_planting)
-                message = f"Winter wheat emergence detected around {emergence_display}, indicating planting likely occurred between {planting_start_display} and {planting_end_display}. Rainfall data suggests planting occurred around {rainfall_date_display}."
-            else:
-                message = f"Winter wheat emergence detected around {emergence_display}, indicating planting likely occurred between {planting_start_display} and {planting_end_display}."
-            
-            result = {
-                "emergenceDate": wheat_emergence,
-                "plantingWindowStart": planting_window_start,
-                "plantingWindowEnd": planting_window_end,
-                "rainfallAdjustedPlanting": rainfall_adjusted_planting,
-                "preEstablished": False,
-                "confidence": wheat_confidence,
-                "message": message,
-                "primary_emergence": True,
-                "detection_method": "wheat_winter_detector"
-            }
-            
-            # Add wheat-specific metadata
-            result.update(wheat_metadata)
-            
-            return result
-        else:
-            logger.info("Wheat winter detector failed, falling back to standard detection")
-    
-    # EXISTING: Standard emergence detection for non-wheat crops or wheat fallback
-    sorted_ndvi = sorted(ndvi_data, key=lambda x: x['date'])
-    
-    emergence_date = None
-    emergence_index = -1
-    
-    # Look for the first time NDVI crosses the emergence threshold
-    for i in range(len(sorted_ndvi) - 1):
-        if sorted_ndvi[i]['ndvi'] < EMERGENCE_THRESHOLD and sorted_ndvi[i + 1]['ndvi'] >= EMERGENCE_THRESHOLD:
-            emergence_date = sorted_ndvi[i + 1]['date']
-            emergence_index = i + 1
-            logger.info(f"Primary emergence detected on {emergence_date} at index {emergence_index}")
-            break
-    
-    # If no clear threshold crossing, look for significant NDVI rise from low values
-    if not emergence_date:
-        for i in range(len(sorted_ndvi) - 1):
-            current_ndvi = sorted_ndvi[i]['ndvi']
-            next_ndvi = sorted_ndvi[i + 1]['ndvi']
-            
-            # Look for significant rise from low values (indicating emergence from bare soil)
-            if current_ndvi < 0.15 and next_ndvi > current_ndvi + 0.05:
-                emergence_date = sorted_ndvi[i + 1]['date']
-                emergence_index = i + 1
-                logger.info(f"Alternative emergence detection on {emergence_date} - significant rise from low NDVI")
-                break
-    
-    # Check if crop was pre-established (all values already high)
-    if not emergence_date and sorted_ndvi and sorted_ndvi[0]['ndvi'] >= EMERGENCE_THRESHOLD:
-        high_values = [item['ndvi'] for item in sorted_ndvi if item['ndvi'] >= EMERGENCE_THRESHOLD]
-        if len(high_values) >= len(sorted_ndvi) * 0.8:  # 80% of values are high
-            return {
-                "emergenceDate": None,
-                "plantingWindowStart": None,
-                "plantingWindowEnd": None,
-                "preEstablished": True,
-                "confidence": "high",
-                "message": "Crop was already established before the analysis period began.",
-                "primary_emergence": False,
-                "detection_method": "standard"
+        # Parse request data
+        data = request.get_json()
+        
+        # Extract required fields
+        field_name = data.get("field_name", "Unknown field")
+        crop = data.get("crop", "Unknown crop")
+        variety = data.get("variety", "Unknown variety")
+        irrigated = "Yes" if data.get("irrigated", False) else "No"
+        latitude = data.get("latitude", "Unknown")
+        longitude = data.get("longitude", "Unknown")
+        date_range = data.get("date_range", "Unknown period")
+        ndvi_data = data.get("ndvi_data", [])
+        rainfall_data = data.get("rainfall_data", [])
+        temperature_data = data.get("temperature_data", [])
+        gdd_data = data.get("gdd_data", [])
+        gdd_stats = data.get("gdd_stats", {})
+        temperature_summary = data.get("temperature_summary", {})
+        base_temperature = data.get("base_temperature", 10)
+        coordinates = data.get("coordinates")  # NEW: for wheat winter detection
+        force_winter_detector = data.get("forceWinterDetector", False)  # NEW: override flag
+        
+        # Parse NDVI, rainfall and temperature once into columnar series shared by all
+        # detectors. Each accepts the per-point list form or a columnar payload
+        # (object of parallel arrays, or a base64 Arrow IPC stream).
+        try:
+            ndvi_series = as_index_series(ndvi_data)
+            rainfall_series = as_rainfall_series(rainfall_data) if rainfall_data else None
+            temperature_columns = decode_columns(temperature_data) if isinstance(temperature_data, (dict, str)) else {
+                "min": [item["min"] for item in temperature_data or []],
+                "max": [item["max"] for item in temperature_data or []]
             }
-    
-    # If still no emergence detected
-    if not emergence_date:
-        if irrigated == "No" and rainfall_data:
-            rainfall_failure = detect_rainfall_without_emergence(ndvi_data, rainfall_data)
-            if rainfall_failure and rainfall_failure['detected']:
-                return {
-                    "emergenceDate": None,
-                    "plantingWindowStart": None,
-                    "plantingWindowEnd": None,
-                    "preEstablished": False,
-                    "confidence": "medium",
-                    "message": rainfall_failure['message'],
-                    "rainfall_without_emergence": True,
-                    "rainfall_date": rainfall_failure['rainfall_date'],
-                    "primary_emergence": False,
-                    "no_planting_detected": True,
-                    "detection_method": "rainfall_analysis"
-                }
+        except (ValueError, TypeError, KeyError) as e:
+            return jsonify({
+                "success": False,
+                "error": f"Invalid series payload: {str(e)}"
+            }), 400
         
-        if sorted_ndvi:
-            start_date = format_date_for_display(sorted_ndvi[0]['date'])
-            end_date = format_date_for_display(sorted_ndvi[-1]['date'])
-            message = f"No planting activity detected from {start_date} to {end_date}."
-        else:
-            message = "No planting activity detected during the analysis period."
-            
-        return {
-            "emergenceDate": None,
-            "plantingWindowStart": None,
-            "plantingWindowEnd": None,
-            "preEstablished": False,
-            "confidence": "high",
-            "message": message,
-            "primary_emergence": False,
-            "no_planting_detected": True,
-            "detection_method": "standard"
-        }
-    
-    # Calculate planting window based on crop-specific emergence timing
-    emergence_window = EMERGENCE_WINDOWS.get(crop_type, DEFAULT_EMERGENCE_WINDOW)
-    
-    # Calculate planting window by rolling back from emergence date
-    emergence_date_obj = datetime.strptime(emergence_date, '%Y-%m-%d')
-    planting_window_end = (emergence_date_obj - timedelta(days=emergence_window[0])).strftime('%Y-%m-%d')
-    planting_window_start = (emergence_date_obj - timedelta(days=emergence_window[1])).strftime('%Y-%m-%d')
-    
-    logger.info(f"Calculated planting window: {planting_window_start} to {planting_window_end}")
-    
-    # For rainfed fields, check for rainfall events in the planting window
-    rainfall_adjusted_planting = None
-    if irrigated == "No" and rainfall_data:
-        significant_rainfall_events = []
-        planting_start_obj = datetime.strptime(planting_window_start, '%Y-%m-%d')
+        # Calculate average cloud cover if available
+        avg_cloud_cover = ndvi_series.mean_scene_cloud()
         
-        for event in rainfall_data:
-            event_date = event.get('date')
-            if not event_date:
-                continue
-            
-            try:
-                event_date_obj = datetime.strptime(event_date, '%Y-%m-%d')
-                if (planting_start_obj <= event_date_obj < emergence_date_obj and
-                    event.get('rainfall', 0) >= SIGNIFICANT_RAINFALL):
-                    significant_rainfall_events.append(event)
-            except Exception as e:
-                logger.error(f"Error processing rainfall event: {e}")
-                continue
-        
-        if significant_rainfall_events:
-            significant_rainfall_events.sort(key=lambda x: x['date'])
-            rainfall_adjusted_planting = significant_rainfall_events[0]['date']
-            logger.info(f"Found rainfall-adjusted planting date: {rainfall_adjusted_planting}")
-    
-    # Determine confidence level
-    confidence = "medium"
-    
-    # Higher confidence for good data quality and clear patterns
-    if len(sorted_ndvi) >= 6 and emergence_index > 0 and emergence_index < len(sorted_ndvi) - 1:
-        confidence = "high"
-    
-    # Lower confidence for sparse data or edge cases
-    if len(sorted_ndvi) < 4 or emergence_index <= 1 or emergence_index >= len(sorted_ndvi) - 2:
-        confidence = "low"
-    
-    # Create primary planting message
-    emergence_display = format_date_for_display(emergence_date)
-    planting_start_display = format_date_for_display(planting_window_start)
-    planting_end_display = format_date_for_display(planting_window_end)
-    
-    if rainfall_adjusted_planting:
-        rainfall_date_display = format_date_for_display(rainfall_adjusted_planting)
-        message = f"Primary emergence detected around {emergence_display}, indicating planting likely occurred between {planting_start_display} and {planting_end_display}. Rainfall data suggests planting occurred around {rainfall_date_display}."
-    else:
-        message = f"Primary emergence detected around {emergence_display}, indicating planting likely occurred between {planting_start_display} and {planting_end_display}."
-    
-    return {
-        "emergenceDate": emergence_date,
-        "plantingWindowStart": planting_window_start,
-        "plantingWindowEnd": planting_window_end,
-        "rainfallAdjustedPlanting": rainfall_adjusted_planting,
-        "preEstablished": False,
-        "confidence": confidence,
-        "message": message,
-        "primary_emergence": True,
-        "detection_method": "standard"
-    }
-
-# SECONDARY FUNCTION: Detect tillage/replanting events (unchanged)
-def detect_tillage_replanting_events(ndvi_data, primary_emergence_date=None):
-    """
-    Detects tillage or replanting events AFTER the primary emergence.
-    This is secondary analysis to complement the primary planting date.
-    """
-    if len(ndvi_data) < 4:
-        return {"tillage_detected": False, "message": ""}
-    
-    sorted_ndvi = sorted(ndvi_data, key=lambda x: x['date'])
-    tillage_events = []
-    
-    # Look for significant drops followed by recovery
-    for i in range(1, len(sorted_ndvi) - 1):
-        current_drop = sorted_ndvi[i-1]['ndvi'] - sorted_ndvi[i]['ndvi']
-        
-        # Criteria for tillage: significant drop from established vegetation
-        if (current_drop > 0.15 and 
-            sorted_ndvi[i-1]['ndvi'] > 0.3 and
-            sorted_ndvi[i]['ndvi'] < 0.25):
-            
-            # Check for subsequent recovery
-            recovery_found = False
-            for j in range(i + 1, min(i + 4, len(sorted_ndvi))):  # Look 3 readings ahead
-                if sorted_ndvi[j]['ndvi'] > sorted_ndvi[i]['ndvi'] + 0.1:
-                    recovery_found = True
-                    break
-            
-            if recovery_found:
-                tillage_date = sorted_ndvi[i]['date']
-                
-                # Avoid counting tillage that's close to primary emergence
-                if primary_emergence_date:
-                    try:
-                        primary_date_obj = datetime.strptime(primary_emergence_date, '%Y-%m-%d')
-                        tillage_date_obj = datetime.strptime(tillage_date, '%Y-%m-%d')
-                        days_diff = abs((tillage_date_obj - primary_date_obj).days)
-                        
-                        # Skip if tillage is within 14 days of primary emergence
-                        if days_diff < 14:
-                            continue
-                    except:
-                        pass
-                
-                tillage_events.append({
-                    'date': tillage_date,
-                    'ndvi_before': sorted_ndvi[i-1]['ndvi'],
-                    'ndvi_after': sorted_ndvi[i]['ndvi'],
-                    'drop_magnitude': current_drop
-                })
-    
-    if tillage_events:
-        # Use the most significant tillage event
-        most_significant = max(tillage_events, key=lambda x: x['drop_magnitude'])
-        tillage_date_display = format_date_for_display(most_significant['date'])
-        
-        return {
-            "tillage_detected": True,
-            "tillage_date": most_significant['date'],
-            "message": f"Subsequently, a tillage or replanting event was detected around {tillage_date_display}, where NDVI dropped from {most_significant['ndvi_before']:.2f} to {most_significant['ndvi_after']:.2f}, followed by recovery."
-        }
-    
-    return {"tillage_detected": False, "message": ""}
-
-# FUNCTION: Detect rainfall without emergence (unchanged)
-def detect_rainfall_without_emergence(ndvi_data, rainfall_data, min_rainfall_threshold=10, ndvi_threshold=0.2, response_window_days=14):
-    """
-    Detect significant rainfall events that aren't followed by crop emergence.
-    """
-    if not rainfall_data or not ndvi_data:
-        return None
-    
-    sorted_ndvi = sorted(ndvi_data, key=lambda x: x['date'])
-    sorted_rainfall = sorted(rainfall_data, key=lambda x: x['date'])
-    
-    significant_rainfall_events = []
-    
-    for event in sorted_rainfall:
-        try:
-            if event.get('rainfall', 0) >= min_rainfall_threshold:
-                significant_rainfall_events.append({
-                    'date': event['date'],
-                    'rainfall': event['rainfall']
-                })
-        except (KeyError, TypeError) as e:
-            logger.error(f"Error processing rainfall event: {e}")
-            continue
-    
-    if not significant_rainfall_events:
-        return None
-    
-    failure_events = []
-    
-    for rain_event in significant_rainfall_events:
-        rain_date = datetime.strptime(rain_event['date'], '%Y-%m-%d')
-        rain_date_str = rain_event['date']
-        
-        response_end_date = rain_date + timedelta(days=response_window_days)
-        
-        window_ndvi_readings = []
-        for ndvi_point in sorted_ndvi:
-            try:
-                ndvi_date = datetime.strptime(ndvi_point['date'], '%Y-%m-%d')
-                if rain_date <= ndvi_date <= response_end_date:
-                    window_ndvi_readings.append(ndvi_point)
-            except (ValueError, KeyError) as e:
-                logger.error(f"Error processing NDVI date: {e}")
-                continue
-        
-        if window_ndvi_readings and len(window_ndvi_readings) >= 2:
-            all_below_threshold = all(reading['ndvi'] < ndvi_threshold for reading in window_ndvi_readings)
-            
-            first_date = datetime.strptime(window_ndvi_readings[0]['date'], '%Y-%m-%d')
-            last_date = datetime.strptime(window_ndvi_readings[-1]['date'], '%Y-%m-%d')
-            days_span = (last_date - first_date).days
-            
-            if all_below_threshold and days_span >= 7:
-                failure_events.append({
-                    'rainfall_date': rain_date_str,
-                    'rainfall_amount': rain_event['rainfall'],
-                    'ndvi_readings': len(window_ndvi_readings),
-                    'max_ndvi': max(reading['ndvi'] for reading in window_ndvi_readings),
-                    'days_monitored': days_span
-                })
-    
-    if failure_events:
-        failure_events.sort(key=lambda x: x['rainfall_date'], reverse=True)
-        selected_event = failure_events[0]
-        rainfall_date = format_date_for_display(selected_event['rainfall_date'])
-        
-        return {
-            'detected': True,
-            'message': f"Significant rainfall occurred around {rainfall_date} ({selected_event['rainfall_amount']:.1f}mm), which may have provided a planting opportunity. However, no NDVI response was observed in the following {selected_event['days_monitored']} days, suggesting either planting did not occur or the crop failed to emerge.",
-            'confidence': "low",
-            'rainfall_date': selected_event['rainfall_date'],
-            'rainfall_amount': selected_event['rainfall_amount'],
-            'max_ndvi': selected_event['max_ndvi']
-        }
-    
-    return None
-
-# Format date for display (Month Day format)
-def format_date_for_display(date_str):
-    try:
-        date_obj = datetime.strptime(date_str, '%Y-%m-%d')
-        return date_obj.strftime('%B %d')
-    except Exception:
-        return date_str
-
-def calculate_std_dev(values):
-    if not values:
-        return 0
-    mean = sum(values) / len(values)
-    variance = sum((x - mean) ** 2 for x in values) / len(values)
-    return variance ** 0.5
-
-@app.route("/api/agronomic_insight", methods=["POST"])
-@require_auth
-def generate_agronomic_report():
-    try:
-        if not gee_initialized:
-            return jsonify({
-                "success": False,
-                "error": "GEE not initialized"
-            }), 500
-        
-        # Parse request data
-        data = request.get_json()
-        
-        # Extract required fields
-        field_name = data.get("field_name", "Unknown field")
-        crop = data.get("crop", "Unknown crop")
-        variety = data.get("variety", "Unknown variety")
-        irrigated = "Yes" if data.get("irrigated", False) else "No"
-        latitude = data.get("latitude", "Unknown")
-        longitude = data.get("longitude", "Unknown")
-        date_range = data.get("date_range", "Unknown period")
-        ndvi_data = data.get("ndvi_data", [])
-        rainfall_data = data.get("rainfall_data", [])
-        temperature_data = data.get("temperature_data", [])
-        gdd_data = data.get("gdd_data", [])
-        gdd_stats = data.get("gdd_stats", {})
-        temperature_summary = data.get("temperature_summary", {})
-        base_temperature = data.get("base_temperature", 10)
-        coordinates = data.get("coordinates")  # NEW: for wheat winter detection
-        force_winter_detector = data.get("forceWinterDetector", False)  # NEW: override flag
-        
-        # Calculate average cloud cover if available
-        avg_cloud_cover = None
-        if ndvi_data and all("cloud_percentage" in item for item in ndvi_data):
-            cloud_percentages = [item["cloud_percentage"] for item in ndvi_data if item["cloud_percentage"] is not None]
-            if cloud_percentages:
-                avg_cloud_cover = sum(cloud_percentages) / len(cloud_percentages)
-        
-        # Format NDVI data
-        ndvi_formatted = ", ".join([f"{item['date']}: {item['ndvi']:.2f}" for item in ndvi_data[:10]]) if ndvi_data else "No data"
-        if len(ndvi_data) > 10:
-            ndvi_formatted += f" (+ {len(ndvi_data) - 10} more readings)"
+        # Format NDVI data
+        ndvi_formatted = ", ".join([
+            f"{date}: {value:.2f}" for date, value in zip(ndvi_series.dates[:10], ndvi_series.values[:10].tolist())
+        ]) if len(ndvi_series) else "No data"
+        if len(ndvi_series) > 10:
+            ndvi_formatted += f" (+ {len(ndvi_series) - 10} more readings)"
         
         # Process rainfall data
         weekly_rainfall = {}
         if irrigated == "Yes":
             rainfall_formatted = "Not applicable for irrigated fields"
-        elif rainfall_data:
-            for item in rainfall_data:
-                date = item.get('date')
-                if date:
-                    week_key = date[:7] + "-W" + str((int(date[8:10]) - 1) // 7 + 1)
-                    if week_key not in weekly_rainfall:
-                        weekly_rainfall[week_key] = 0
-                    weekly_rainfall[week_key] += item.get('rainfall', 0)
-            
+        elif rainfall_series is not None and len(rainfall_series):
+            weekly_rainfall = rainfall_series.weekly_totals()
             rainfall_formatted = ", ".join([f"{week}: {total:.1f}mm" for week, total in weekly_rainfall.items()])
         else:
             rainfall_formatted = "No data"
         
         # Format temperature data
         temp_formatted = "No data"
-        if temperature_data:
-            avg_min = sum(item["min"] for item in temperature_data) / len(temperature_data)
-            avg_max = sum(item["max"] for item in temperature_data) / len(temperature_data)
-            temp_formatted = f"Avg min: {avg_min:.1f}°C, Avg max: {avg_max:.1f}°C, Range: {min(item['min'] for item in temperature_data):.1f}°C to {max(item['max'] for item in temperature_data):.1f}°C"
+        temp_min = column_values(temperature_columns.get("min", []))
+        temp_max = column_values(temperature_columns.get("max", []))
+        if len(temp_min) and len(temp_max):
+            temp_formatted = f"Avg min: {temp_min.mean():.1f}°C, Avg max: {temp_max.mean():.1f}°C, Range: {temp_min.min():.1f}°C to {temp_max.max():.1f}°C"
         
         # Format GDD data
         gdd_formatted = "No data"
@@ -1402,28 +855,7 @@ def generate_agronomic_report():
             gdd_formatted = f"Cumulative GDD: {gdd_stats.get('total_gdd', 'N/A')}, Avg daily GDD: {gdd_stats.get('avg_daily_gdd', 'N/A')}, Base temp: {base_temperature}°C"
         
         # Calculate NDVI change rates
-        ndvi_change_rates = []
-        if len(ndvi_data) > 1:
-            sorted_ndvi = sorted(ndvi_data, key=lambda x: x['date'])
-            
-            for i in range(1, len(sorted_ndvi)):
-                try:
-                    date1 = datetime.strptime(sorted_ndvi[i-1]['date'], '%Y-%m-%d')
-                    date2 = datetime.strptime(sorted_ndvi[i]['date'], '%Y-%m-%d')
-                    days_diff = (date2 - date1).days
-                    
-                    if days_diff > 0:
-                        ndvi_diff = sorted_ndvi[i]['ndvi'] - sorted_ndvi[i-1]['ndvi']
-                        change_rate = ndvi_diff / days_diff
-                        ndvi_change_rates.append({
-                            'start_date': sorted_ndvi[i-1]['date'],
-                            'end_date': sorted_ndvi[i]['date'],
-                            'days': days_diff,
-                            'change_rate': change_rate,
-                            'total_change': ndvi_diff
-                        })
-                except Exception as e:
-                    logger.error(f"Error calculating NDVI change rate: {e}")
+        ndvi_change_rates = calculate_change_rates(ndvi_series)
 
         # Format NDVI change rate data
         ndvi_change_formatted = "No data"
@@ -1443,10 +875,10 @@ def generate_agronomic_report():
         
         # Step 1: Detect PRIMARY emergence and calculate planting window (now with wheat support)
         primary_results = detect_primary_emergence_and_planting(
-            ndvi_data=ndvi_data,
+            ndvi_data=ndvi_series,
             crop_type=crop,
             irrigated=irrigated,
-            rainfall_data=rainfall_data if irrigated == "No" else None,
+            rainfall_data=rainfall_series if irrigated == "No" else None,
             coordinates=coordinates,  # NEW: for wheat spatial adaptation
             force_winter_detector=force_winter_detector  # NEW: override flag
         )
@@ -1455,7 +887,7 @@ def generate_agronomic_report():
         
         # Step 2: Detect SECONDARY tillage/replanting events
         tillage_results = detect_tillage_replanting_events(
-            ndvi_data=ndvi_data,
+            ndvi_data=ndvi_series,
             primary_emergence_date=primary_results.get("emergenceDate")
         )
         
@@ -1472,9 +904,8 @@ def generate_agronomic_report():
         confidence_level = primary_results.get("confidence", "medium")
         
         # Boost confidence based on data quality
-        if confidence_level != "high" and ndvi_data and len(ndvi_data) >= 10:
-            ndvi_values = [item["ndvi"] for item in ndvi_data]
-            ndvi_std_dev = calculate_std_dev(ndvi_values)
+        if confidence_level != "high" and len(ndvi_series) >= 10:
+            ndvi_std_dev = calculate_std_dev(ndvi_series.values.tolist())
             
             if avg_cloud_cover is not None and avg_cloud_cover < 20 and ndvi_std_dev < 0.15:
                 confidence_level = "high"
@@ -1515,12 +946,29 @@ Instructions: Write a clear, professional assessment (2-3 sentences maximum) tha
 
 Keep it simple and actionable for farmers."""
 
-        # Call OpenAI API
-        try:
+        # Fingerprint of everything the prompt depends on
+        insight_key = insight_fingerprint(
+            prompt_version=INSIGHT_PROMPT_VERSION,
+            model=INSIGHT_MODEL,
+            crop=crop,
+            irrigated=irrigated,
+            field_name=field_name,
+            date_range=date_range,
+            emergence_date=primary_results.get("emergenceDate"),
+            planting_window=[primary_results.get("plantingWindowStart"), primary_results.get("plantingWindowEnd")],
+            rainfall_adjusted_planting=primary_results.get("rainfallAdjustedPlanting"),
+            detection_method=primary_results.get("detection_method"),
+            no_planting_detected=primary_results.get("no_planting_detected", False),
+            tillage_date=tillage_results.get("tillage_date") if tillage_results["tillage_detected"] else None,
+            planting_window_text=planting_window_text,
+            ndvi_pattern=ndvi_formatted[:200],
+            rainfall_pattern=rainfall_formatted[:100] if irrigated == "No" else None
+        )
+        
+        def create_insight():
             logger.info(f"Sending request to generate insight for field: {field_name}")
-            
             response = openai_client.chat.completions.create(
-                model="gpt-4o-mini",
+                model=INSIGHT_MODEL,
                 messages=[
                     {"role": "system", "content": "You are a farm advisor. Give clear, simple advice in 2-3 sentences. No jargon, no formatting, just plain professional language."},
                     {"role": "user", "content": prompt}
@@ -1528,13 +976,44 @@ Keep it simple and actionable for farmers."""
                 temperature=0.1,  # Very low for consistent, simple responses
                 max_tokens=150    # Short, focused responses
             )
-            
-            insight = response.choices[0].message.content.strip()
+            return response.choices[0].message.content.strip()
+        
+        # Rule-based narrative: immediate answer and fallback for the LLM insight
+        narrative = build_field_narrative(primary_results, tillage_results, crop, irrigated, field_name, date_range)
+        
+        # Call OpenAI API within the latency budget (identical inputs are served from the insight cache)
+        try:
+            insight_start_time = time.perf_counter()
+            insight_pending = False
+            insight_error = None
+            insight = insight_cache.get(insight_key)
+            insight_cached = insight is not None
+            if insight is None and not os.environ.get("OPENAI_API_KEY"):
+                insight, insight_error = narrative["text"], "OpenAI API key not set"
+            elif insight is None:
+                insight_future = insight_executor.submit(
+                    insight_cache.get_or_create, insight_key, create_insight, INSIGHT_MODEL, INSIGHT_PROMPT_VERSION
+                )
+                try:
+                    insight, insight_cached = insight_future.result(timeout=INSIGHT_LATENCY_BUDGET_SECONDS)
+                except FutureTimeoutError:
+                    # Keep the LLM call running; its answer lands in the insight cache
+                    insight, insight_pending = narrative["text"], True
+                except Exception as e:
+                    logger.error(f"Insight generation error, using template narrative: {str(e)}")
+                    insight, insight_error = narrative["text"], str(e)
+            insight_source = "template" if insight_pending or insight_error else ("cache" if insight_cached else "llm")
+            insight_elapsed = time.perf_counter() - insight_start_time
+            logger.info(f"[TIMING] Insight ({insight_source}): {insight_elapsed:.3f}s")
             
             # Build comprehensive response
             response_data = {
                 "success": True,
                 "insight": insight,
+                "insight_cached": insight_cached,
+                "insight_source": insight_source,
+                "insight_pending": insight_pending,
+                "narrative": narrative,
                 "confidence_level": confidence_level,
                 "tillage_detected": tillage_results["tillage_detected"],
                 "primary_emergence_detected": primary_results.get("primary_emergence", False)
@@ -1575,6 +1054,9 @@ Keep it simple and actionable for farmers."""
                         "message": tillage_results["message"]
                     }
             
+            if insight_error:
+                response_data["insight_error"] = insight_error
+            
             return jsonify(response_data)
             
         except Exception as e:
@@ -1597,6 +1079,170 @@ Keep it simple and actionable for farmers."""
             "stack_trace": stack_trace
         }), 500
 
+def compute_ndvi_tiles(coords, start, end, index_type, cache_key):
+    """
+    Compute tile URL, statistics and cloud cover for a field and store the response
+    in the cache. Shared by /api/gee_ndvi and the field warm-up. Returns (response, status_code).
+    """
+    # Log incoming request
+    logger.info(f"Processing {index_type} tiles request: start={start}, end={end}, coords length={len(coords)}")
+    
+    # [TIMING] Create Earth Engine geometry
+    geometry_start_time = time.perf_counter()
+    polygon = ee.Geometry.Polygon(coords)
+    geometry_elapsed = time.perf_counter() - geometry_start_time
+    logger.info(f"[TIMING] Geometry creation: {geometry_elapsed:.3f}s")
+
+    # [TIMING] Get optimized collection with new cloud cover calculation
+    collection_start_time = time.perf_counter()
+    collection, collection_size, avg_cloud_cover, _ = get_optimized_collection(polygon, start, end, limit_images=True)
+    collection_elapsed = time.perf_counter() - collection_start_time
+    logger.info(f"[TIMING] GEE collection filtered: {collection_elapsed:.3f}s")
+    
+    if collection is None or collection_size == 0:
+        return {
+            "success": False, 
+            "error": "No Sentinel-2 imagery found for the specified date range and location",
+            "empty_collection": True
+        }, 404
+    
+    # [TIMING] Use mosaic instead of median for better performance
+    mosaic_start_time = time.perf_counter()
+    image = collection.median().clip(polygon)
+    first_image = collection.first()
+    mosaic_elapsed = time.perf_counter() - mosaic_start_time
+    logger.info(f"[TIMING] Image mosaic created: {mosaic_elapsed:.3f}s")
+    
+    # [TIMING] Handle RGB vs Index calculation
+    index_calc_start_time = time.perf_counter()
+    if index_type == "RGB":
+        # RGB visualization
+        rgb = image.select(["B4", "B3", "B2"])
+        # Apply performance optimization with reproject
+        vis_image = rgb.visualize(min=0, max=3000).reproject(crs='EPSG:4326', scale=30)
+        
+        # No stats for RGB
+        stats_dict = {}
+        index_name = "RGB"
+    else:
+        # Calculate the selected index
+        index_image = get_index(image, index_type)
+        index_name = index_type
+        
+        # Get visualization parameters from updated INDEX_CONFIGS
+        config = INDEX_CONFIGS[index_type]
+        vis_params = {
+            "min": config["range"][0],
+            "max": config["range"][1],
+            "palette": config["palette"]
+        }
+        
+        # Apply performance optimization with reproject
+        vis_image = index_image.visualize(**vis_params).reproject(crs='EPSG:4326', scale=10)
+        
+        # [TIMING] Calculate statistics
+        stats_start_time = time.perf_counter()
+        stats = index_image.reduceRegion(
+            reducer=ee.Reducer.mean().combine(ee.Reducer.minMax(), "", True),
+            geometry=polygon,
+            scale=10,
+            maxPixels=1e9
+        )
+        stats_dict = stats.getInfo()
+        stats_elapsed = time.perf_counter() - stats_start_time
+        logger.info(f"[TIMING] Statistics calculation: {stats_elapsed:.3f}s")
+    
+    index_calc_elapsed = time.perf_counter() - index_calc_start_time
+    logger.info(f"[TIMING] Index calculation completed: {index_calc_elapsed:.3f}s")
+    
+    # [TIMING] Calculate scene-level cloud cover
+    cloud_calc_start_time = time.perf_counter()
+    scene_cloud_percentage = first_image.get("CLOUDY_PIXEL_PERCENTAGE")
+    
+    # Get image date
+    image_date = first_image.date().format("YYYY-MM-dd").getInfo()
+    scene_cloud_pct = scene_cloud_percentage.getInfo()
+    cloud_calc_elapsed = time.perf_counter() - cloud_calc_start_time
+    logger.info(f"[TIMING] Cloud cover calculated: {cloud_calc_elapsed:.3f}s")
+    
+    # [TIMING] Get map ID for tile URL
+    map_id_start_time = time.perf_counter()
+    try:
+        map_id = ee.data.getMapId({"image": vis_image})
+        map_id_elapsed = time.perf_counter() - map_id_start_time
+        logger.info(f"[TIMING] Map ID generation: {map_id_elapsed:.3f}s")
+        
+        # Use the new collection-wide cloud cover if available
+        display_cloud_percentage = avg_cloud_cover if avg_cloud_cover is not None else scene_cloud_pct
+        
+        # Prepare response with updated configuration
+        config = INDEX_CONFIGS[index_type]
+        response = {
+            "success": True,
+            "index": index_type,
+            "tile_url": map_id["tile_fetcher"].url_format,
+            "palette": config["palette"],
+            "range": config["range"],
+            "explanation": config["explanation"],
+            "image_date": image_date,
+            "collection_size": collection_size,
+            "cloud_cover": display_cloud_percentage,  # NEW: Standardized cloud cover using S2_CLOUD_PROBABILITY
+            "scene_cloud_percentage": scene_cloud_pct,
+            "cloud_calculation_method": "s2_cloud_probability" if avg_cloud_cover is not None else "scene_level"
+        }
+        
+        # Add statistics for non-RGB indices
+        if index_type != "RGB":
+            stat_key = index_name
+            response["mean"] = stats_dict.get(f"{stat_key}_mean")
+            response["min"] = stats_dict.get(f"{stat_key}_min")
+            response["max"] = stats_dict.get(f"{stat_key}_max")
+        
+        # [TIMING] Cache the response
+        cache_store_start_time = time.perf_counter()
+        with cache_lock:
+            cache[cache_key] = response
+        cache_store_elapsed = time.perf_counter() - cache_store_start_time
+        logger.info(f"[TIMING] Response cached: {cache_store_elapsed:.3f}s")
+        
+        logger.info(f"[TIMING] Successfully processed {index_type} tiles request with S2_CLOUD_PROBABILITY.")
+        return response, 200
+        
+    except Exception as e:
+        map_id_elapsed = time.perf_counter() - map_id_start_time
+        logger.error(f"[TIMING] Error getting map IDs: {map_id_elapsed:.3f}s - {e}")
+        
+        display_cloud_percentage = avg_cloud_cover if avg_cloud_cover is not None else scene_cloud_pct
+        
+        config = INDEX_CONFIGS[index_type]
+        response = {
+            "success": True,
+            "index": index_type,
+            "palette": config["palette"],
+            "range": config["range"],
+            "explanation": config["explanation"],
+            "image_date": image_date,
+            "collection_size": collection_size,
+            "cloud_cover": display_cloud_percentage,
+            "scene_cloud_percentage": scene_cloud_pct,
+            "cloud_calculation_method": "s2_cloud_probability" if avg_cloud_cover is not None else "scene_level",
+            "visualization_error": str(e)
+        }
+        
+        if index_type != "RGB":
+            response["mean"] = stats_dict.get(f"{index_name}_mean")
+            response["min"] = stats_dict.get(f"{index_name}_min")
+            response["max"] = stats_dict.get(f"{index_name}_max")
+        
+        # [TIMING] Cache the response
+        cache_store_start_time = time.perf_counter()
+        with cache_lock:
+            cache[cache_key] = response
+        cache_store_elapsed = time.perf_counter() - cache_store_start_time
+        logger.info(f"[TIMING] Response cached (with error): {cache_store_elapsed:.3f}s")
+        
+        return response, 200
+
 @app.route('/api/gee_ndvi', methods=['OPTIONS'])
 def gee_ndvi_options():
     response = jsonify({'status': 'ok'})
@@ -1619,6 +1265,7 @@ def gee_ndvi_options():
 
 @app.route("/api/gee_ndvi", methods=["POST"])
 @require_auth
+@limit_gee_concurrency("tiles")
 def generate_ndvi():
     # [TIMING] Start total request timer
     request_start_time = time.perf_counter()
@@ -1676,172 +1323,11 @@ def generate_ndvi():
         cache_elapsed = time.perf_counter() - cache_start_time
         logger.info(f"[TIMING] Cache lookup (miss): {cache_elapsed:.3f}s")
         
-        # Log incoming request
-        logger.info(f"Processing {index_type} tiles request: start={start}, end={end}, coords length={len(coords)}")
-        
-        # [TIMING] Create Earth Engine geometry
-        geometry_start_time = time.perf_counter()
-        polygon = ee.Geometry.Polygon(coords)
-        geometry_elapsed = time.perf_counter() - geometry_start_time
-        logger.info(f"[TIMING] Geometry creation: {geometry_elapsed:.3f}s")
-
-        # [TIMING] Get optimized collection with new cloud cover calculation
-        collection_start_time = time.perf_counter()
-        collection, collection_size, avg_cloud_cover = get_optimized_collection(polygon, start, end, limit_images=True)
-        collection_elapsed = time.perf_counter() - collection_start_time
-        logger.info(f"[TIMING] GEE collection filtered: {collection_elapsed:.3f}s")
-        
-        if collection is None or collection_size == 0:
-            total_elapsed = time.perf_counter() - request_start_time
-            logger.info(f"[TIMING] Total request time (no data): {total_elapsed:.3f}s")
-            return jsonify({
-                "success": False, 
-                "error": "No Sentinel-2 imagery found for the specified date range and location",
-                "empty_collection": True
-            }), 404
-        
-        # [TIMING] Use mosaic instead of median for better performance
-        mosaic_start_time = time.perf_counter()
-        image = collection.median().clip(polygon)
-        first_image = collection.first()
-        mosaic_elapsed = time.perf_counter() - mosaic_start_time
-        logger.info(f"[TIMING] Image mosaic created: {mosaic_elapsed:.3f}s")
-        
-        # [TIMING] Handle RGB vs Index calculation
-        index_calc_start_time = time.perf_counter()
-        if index_type == "RGB":
-            # RGB visualization
-            rgb = image.select(["B4", "B3", "B2"])
-            # Apply performance optimization with reproject
-            vis_image = rgb.visualize(min=0, max=3000).reproject(crs='EPSG:4326', scale=30)
-            
-            # No stats for RGB
-            stats_dict = {}
-            index_name = "RGB"
-        else:
-            # Calculate the selected index
-            index_image = get_index(image, index_type)
-            index_name = index_type
-            
-            # Get visualization parameters from updated INDEX_CONFIGS
-            config = INDEX_CONFIGS[index_type]
-            vis_params = {
-                "min": config["range"][0],
-                "max": config["range"][1],
-                "palette": config["palette"]
-            }
-            
-            # Apply performance optimization with reproject
-            vis_image = index_image.visualize(**vis_params).reproject(crs='EPSG:4326', scale=10)
-            
-            # [TIMING] Calculate statistics
-            stats_start_time = time.perf_counter()
-            stats = index_image.reduceRegion(
-                reducer=ee.Reducer.mean().combine(ee.Reducer.minMax(), "", True),
-                geometry=polygon,
-                scale=10,
-                maxPixels=1e9
-            )
-            stats_dict = stats.getInfo()
-            stats_elapsed = time.perf_counter() - stats_start_time
-            logger.info(f"[TIMING] Statistics calculation: {stats_elapsed:.3f}s")
-        
-        index_calc_elapsed = time.perf_counter() - index_calc_start_time
-        logger.info(f"[TIMING] Index calculation completed: {index_calc_elapsed:.3f}s")
-        
-        # [TIMING] Calculate scene-level cloud cover
-        cloud_calc_start_time = time.perf_counter()
-        scene_cloud_percentage = first_image.get("CLOUDY_PIXEL_PERCENTAGE")
-        
-        # Get image date
-        image_date = first_image.date().format("YYYY-MM-dd").getInfo()
-        scene_cloud_pct = scene_cloud_percentage.getInfo()
-        cloud_calc_elapsed = time.perf_counter() - cloud_calc_start_time
-        logger.info(f"[TIMING] Cloud cover calculated: {cloud_calc_elapsed:.3f}s")
-        
-        # [TIMING] Get map ID for tile URL
-        map_id_start_time = time.perf_counter()
-        try:
-            map_id = ee.data.getMapId({"image": vis_image})
-            map_id_elapsed = time.perf_counter() - map_id_start_time
-            logger.info(f"[TIMING] Map ID generation: {map_id_elapsed:.3f}s")
-            
-            # Use the new collection-wide cloud cover if available
-            display_cloud_percentage = avg_cloud_cover if avg_cloud_cover is not None else scene_cloud_pct
-            
-            # Prepare response with updated configuration
-            config = INDEX_CONFIGS[index_type]
-            response = {
-                "success": True,
-                "index": index_type,
-                "tile_url": map_id["tile_fetcher"].url_format,
-                "palette": config["palette"],
-                "range": config["range"],
-                "explanation": config["explanation"],
-                "image_date": image_date,
-                "collection_size": collection_size,
-                "cloud_cover": display_cloud_percentage,  # NEW: Standardized cloud cover using S2_CLOUD_PROBABILITY
-                "scene_cloud_percentage": scene_cloud_pct,
-                "cloud_calculation_method": "s2_cloud_probability" if avg_cloud_cover is not None else "scene_level"
-            }
-            
-            # Add statistics for non-RGB indices
-            if index_type != "RGB":
-                stat_key = index_name
-                response["mean"] = stats_dict.get(f"{stat_key}_mean")
-                response["min"] = stats_dict.get(f"{stat_key}_min")
-                response["max"] = stats_dict.get(f"{stat_key}_max")
-            
-            # [TIMING] Cache the response
-            cache_store_start_time = time.perf_counter()
-            with cache_lock:
-                cache[cache_key] = response
-            cache_store_elapsed = time.perf_counter() - cache_store_start_time
-            logger.info(f"[TIMING] Response cached: {cache_store_elapsed:.3f}s")
-            
-            # [TIMING] Log total request time
-            total_elapsed = time.perf_counter() - request_start_time
-            logger.info(f"[TIMING] Successfully processed {index_type} tiles request with S2_CLOUD_PROBABILITY.")
-            logger.info(f"[TIMING] Total request time: {total_elapsed:.3f}s")
-            return jsonify(response)
-            
-        except Exception as e:
-            map_id_elapsed = time.perf_counter() - map_id_start_time
-            logger.error(f"[TIMING] Error getting map IDs: {map_id_elapsed:.3f}s - {e}")
-            
-            display_cloud_percentage = avg_cloud_cover if avg_cloud_cover is not None else scene_cloud_pct
-            
-            config = INDEX_CONFIGS[index_type]
-            response = {
-                "success": True,
-                "index": index_type,
-                "palette": config["palette"],
-                "range": config["range"],
-                "explanation": config["explanation"],
-                "image_date": image_date,
-                "collection_size": collection_size,
-                "cloud_cover": display_cloud_percentage,
-                "scene_cloud_percentage": scene_cloud_pct,
-                "cloud_calculation_method": "s2_cloud_probability" if avg_cloud_cover is not None else "scene_level",
-                "visualization_error": str(e)
-            }
-            
-            if index_type != "RGB":
-                response["mean"] = stats_dict.get(f"{index_name}_mean")
-                response["min"] = stats_dict.get(f"{index_name}_min")
-                response["max"] = stats_dict.get(f"{index_name}_max")
-            
-            # [TIMING] Cache the response
-            cache_store_start_time = time.perf_counter()
-            with cache_lock:
-                cache[cache_key] = response
-            cache_store_elapsed = time.perf_counter() - cache_store_start_time
-            logger.info(f"[TIMING] Response cached (with error): {cache_store_elapsed:.3f}s")
-            
-            # [TIMING] Log total request time
-            total_elapsed = time.perf_counter() - request_start_time
-            logger.info(f"[TIMING] Total request time (with visualization error): {total_elapsed:.3f}s")
-            return jsonify(response)
+        # [TIMING] Compute and cache the tile response
+        response, status_code = compute_ndvi_tiles(coords, start, end, index_type, cache_key)
+        total_elapsed = time.perf_counter() - request_start_time
+        logger.info(f"[TIMING] Total request time: {total_elapsed:.3f}s")
+        return jsonify(response), status_code
 
     except Exception as e:
         total_elapsed = time.perf_counter() - request_start_time
@@ -1857,8 +1343,452 @@ def generate_ndvi():
             "stack_trace": stack_trace
         }), 500
 
+def merge_date_ranges(ranges):
+    """Merge overlapping or touching [start, end) ISO date ranges"""
+    merged = []
+    for range_start, range_end in sorted(ranges):
+        if merged and range_start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], range_end)
+        else:
+            merged.append([range_start, range_end])
+    return merged
+
+def get_missing_date_ranges(covered, start, end):
+    """Return the [start, end) sub-ranges of the request not covered by stored observations"""
+    missing = []
+    cursor = start
+    for range_start, range_end in covered:
+        if range_end <= cursor:
+            continue
+        if range_start >= end:
+            break
+        if range_start > cursor:
+            missing.append((cursor, range_start))
+        cursor = max(cursor, range_end)
+        if cursor >= end:
+            break
+    if cursor < end:
+        missing.append((cursor, end))
+    return missing
+
+def get_incremental_time_series(polygon, field_key, start, end, index_type):
+    """
+    Assemble the time series for [start, end) from the field's observation store,
+    fetching only the sub-ranges that have not been computed before.
+    Ranges newer than OBSERVATION_SETTLE_DAYS are never marked as covered, so
+    late-arriving imagery is picked up on the next request.
+    The store holds every image up to the loosest cloud threshold plus the count
+    of all images per date; the cloud filter for the whole request is applied
+    when reading (see select_stored_observations), so the result does not
+    depend on which ranges were fetched earlier.
+    Returns (observations, collection_size) where collection_size is the
+    number of images passing the cloud filter (0 when there is no imagery).
+    """
+    with observation_store_lock:
+        entry = observation_store.get(field_key)
+        covered = [list(r) for r in entry["covered"]] if entry else []
+    
+    missing_ranges = get_missing_date_ranges(covered, start, end)
+    logger.info(f"Observation store: {len(covered)} covered range(s), fetching {len(missing_ranges)} missing range(s): {missing_ranges}")
+    
+    fetched = []
+    for range_start, range_end in missing_ranges:
+        observations, image_counts = fetch_index_observations(polygon, range_start, range_end, index_type)
+        fetched.append((range_start, range_end, observations, image_counts))
+    
+    settled_before = (datetime.now() - timedelta(days=OBSERVATION_SETTLE_DAYS)).strftime('%Y-%m-%d')
+    
+    with observation_store_lock:
+        entry = observation_store.get(field_key) or {
+            "observations": {},
+            "image_counts": {},
+            "covered": []
+        }
+        
+        for range_start, range_end, observations, image_counts in fetched:
+            # Replace whatever was stored for this range (unsettled dates are refetched)
+            for store in (entry["observations"], entry["image_counts"]):
+                for date in [d for d in store if range_start <= d < range_end]:
+                    del store[date]
+            for observation in observations:
+                entry["observations"].setdefault(observation["date"], []).append(observation)
+            entry["image_counts"].update(image_counts)
+            
+            settled_end = min(range_end, settled_before)
+            if range_start < settled_end:
+                entry["covered"] = merge_date_ranges(entry["covered"] + [[range_start, settled_end]])
+        
+        # Re-assign to refresh the entry's TTL
+        observation_store[field_key] = entry
+        
+        return select_stored_observations(entry, start, end)
+
+def select_stored_observations(entry, start, end):
+    """
+    Apply the cloud filter a full recompute of [start, end) would use to the stored
+    observations: the progressive threshold from the total image count in the
+    window, then the 50/80% fallbacks when nothing passes.
+    Returns (index_time_series, collection_size).
+    """
+    total_size = sum(count for date, count in entry["image_counts"].items() if start <= date < end)
+    if total_size == 0:
+        return [], 0
+    
+    candidates = [
+        observation
+        for date in sorted(entry["observations"])
+        if start <= date < end
+        for observation in entry["observations"][date]
+    ]
+    
+    cloud_threshold, _ = select_cloud_threshold(total_size)
+    for threshold in (cloud_threshold,) + CLOUD_FALLBACK_THRESHOLDS:
+        selected = [
+            observation for observation in candidates
+            if observation["scene_cloud_percentage"] is not None
+            and observation["scene_cloud_percentage"] < threshold
+        ]
+        if selected:
+            break
+    logger.info(f"Stored observations: {len(selected)} of {total_size} images with cloud < {threshold}%")
+    
+    # Images without a valid index reading count towards the collection but not the series
+    return [observation for observation in selected if observation["ndvi"] is not None], len(selected)
+
+def fetch_index_observations(polygon, start, end, index_type):
+    """
+    Fetch per-image index and cloud observations for [start, end) from Earth Engine.
+    Every image below the loosest cloud threshold is returned (index None when no
+    reading could be made), plus the number of images per date before any cloud
+    filtering, so the request-wide threshold can be applied later.
+    Returns (observations, image_counts).
+    """
+    # [TIMING] Every image a full recompute could select (the cloud filter is applied on read)
+    collection_start_time = time.perf_counter()
+    base_collection = (
+        ee.ImageCollection("COPERNICUS/S2_HARMONIZED")
+        .filterBounds(polygon)
+        .filterDate(start, end)
+    )
+    collection = base_collection.filter(ee.Filter.lt("CLOUDY_PIXEL_PERCENTAGE", max(CLOUD_FALLBACK_THRESHOLDS)))
+    collection_elapsed = time.perf_counter() - collection_start_time
+    logger.info(f"[TIMING] GEE collection filtered: {collection_elapsed:.3f}s")
+    
+    # [TIMING] Join cloud probability images once (ee.Join.saveFirst on system:index)
+    cloud_prob_start_time = time.perf_counter()
+    collection = attach_cloud_probability(collection, polygon, start, end)
+    cloud_prob_elapsed = time.perf_counter() - cloud_prob_start_time
+    logger.info(f"[TIMING] Cloud probability join prepared: {cloud_prob_elapsed:.3f}s")
+    
+    # [TIMING] OPTIMIZED: Add index and cloud statistics to image properties
+    def add_index_and_cloud_stats(image):
+        """Add index statistics and cloud cover to image properties using S2_CLOUD_PROBABILITY"""
+        clipped = image.clip(polygon)
+        
+        # Calculate the selected index
+        index_image = get_index(clipped, index_type)
+        
+        # Calculate mean for the polygon
+        index_mean = index_image.reduceRegion(
+            reducer=ee.Reducer.mean(),
+            geometry=polygon,
+            scale=10,
+            maxPixels=1e9
+        ).get(index_type)
+        
+        # Get scene-level cloud cover
+        scene_cloud_cover = image.get("CLOUDY_PIXEL_PERCENTAGE")
+        
+        # Calculate field-specific cloud cover using the joined S2_CLOUD_PROBABILITY image
+        field_cloud, cloud_prob_exists = calculate_field_cloud(image, polygon)
+        
+        return image.set({
+            f'{index_type.lower()}_mean': index_mean,
+            'date_formatted': image.date().format('YYYY-MM-dd'),
+            'scene_cloud_percentage': scene_cloud_cover,
+            'field_cloud_percentage': field_cloud,
+            'cloud_method': ee.Algorithms.If(cloud_prob_exists, 's2_cloud_probability', 'qa60_fallback')
+        })
+    
+    # [TIMING] Map the function over the collection
+    stats_mapping_start_time = time.perf_counter()
+    collection_with_stats = collection.map(add_index_and_cloud_stats)
+    stats_mapping_elapsed = time.perf_counter() - stats_mapping_start_time
+    logger.info(f"[TIMING] Statistics mapping prepared: {stats_mapping_elapsed:.3f}s")
+    
+    # [TIMING] Get all data in batch
+    batch_start_time = time.perf_counter()
+    dates_array = collection_with_stats.aggregate_array('date_formatted')
+    index_array = collection_with_stats.aggregate_array(f'{index_type.lower()}_mean')
+    scene_cloud_array = collection_with_stats.aggregate_array('scene_cloud_percentage')
+    field_cloud_array = collection_with_stats.aggregate_array('field_cloud_percentage')
+    cloud_method_array = collection_with_stats.aggregate_array('cloud_method')
+    
+    logger.info("Getting time series data in batch with S2_CLOUD_PROBABILITY...")
+    batch_data = ee.Dictionary({
+        'all_dates': base_collection.aggregate_array('system:time_start'),
+        'dates': dates_array,
+        'index_values': index_array,
+        'scene_cloud_percentages': scene_cloud_array,
+        'field_cloud_percentages': field_cloud_array,
+        'cloud_methods': cloud_method_array
+    }).getInfo()
+    batch_elapsed = time.perf_counter() - batch_start_time
+    logger.info(f"[TIMING] Time series data extracted: {batch_elapsed:.3f}s")
+    
+    # [TIMING] Process batch data
+    processing_start_time = time.perf_counter()
+    dates = batch_data['dates']
+    index_values = batch_data['index_values']
+    scene_cloud_percentages = batch_data['scene_cloud_percentages']
+    field_cloud_percentages = batch_data['field_cloud_percentages']
+    cloud_methods = batch_data['cloud_methods']
+    
+    # Images per date before cloud filtering
+    image_counts = {}
+    for timestamp in batch_data['all_dates']:
+        date = datetime.utcfromtimestamp(timestamp / 1000).strftime('%Y-%m-%d')
+        image_counts[date] = image_counts.get(date, 0) + 1
+    
+    # Combine into time series data (images without a reading are kept for the collection count)
+    index_time_series = []
+    
+    for i in range(len(dates)):
+        index_value = index_values[i]
+        
+        field_cloud_pct = field_cloud_percentages[i] if i < len(field_cloud_percentages) else None
+        cloud_method = cloud_methods[i] if i < len(cloud_methods) else 'unknown'
+        
+        # Use field-specific cloud cover as primary, fallback to scene
+        display_cloud_pct = field_cloud_pct if field_cloud_pct is not None else scene_cloud_percentages[i]
+        
+        # Use generic key name for compatibility (keep 'ndvi' for backwards compatibility)
+        data_point = {
+            "date": dates[i],
+            "ndvi": index_value, # Keep for backwards compatibility
+            f"{index_type.lower()}": index_value, # Add index-specific key
+            "cloud_percentage": display_cloud_pct,
+            "scene_cloud_percentage": scene_cloud_percentages[i],
+            "field_cloud_percentage": field_cloud_pct,
+            "cloud_calculation_method": cloud_method
+        }
+        
+        index_time_series.append(data_point)
+    
+    processing_elapsed = time.perf_counter() - processing_start_time
+    logger.info(f"[TIMING] Data processing completed: {processing_elapsed:.3f}s")
+    
+    return index_time_series, image_counts
+
+def add_wheat_emergence(response, index_time_series, coords, force_winter_detector=False):
+    """Run wheat winter emergence detection on a time series and add the results to the response"""
+    wheat_detection_start_time = time.perf_counter()
+    logger.info("Running wheat emergence detection on time series...")
+    try:
+        wheat_emergence, wheat_confidence, wheat_metadata = detect_wheat_winter_emergence(
+            index_time_series, coords, force_winter_detector
+        )
+        
+        if wheat_emergence:
+            response["emergence_date"] = wheat_emergence
+            response["emergence_confidence"] = wheat_confidence
+            
+            if "cloud_at_emergence_pct" in wheat_metadata:
+                response["cloud_at_emergence_pct"] = wheat_metadata["cloud_at_emergence_pct"]
+            if "used_field_cloud" in wheat_metadata:
+                response["used_field_cloud"] = wheat_metadata["used_field_cloud"]
+            if "qa" in wheat_metadata:
+                response["qa"] = wheat_metadata["qa"]
+            if "spatial_adaptation" in wheat_metadata:
+                response["spatial_adaptation"] = wheat_metadata["spatial_adaptation"]
+                
+            logger.info(f"Wheat emergence detected: {wheat_emergence} (confidence: {wheat_confidence})")
+        else:
+            logger.info("No wheat emergence detected")
+            if "qa" in wheat_metadata:
+                response["qa"] = wheat_metadata["qa"]
+                
+    except Exception as e:
+        logger.error(f"Error in wheat emergence detection: {e}")
+        response["wheat_detection_error"] = str(e)
+    
+    wheat_detection_elapsed = time.perf_counter() - wheat_detection_start_time
+    logger.info(f"[TIMING] Wheat emergence detection: {wheat_detection_elapsed:.3f}s")
+
+def fetch_batch_index_observations(fields, start, end, index_type):
+    """
+    Fetch per-image index and cloud observations for many fields with one
+    reduceRegions per image over a FeatureCollection of all field polygons,
+    aggregated into a single getInfo. Returns (observations_by_field_id, collection_size).
+    """
+    field_collection = ee.FeatureCollection([
+        ee.Feature(ee.Geometry.Polygon(field["coordinates"]), {"field_id": field["id"]})
+        for field in fields
+    ])
+    region = field_collection.geometry()
+    
+    collection, collection_size, _, _ = get_optimized_collection(
+        region, start, end, limit_images=False, include_cloud_cover=False
+    )
+    if collection is None or collection_size == 0:
+        return {}, 0
+    
+    collection = attach_cloud_probability(collection, region, start, end)
+    
+    def reduce_fields(image):
+        cloud_prob_exists = image.propertyNames().contains('cloud_probability')
+        
+        # Field cloud band: S2 cloud probability, QA60 cloud bits as fallback, otherwise 0
+        qa60 = image.select('QA60')
+        qa60_cloud = qa60.bitwiseAnd(1 << 10).gt(0).Or(qa60.bitwiseAnd(1 << 11).gt(0)).multiply(100)
+        cloud_band = ee.Image(ee.Algorithms.If(
+            cloud_prob_exists,
+            ee.Image(image.get('cloud_probability')).select('probability'),
+            ee.Algorithms.If(image.bandNames().contains('QA60'), qa60_cloud, ee.Image.constant(0))
+        )).toFloat().rename('field_cloud')
+        
+        stack = get_index(image, index_type).rename('index_value').toFloat().addBands(cloud_band)
+        reduced = stack.reduceRegions(
+            collection=field_collection,
+            reducer=ee.Reducer.mean(),
+            scale=10
+        )
+        
+        image_properties = {
+            'date': image.date().format('YYYY-MM-dd'),
+            'scene_cloud_percentage': image.get('CLOUDY_PIXEL_PERCENTAGE'),
+            'cloud_method': ee.Algorithms.If(cloud_prob_exists, 's2_cloud_probability', 'qa60_fallback')
+        }
+        
+        def finalize(feature):
+            # Replace nulls with a sentinel so reduceColumns keeps the lists aligned
+            values = {
+                name: ee.Algorithms.If(
+                    ee.Algorithms.IsEqual(feature.get(name), None), BATCH_MISSING_VALUE, feature.get(name)
+                )
+                for name in ('index_value', 'field_cloud')
+            }
+            values.update(image_properties)
+            values['scene_cloud_percentage'] = ee.Algorithms.If(
+                ee.Algorithms.IsEqual(image_properties['scene_cloud_percentage'], None),
+                BATCH_MISSING_VALUE,
+                image_properties['scene_cloud_percentage']
+            )
+            return feature.set(values)
+        
+        return reduced.map(finalize)
+    
+    columns = ['field_id', 'date', 'index_value', 'field_cloud', 'scene_cloud_percentage', 'cloud_method']
+    rows = collection.map(reduce_fields).flatten()
+    
+    batch_start_time = time.perf_counter()
+    column_lists = rows.reduceColumns(
+        reducer=ee.Reducer.toList().repeat(len(columns)),
+        selectors=columns
+    ).get('list').getInfo()
+    batch_elapsed = time.perf_counter() - batch_start_time
+    logger.info(f"[TIMING] Batch time series data extracted: {batch_elapsed:.3f}s")
+    
+    def value_or_none(value):
+        return None if value == BATCH_MISSING_VALUE else value
+    
+    observations_by_field = {field["id"]: [] for field in fields}
+    for field_id, date, index_value, field_cloud, scene_cloud, cloud_method in zip(*column_lists):
+        index_value = value_or_none(index_value)
+        if index_value is None or field_id not in observations_by_field:
+            continue
+        
+        field_cloud_pct = value_or_none(field_cloud)
+        scene_cloud_pct = value_or_none(scene_cloud)
+        display_cloud_pct = field_cloud_pct if field_cloud_pct is not None else scene_cloud_pct
+        
+        observations_by_field[field_id].append({
+            "date": date,
+            "ndvi": index_value,  # Keep for backwards compatibility
+            f"{index_type.lower()}": index_value,
+            "cloud_percentage": display_cloud_pct,
+            "scene_cloud_percentage": scene_cloud_pct,
+            "field_cloud_percentage": field_cloud_pct,
+            "cloud_calculation_method": cloud_method
+        })
+    
+    return observations_by_field, collection_size
+
+def compute_ndvi_timeseries(coords, start, end, index_type, crop, force_winter_detector, cache_key):
+    """
+    Assemble the index time series for a field (incrementally, via the observation store)
+    and store the response in the cache. Shared by /api/gee_ndvi_timeseries and the field
+    warm-up. Returns (response, status_code).
+    """
+    # Log incoming request
+    logger.info(f"Processing {index_type} time series: start={start}, end={end}, crop={crop}")
+    
+    # [TIMING] Create Earth Engine geometry  
+    geometry_start_time = time.perf_counter()
+    polygon = ee.Geometry.Polygon(coords)
+    geometry_elapsed = time.perf_counter() - geometry_start_time
+    logger.info(f"[TIMING] Geometry creation: {geometry_elapsed:.3f}s")
+
+    # [TIMING] Compute only the date ranges missing from the field's observation store
+    collection_start_time = time.perf_counter()
+    field_key = get_cache_key(coords, None, None, "field_observations", index_type)
+    index_time_series, collection_size = get_incremental_time_series(polygon, field_key, start, end, index_type)
+    collection_elapsed = time.perf_counter() - collection_start_time
+    logger.info(f"[TIMING] Incremental time series assembled: {collection_elapsed:.3f}s")
+    
+    if collection_size == 0:
+        return {
+            "success": False, 
+            "error": "No Sentinel-2 imagery found for the specified date range and location",
+            "empty_collection": True
+        }, 404
+    
+    # Verify we have sufficient data points
+    if len(index_time_series) == 0:
+        return {
+            "success": False, 
+            "error": f"No valid {index_type} readings could be calculated for this field",
+            "empty_time_series": True
+        }, 404
+    
+    # Sort time series by date
+    index_time_series.sort(key=lambda x: x["date"])
+    
+    # Calculate average cloud cover across time series
+    valid_cloud_values = [item["cloud_percentage"] for item in index_time_series if item["cloud_percentage"] is not None]
+    avg_cloud_cover_ts = sum(valid_cloud_values) / len(valid_cloud_values) if valid_cloud_values else None
+    
+    # Prepare enriched response with updated index config
+    config = INDEX_CONFIGS[index_type]
+    response = {
+        "success": True,
+        "index": index_type,
+        "palette": config["palette"],
+        "range": config["range"],
+        "explanation": config["explanation"],
+        "time_series": index_time_series,
+        "collection_size": collection_size,
+        "cloud_cover": avg_cloud_cover_ts,  # NEW: Average cloud cover using S2_CLOUD_PROBABILITY
+        "cloud_calculation_method": "s2_cloud_probability_timeseries"
+    }
+    
+    # [TIMING] NEW: Add wheat emergence detection if this is a wheat field AND using NDVI
+    if index_type == "NDVI" and crop.lower() == 'wheat':
+        add_wheat_emergence(response, index_time_series, coords, force_winter_detector)
+    
+    # [TIMING] Cache the response
+    cache_store_start_time = time.perf_counter()
+    with cache_lock:
+        cache[cache_key] = response
+    cache_store_elapsed = time.perf_counter() - cache_store_start_time
+    logger.info(f"[TIMING] Response cached: {cache_store_elapsed:.3f}s")
+    
+    logger.info(f"Successfully processed {index_type} time series with S2_CLOUD_PROBABILITY. {len(index_time_series)} data points returned.")
+    return response, 200
+
 @app.route("/api/gee_ndvi_timeseries", methods=["POST"])
 @require_auth
+@limit_gee_concurrency("timeseries")
 def generate_ndvi_timeseries():
     # [TIMING] Start total request timer
     request_start_time = time.perf_counter()
@@ -1935,273 +1865,145 @@ def generate_ndvi_timeseries():
         cache_elapsed = time.perf_counter() - cache_start_time
         logger.info(f"[TIMING] Cache lookup (miss): {cache_elapsed:.3f}s")
         
-        # Log incoming request
-        logger.info(f"Processing {index_type} time series: start={start}, end={end}, crop={crop}")
-        
-        # [TIMING] Create Earth Engine geometry  
-        geometry_start_time = time.perf_counter()
-        polygon = ee.Geometry.Polygon(coords)
-        geometry_elapsed = time.perf_counter() - geometry_start_time
-        logger.info(f"[TIMING] Geometry creation: {geometry_elapsed:.3f}s")
+        # [TIMING] Compute and cache the time series response
+        response, status_code = compute_ndvi_timeseries(
+            coords, start, end, index_type, crop, force_winter_detector, cache_key
+        )
+        total_elapsed = time.perf_counter() - request_start_time
+        logger.info(f"[TIMING] Total request time: {total_elapsed:.3f}s")
+        return jsonify(response), status_code
 
-        # [TIMING] Get optimized collection (don't limit for time series)
-        collection_start_time = time.perf_counter()
-        collection, collection_size, avg_collection_cloud_cover = get_optimized_collection(polygon, start, end, limit_images=False)
-        collection_elapsed = time.perf_counter() - collection_start_time
-        logger.info(f"[TIMING] GEE collection filtered: {collection_elapsed:.3f}s")
+    except Exception as e:
+        total_elapsed = time.perf_counter() - request_start_time
+        error_message = str(e)
+        stack_trace = traceback.format_exc()
+        logger.error(f"[TIMING] Error in GEE time series processing: {error_message}")
+        logger.error(f"[TIMING] Total request time (error): {total_elapsed:.3f}s")
+        logger.error(f"Stack trace: {stack_trace}")
         
-        if collection is None or collection_size == 0:
-            total_elapsed = time.perf_counter() - request_start_time
-            logger.info(f"[TIMING] Total request time (no data): {total_elapsed:.3f}s")
+        return jsonify({
+            "success": False, 
+            "error": error_message,
+            "stack_trace": stack_trace
+        }), 500
+
+@app.route("/api/gee_ndvi_timeseries/batch", methods=["POST"])
+@require_auth
+@limit_gee_concurrency("batch")
+def generate_ndvi_timeseries_batch():
+    """
+    Time series for many fields from one aggregated Earth Engine query.
+    Body: {"fields": [{"id", "coordinates", "crop"}], "startDate", "endDate",
+    "index_type", "forceWinterDetector"}
+    """
+    request_start_time = time.perf_counter()
+    
+    try:
+        if not gee_initialized:
             return jsonify({
                 "success": False, 
-                "error": "No Sentinel-2 imagery found for the specified date range and location",
-                "empty_collection": True
-            }), 404
+                "error": "GEE not initialized",
+                "details": "Please restart the server or contact support."
+            }), 500
         
-        # [TIMING] Get cloud probability collection for joining
-        cloud_prob_start_time = time.perf_counter()
-        cloud_prob_collection = (
-            ee.ImageCollection('COPERNICUS/S2_CLOUD_PROBABILITY')
-            .filterBounds(polygon)
-            .filterDate(start, end)
-        )
-        cloud_prob_elapsed = time.perf_counter() - cloud_prob_start_time
-        logger.info(f"[TIMING] Cloud probability collection prepared: {cloud_prob_elapsed:.3f}s")
+        data = request.get_json()
+        fields = data.get("fields") or []
+        start = data.get("startDate")
+        end = data.get("endDate")
+        force_winter_detector = data.get("forceWinterDetector", False)
+        index_type = data.get("index_type", "NDVI")
         
-        # [TIMING] OPTIMIZED: Add index and cloud statistics to image properties
-        def add_index_and_cloud_stats(image):
-            """Add index statistics and cloud cover to image properties using S2_CLOUD_PROBABILITY"""
-            clipped = image.clip(polygon)
-            
-            # Calculate the selected index
-            index_image = get_index(clipped, index_type)
-            
-            # Calculate mean for the polygon
-            index_mean = index_image.reduceRegion(
-                reducer=ee.Reducer.mean(),
-                geometry=polygon,
-                scale=10,
-                maxPixels=1e9
-            ).get(index_type)
-            
-            # Get scene-level cloud cover
-            scene_cloud_cover = image.get("CLOUDY_PIXEL_PERCENTAGE")
-            
-            # Calculate field-specific cloud cover using S2_CLOUD_PROBABILITY
-            system_index = image.get('system:index')
-            cloud_prob_filtered = cloud_prob_collection.filter(
-                ee.Filter.eq('system:index', system_index)
-            )
-            
-            cloud_prob_size = cloud_prob_filtered.size()
-            cloud_prob_exists = cloud_prob_size.gt(0)
-            
-            def calculate_with_probability():
-                cloud_prob_image = cloud_prob_filtered.first()
-                probability = cloud_prob_image.select('probability').clip(polygon)
-                mean_cloud_prob = probability.reduceRegion(
-                    reducer=ee.Reducer.mean(),
-                    geometry=polygon,
-                    scale=20,
-                    maxPixels=1e9
-                ).get('probability')
-                return mean_cloud_prob
-            
-            def calculate_with_qa60():
-                band_names = image.bandNames()
-                qa60_exists = band_names.contains('QA60')
-                
-                def qa60_calculation():
-                    qa60 = image.select('QA60').clip(polygon)
-                    cloud_bit_10 = qa60.bitwiseAnd(1 << 10).gt(0)
-                    cloud_bit_11 = qa60.bitwiseAnd(1 << 11).gt(0)
-                    cloud_mask = cloud_bit_10.Or(cloud_bit_11)
-                    
-                    total_pixels = qa60.gte(0).reduceRegion(
-                        reducer=ee.Reducer.count(),
-                        geometry=polygon,
-                        scale=20,
-                        maxPixels=1e9
-                    ).get('QA60')
-                    
-                    cloudy_pixels = cloud_mask.reduceRegion(
-                        reducer=ee.Reducer.sum(),
-                        geometry=polygon,
-                        scale=20,
-                        maxPixels=1e9
-                    ).get('QA60')
-                    
-                    cloud_percentage = ee.Algorithms.If(
-                        ee.Number(total_pixels).gt(0),
-                        ee.Number(cloudy_pixels).divide(ee.Number(total_pixels)).multiply(100),
-                        0
-                    )
-                    return cloud_percentage
-                
-                return ee.Algorithms.If(qa60_exists, qa60_calculation(), 0)
-            
-            field_cloud = ee.Algorithms.If(
-                cloud_prob_exists,
-                calculate_with_probability(),
-                calculate_with_qa60()
-            )
-            
-            return image.set({
-                f'{index_type.lower()}_mean': index_mean,
-                'date_formatted': image.date().format('YYYY-MM-dd'),
-                'scene_cloud_percentage': scene_cloud_cover,
-                'field_cloud_percentage': field_cloud,
-                'cloud_method': ee.Algorithms.If(cloud_prob_exists, 's2_cloud_probability', 'qa60_fallback')
-            })
+        logger.info(f"[TIMING] Request started: /api/gee_ndvi_timeseries/batch | params: {{index_type: {index_type}, fields: {len(fields)}, dates: {start} to {end}}}")
         
-        # [TIMING] Map the function over the collection
-        stats_mapping_start_time = time.perf_counter()
-        collection_with_stats = collection.map(add_index_and_cloud_stats)
-        stats_mapping_elapsed = time.perf_counter() - stats_mapping_start_time
-        logger.info(f"[TIMING] Statistics mapping prepared: {stats_mapping_elapsed:.3f}s")
-        
-        # [TIMING] Get all data in batch
-        batch_start_time = time.perf_counter()
-        dates_array = collection_with_stats.aggregate_array('date_formatted')
-        index_array = collection_with_stats.aggregate_array(f'{index_type.lower()}_mean')
-        scene_cloud_array = collection_with_stats.aggregate_array('scene_cloud_percentage')
-        field_cloud_array = collection_with_stats.aggregate_array('field_cloud_percentage')
-        cloud_method_array = collection_with_stats.aggregate_array('cloud_method')
-        
-        logger.info("Getting time series data in batch with S2_CLOUD_PROBABILITY...")
-        batch_data = ee.Dictionary({
-            'dates': dates_array,
-            'index_values': index_array,
-            'scene_cloud_percentages': scene_cloud_array,
-            'field_cloud_percentages': field_cloud_array,
-            'cloud_methods': cloud_method_array
-        }).getInfo()
-        batch_elapsed = time.perf_counter() - batch_start_time
-        logger.info(f"[TIMING] Time series data extracted: {batch_elapsed:.3f}s")
-        
-        # [TIMING] Process batch data
-        processing_start_time = time.perf_counter()
-        dates = batch_data['dates']
-        index_values = batch_data['index_values']
-        scene_cloud_percentages = batch_data['scene_cloud_percentages']
-        field_cloud_percentages = batch_data['field_cloud_percentages']
-        cloud_methods = batch_data['cloud_methods']
-        
-        # Combine into time series data
-        index_time_series = []
-        
-        for i in range(len(dates)):
-            index_value = index_values[i]
-            
-            # Only add valid readings
-            if index_value is not None:
-                field_cloud_pct = field_cloud_percentages[i] if i < len(field_cloud_percentages) else None
-                cloud_method = cloud_methods[i] if i < len(cloud_methods) else 'unknown'
-                
-                # Use field-specific cloud cover as primary, fallback to scene
-                display_cloud_pct = field_cloud_pct if field_cloud_pct is not None else scene_cloud_percentages[i]
-                
-                # Use generic key name for compatibility (keep 'ndvi' for backwards compatibility)
-                data_point = {
-                    "date": dates[i],
-                    "ndvi": index_value, # Keep for backwards compatibility
-                    f"{index_type.lower()}": index_value, # Add index-specific key
-                    "cloud_percentage": display_cloud_pct,
-                    "scene_cloud_percentage": scene_cloud_percentages[i],
-                    "field_cloud_percentage": field_cloud_pct,
-                    "cloud_calculation_method": cloud_method
-                }
-                
-                index_time_series.append(data_point)
+        # Validate inputs
+        if not fields or not start or not end:
+            return jsonify({"success": False, "error": "Missing input fields"}), 400
         
-        processing_elapsed = time.perf_counter() - processing_start_time
-        logger.info(f"[TIMING] Data processing completed: {processing_elapsed:.3f}s")
+        if len(fields) > BATCH_MAX_FIELDS:
+            return jsonify({
+                "success": False,
+                "error": f"Too many fields: at most {BATCH_MAX_FIELDS} per batch request"
+            }), 400
         
-        # Verify we have sufficient data points
-        if len(index_time_series) == 0:
-            total_elapsed = time.perf_counter() - request_start_time
-            logger.info(f"[TIMING] Total request time (no valid readings): {total_elapsed:.3f}s")
+        valid_indices = ["NDVI", "EVI", "SAVI", "NDMI", "NDWI"]
+        if index_type not in valid_indices:
             return jsonify({
-                "success": False, 
-                "error": f"No valid {index_type} readings could be calculated for this field",
-                "empty_time_series": True
-            }), 404
+                "success": False,
+                "error": f"Invalid index_type for time series. Must be one of: {', '.join(valid_indices)}"
+            }), 400
         
-        # Sort time series by date
-        index_time_series.sort(key=lambda x: x["date"])
+        normalized_fields = []
+        for position, field in enumerate(fields):
+            coords = field.get("coordinates") if isinstance(field, dict) else None
+            if not isinstance(coords, list) or len(coords) == 0 or len(coords[0]) < 3:
+                return jsonify({
+                    "success": False,
+                    "error": f"Invalid polygon for field at position {position}: must have at least 3 points"
+                }), 400
+            normalized_fields.append({
+                "id": str(field.get("id", position)),
+                "coordinates": coords,
+                "crop": field.get("crop", "") or ""
+            })
         
-        # Calculate average cloud cover across time series
-        valid_cloud_values = [item["cloud_percentage"] for item in index_time_series if item["cloud_percentage"] is not None]
-        avg_cloud_cover_ts = sum(valid_cloud_values) / len(valid_cloud_values) if valid_cloud_values else None
+        # [TIMING] One aggregated Earth Engine query for all fields
+        fetch_start_time = time.perf_counter()
+        observations_by_field, collection_size = fetch_batch_index_observations(
+            normalized_fields, start, end, index_type
+        )
+        fetch_elapsed = time.perf_counter() - fetch_start_time
+        logger.info(f"[TIMING] Batch GEE fetch for {len(normalized_fields)} fields: {fetch_elapsed:.3f}s")
         
-        # Prepare enriched response with updated index config
+        if collection_size == 0:
+            return jsonify({
+                "success": False, 
+                "error": "No Sentinel-2 imagery found for the specified date range and location",
+                "empty_collection": True
+            }), 404
+        
+        # [TIMING] Per-field assembly and emergence detection run locally
         config = INDEX_CONFIGS[index_type]
-        response = {
+        results = {}
+        for field in normalized_fields:
+            index_time_series = sorted(observations_by_field.get(field["id"], []), key=lambda x: x["date"])
+            if not index_time_series:
+                results[field["id"]] = {
+                    "success": False,
+                    "error": f"No valid {index_type} readings could be calculated for this field",
+                    "empty_time_series": True
+                }
+                continue
+            
+            valid_cloud_values = [item["cloud_percentage"] for item in index_time_series if item["cloud_percentage"] is not None]
+            field_response = {
+                "success": True,
+                "time_series": index_time_series,
+                "cloud_cover": sum(valid_cloud_values) / len(valid_cloud_values) if valid_cloud_values else None
+            }
+            
+            if index_type == "NDVI" and field["crop"].lower() == 'wheat':
+                add_wheat_emergence(field_response, index_time_series, field["coordinates"], force_winter_detector)
+            
+            results[field["id"]] = field_response
+        
+        total_elapsed = time.perf_counter() - request_start_time
+        logger.info(f"[TIMING] Total batch request time: {total_elapsed:.3f}s")
+        return jsonify({
             "success": True,
             "index": index_type,
             "palette": config["palette"],
             "range": config["range"],
             "explanation": config["explanation"],
-            "time_series": index_time_series,
             "collection_size": collection_size,
-            "cloud_cover": avg_cloud_cover_ts,  # NEW: Average cloud cover using S2_CLOUD_PROBABILITY
-            "cloud_calculation_method": "s2_cloud_probability_timeseries"
-        }
-        
-        # [TIMING] NEW: Add wheat emergence detection if this is a wheat field AND using NDVI
-        if index_type == "NDVI" and crop.lower() == 'wheat':
-            wheat_detection_start_time = time.perf_counter()
-            logger.info("Running wheat emergence detection on time series...")
-            try:
-                wheat_emergence, wheat_confidence, wheat_metadata = detect_wheat_winter_emergence(
-                    index_time_series, coords, force_winter_detector
-                )
-                
-                if wheat_emergence:
-                    response["emergence_date"] = wheat_emergence
-                    response["emergence_confidence"] = wheat_confidence
-                    
-                    if "cloud_at_emergence_pct" in wheat_metadata:
-                        response["cloud_at_emergence_pct"] = wheat_metadata["cloud_at_emergence_pct"]
-                    if "used_field_cloud" in wheat_metadata:
-                        response["used_field_cloud"] = wheat_metadata["used_field_cloud"]
-                    if "qa" in wheat_metadata:
-                        response["qa"] = wheat_metadata["qa"]
-                    if "spatial_adaptation" in wheat_metadata:
-                        response["spatial_adaptation"] = wheat_metadata["spatial_adaptation"]
-                        
-                    logger.info(f"Wheat emergence detected: {wheat_emergence} (confidence: {wheat_confidence})")
-                else:
-                    logger.info("No wheat emergence detected")
-                    if "qa" in wheat_metadata:
-                        response["qa"] = wheat_metadata["qa"]
-                        
-            except Exception as e:
-                logger.error(f"Error in wheat emergence detection: {e}")
-                response["wheat_detection_error"] = str(e)
-            
-            wheat_detection_elapsed = time.perf_counter() - wheat_detection_start_time
-            logger.info(f"[TIMING] Wheat emergence detection: {wheat_detection_elapsed:.3f}s")
-        
-        # [TIMING] Cache the response
-        cache_store_start_time = time.perf_counter()
-        with cache_lock:
-            cache[cache_key] = response
-        cache_store_elapsed = time.perf_counter() - cache_store_start_time
-        logger.info(f"[TIMING] Response cached: {cache_store_elapsed:.3f}s")
-        
-        # [TIMING] Log total time and return
-        total_elapsed = time.perf_counter() - request_start_time
-        logger.info(f"Successfully processed {index_type} time series with S2_CLOUD_PROBABILITY. {len(index_time_series)} data points returned.")
-        logger.info(f"[TIMING] Total request time: {total_elapsed:.3f}s")
-        return jsonify(response)
-
+            "cloud_calculation_method": "s2_cloud_probability_timeseries",
+            "fields": results
+        })
+    
     except Exception as e:
         total_elapsed = time.perf_counter() - request_start_time
         error_message = str(e)
         stack_trace = traceback.format_exc()
-        logger.error(f"[TIMING] Error in GEE time series processing: {error_message}")
+        logger.error(f"[TIMING] Error in GEE batch time series processing: {error_message}")
         logger.error(f"[TIMING] Total request time (error): {total_elapsed:.3f}s")
         logger.error(f"Stack trace: {stack_trace}")
         
@@ -2211,6 +2013,204 @@ def generate_ndvi_timeseries():
             "stack_trace": stack_trace
         }), 500
 
+def get_dashboard_date_range(days=WARMUP_DATE_RANGE_DAYS):
+    """Default dashboard date range (UTC, same as Utils.getDefaultDateRange in the dashboard)"""
+    today = datetime.utcnow().date()
+    return (today - timedelta(days=days)).isoformat(), today.isoformat()
+
+def parse_warmup_fields(source):
+    """
+    Normalize a GeoJSON FeatureCollection (or a list of {id, coordinates, crop}) into
+    warm-up fields whose coordinates match what the dashboard sends for the same field.
+    """
+    if isinstance(source, dict) and source.get("type") == "FeatureCollection":
+        items = source.get("features", [])
+    elif isinstance(source, list):
+        items = source
+    else:
+        raise ValueError("Fields must be a GeoJSON FeatureCollection or a list of fields")
+    
+    fields = []
+    for position, item in enumerate(items):
+        if not isinstance(item, dict):
+            continue
+        if item.get("type") == "Feature":
+            geometry = item.get("geometry") or {}
+            properties = item.get("properties") or {}
+            if geometry.get("type") != "Polygon" or not geometry.get("coordinates"):
+                continue
+            # The dashboard posts [outer ring] for Polygon fields
+            coords = [geometry["coordinates"][0]]
+            field_id = properties.get("id", item.get("id", position))
+            crop = properties.get("crop") or ""
+        else:
+            coords = item.get("coordinates")
+            field_id = item.get("id", position)
+            crop = item.get("crop", "") or ""
+        
+        if not isinstance(coords, list) or len(coords) == 0 or len(coords[0]) < 3:
+            continue
+        fields.append({"id": str(field_id), "coordinates": coords, "crop": crop})
+    
+    return fields[:WARMUP_MAX_FIELDS]
+
+def load_configured_warmup_fields():
+    """Load warm-up fields from WARMUP_FIELDS_URL or WARMUP_FIELDS_FILE"""
+    if WARMUP_FIELDS_URL:
+        with urllib.request.urlopen(WARMUP_FIELDS_URL, timeout=30) as response:
+            return parse_warmup_fields(json.loads(response.read().decode("utf-8")))
+    if WARMUP_FIELDS_FILE:
+        with open(WARMUP_FIELDS_FILE) as f:
+            return parse_warmup_fields(json.load(f))
+    return []
+
+def get_latest_image_date(fields, start, end):
+    """Date of the newest Sentinel-2 scene over the warm-up fields, used to detect new imagery"""
+    region = ee.Geometry.MultiPolygon([field["coordinates"] for field in fields]).bounds()
+    latest = (
+        ee.ImageCollection("COPERNICUS/S2_HARMONIZED")
+        .filterBounds(region)
+        .filterDate(start, (datetime.fromisoformat(end) + timedelta(days=1)).date().isoformat())
+        .aggregate_max("system:time_start")
+        .getInfo()
+    )
+    if latest is None:
+        return None
+    return datetime.utcfromtimestamp(latest / 1000).date().isoformat()
+
+def warm_field(field, task_type, index_type, start, end):
+    """Compute one cached dashboard response for a field. Returns True if it was already cached."""
+    coords = field["coordinates"]
+    if task_type == "tiles":
+        cache_key = get_cache_key(coords, start, end, "ndvi_tiles", index_type)
+    else:
+        cache_key = get_cache_key(coords, start, end, "ndvi_timeseries", index_type)
+    
+    with cache_lock:
+        if cache_key in cache:
+            return True
+    
+    if task_type == "tiles":
+        compute_ndvi_tiles(coords, start, end, index_type, cache_key)
+    else:
+        compute_ndvi_timeseries(coords, start, end, index_type, field["crop"], False, cache_key)
+    return False
+
+def run_field_warmup(fields, trigger, latest_image_date=None):
+    """Warm the response cache for all fields with bounded concurrency, recording progress"""
+    start, end = get_dashboard_date_range()
+    tasks = [(field, "tiles", index_type) for field in fields for index_type in WARMUP_TILE_INDICES]
+    if WARMUP_TIMESERIES_INDEX:
+        tasks += [(field, "timeseries", WARMUP_TIMESERIES_INDEX) for field in fields]
+    
+    warmup_start_time = time.perf_counter()
+    logger.info(f"[TIMING] Field warm-up started ({trigger}): {len(fields)} fields, {len(tasks)} tasks, {start} to {end}")
+    
+    def run_task(task):
+        field, task_type, index_type = task
+        try:
+            was_cached = warm_field(field, task_type, index_type, start, end)
+            with warmup_state_lock:
+                warmup_state["completed_tasks"] += 1
+                if was_cached:
+                    warmup_state["cache_hits"] += 1
+        except Exception as e:
+            logger.error(f"Warm-up failed for field {field['id']} ({task_type} {index_type}): {e}")
+            with warmup_state_lock:
+                warmup_state["completed_tasks"] += 1
+                warmup_state["failed_tasks"] += 1
+                warmup_state["last_error"] = str(e)
+    
+    try:
+        with ThreadPoolExecutor(max_workers=WARMUP_CONCURRENCY, thread_name_prefix="warmup") as executor:
+            list(executor.map(run_task, tasks))
+        status = "completed"
+    except Exception as e:
+        logger.error(f"Field warm-up error: {e}")
+        with warmup_state_lock:
+            warmup_state["last_error"] = str(e)
+        status = "failed"
+    
+    with warmup_state_lock:
+        warmup_state["status"] = status
+        warmup_state["finished_at"] = datetime.now().isoformat()
+        if latest_image_date:
+            warmup_state["latest_image_date"] = latest_image_date
+        summary = dict(warmup_state)
+    
+    warmup_elapsed = time.perf_counter() - warmup_start_time
+    logger.info(f"[TIMING] Field warm-up {status}: {summary['completed_tasks']}/{summary['total_tasks']} tasks "
+                f"({summary['cache_hits']} already cached, {summary['failed_tasks']} failed) in {warmup_elapsed:.3f}s")
+
+def start_field_warmup(fields, trigger, latest_image_date=None):
+    """Start a background warm-up run. Returns False if a run is already in progress."""
+    tasks_per_field = len(WARMUP_TILE_INDICES) + (1 if WARMUP_TIMESERIES_INDEX else 0)
+    with warmup_state_lock:
+        if warmup_state["status"] == "running":
+            return False
+        warmup_state.update({
+            "status": "running",
+            "trigger": trigger,
+            "started_at": datetime.now().isoformat(),
+            "finished_at": None,
+            "fields": len(fields),
+            "total_tasks": len(fields) * tasks_per_field,
+            "completed_tasks": 0,
+            "cache_hits": 0,
+            "failed_tasks": 0,
+            "date_range": list(get_dashboard_date_range()),
+            "last_error": None
+        })
+    
+    threading.Thread(
+        target=run_field_warmup, args=(fields, trigger, latest_image_date), daemon=True, name="field-warmup"
+    ).start()
+    return True
+
+def warmup_scheduler_loop():
+    """
+    Periodically re-warm configured fields. A run is skipped while the newest imagery,
+    the date range and the cached responses are all unchanged since the last run.
+    """
+    interval_seconds = WARMUP_INTERVAL_MINUTES * 60
+    while True:
+        try:
+            if gee_initialized:
+                fields = load_configured_warmup_fields()
+                if fields:
+                    start, end = get_dashboard_date_range()
+                    latest_image_date = get_latest_image_date(fields, start, end)
+                    with warmup_state_lock:
+                        last_image_date = warmup_state["latest_image_date"]
+                        last_date_range = warmup_state["date_range"]
+                        last_finished = warmup_state["finished_at"]
+                    cache_still_warm = (
+                        last_finished is not None
+                        and (datetime.now() - datetime.fromisoformat(last_finished)).total_seconds() < cache.ttl - interval_seconds
+                    )
+                    if latest_image_date == last_image_date and last_date_range == [start, end] and cache_still_warm:
+                        logger.info(f"Scheduled warm-up skipped: no new imagery since {latest_image_date}")
+                    else:
+                        start_field_warmup(fields, "schedule", latest_image_date)
+        except Exception as e:
+            logger.error(f"Warm-up scheduler error: {e}")
+            with warmup_state_lock:
+                warmup_state["last_error"] = str(e)
+        time.sleep(interval_seconds)
+
+@app.before_request
+def ensure_warmup_scheduler():
+    """Start the warm-up scheduler once per worker process (threads do not survive a --preload fork)"""
+    global warmup_scheduler_pid
+    if WARMUP_INTERVAL_MINUTES <= 0 or warmup_scheduler_pid == os.getpid():
+        return
+    with warmup_state_lock:
+        if warmup_scheduler_pid == os.getpid():
+            return
+        warmup_scheduler_pid = os.getpid()
+    threading.Thread(target=warmup_scheduler_loop, daemon=True, name="warmup-scheduler").start()
+    logger.info(f"Warm-up scheduler started every {WARMUP_INTERVAL_MINUTES} minutes")
+
 # NEW: Pre-initialization at startup for preload mode
 def startup_initialization():
     """Called during app startup when using --preload"""
@@ -2220,7 +2220,7 @@ def startup_initialization():
         logger.info(f"✓ GEE Preload Success: {message}")
         logger.info(f"✓ Multi-Index Support: ENABLED (NDVI, EVI, SAVI, NDMI, NDWI, RGB)")
         logger.info(f"✓ Wheat Winter Detection: ENABLED")
-        logger.info(f"✓ Spatial Adaptation Cache: READY")
+        logger.info(f"✓ Spatial Prior Store: {spatial_prior_store.path}")
         logger.info(f"✓ Updated Visualization Ranges: NDMI [-0.2, 0.6], NDWI [0.05, 0.4]")
         logger.info(f"✓ S2_CLOUD_PROBABILITY Method: ENABLED")
         logger.info(f"✓ Authentication Middleware: LOADED")
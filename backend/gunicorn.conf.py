@@ -0,0 +1,16 @@
+"""
+Gunicorn settings for the NDVI Flask service (gee_ndvi_generator:app)
+gevent workers let one process hold hundreds of requests waiting on Earth Engine;
+the per-endpoint GEE_LIMIT_* semaphores bound how many run at once.
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8080')}"
+worker_class = "gevent"
+workers = int(os.environ.get("WEB_CONCURRENCY", 1))
+worker_connections = int(os.environ.get("GUNICORN_WORKER_CONNECTIONS", 500))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 300))
+
+# The app must be imported after the gevent worker monkey-patches threading and sockets
+preload_app = False
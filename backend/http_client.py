@@ -0,0 +1,242 @@
+"""
+Shared HTTP client for outbound calls (OpenAI, Earth Engine downloads)
+One pooled keep-alive requests.Session per process, bounded retries with
+jittered exponential backoff (honouring Retry-After), a per-host circuit
+breaker and per-host latency histograms.
+"""
+
+import email.utils
+import logging
+import os
+import random
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 25.0, 60.0, float("inf"))
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Raised without making a request while a host's circuit is open"""
+
+
+class CircuitBreaker:
+    """Opens after consecutive failures, half-opens for one trial call after reset_timeout"""
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+        self.lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        with self.lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half_open" and not self.trial_in_flight:
+                self.trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_in_flight = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            self.trial_in_flight = False
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+class LatencyHistogram:
+    """Cumulative latency histogram in the Prometheus bucket layout"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.total = 0.0
+        self.lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        with self.lock:
+            self.count += 1
+            self.total += seconds
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    self.counts[i] += 1
+                    break
+
+    def snapshot(self) -> Dict:
+        with self.lock:
+            cumulative, buckets = 0, {}
+            for bound, count in zip(self.buckets, self.counts):
+                cumulative += count
+                buckets["+Inf" if bound == float("inf") else str(bound)] = cumulative
+            return {"count": self.count, "sum": round(self.total, 4), "buckets": buckets}
+
+
+class HTTPClient:
+    """Pooled, retrying HTTP client with per-host circuit breakers and latency metrics"""
+
+    def __init__(self, max_retries: int = 3, backoff_base: float = 0.5, backoff_max: float = 8.0,
+                 pool_maxsize: int = 20, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.pool_maxsize = pool_maxsize
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._session = None
+        self._session_pid = None
+        self._lock = threading.Lock()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._counters: Dict[str, Dict[str, int]] = {}
+
+    def session(self) -> requests.Session:
+        """Keep-alive session for this process (recreated after a fork)"""
+        with self._lock:
+            if self._session is None or self._session_pid != os.getpid():
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=10, pool_maxsize=self.pool_maxsize, max_retries=0)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._session, self._session_pid = session, os.getpid()
+            return self._session
+
+    def _host_state(self, host: str):
+        with self._lock:
+            if host not in self._breakers:
+                self._breakers[host] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+                self._histograms[host] = LatencyHistogram()
+                self._counters[host] = {"requests": 0, "retries": 0, "failures": 0, "rejected": 0}
+            return self._breakers[host], self._histograms[host], self._counters[host]
+
+    def _backoff(self, attempt: int, response: Optional[requests.Response] = None) -> float:
+        """Retry-After when the server sent one, otherwise full-jitter exponential backoff"""
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                try:
+                    parsed = email.utils.parsedate_to_datetime(retry_after)
+                    return min(max(parsed.timestamp() - time.time(), 0.0), self.backoff_max)
+                except (TypeError, ValueError):
+                    pass
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def request(self, method: str, url: str, timeout=30, deadline: Optional[float] = None,
+                retry_statuses=RETRY_STATUSES, **kwargs) -> requests.Response:
+        """
+        Send a request, retrying connection errors, timeouts and retry_statuses.
+        deadline bounds the total time across attempts in seconds (per-attempt read
+        timeouts are shortened to fit). Raises CircuitOpenError while the host's
+        circuit is open.
+        """
+        host = urlsplit(url).netloc
+        breaker, histogram, counters = self._host_state(host)
+        if not breaker.allow():
+            counters["rejected"] += 1
+            raise CircuitOpenError(f"Circuit open for {host}")
+
+        started = time.monotonic()
+        # Any exception, not only request errors, counts as a failure so a half-open
+        # trial never stays in flight
+        try:
+            for attempt in range(self.max_retries + 1):
+                attempt_timeout = timeout
+                if deadline is not None and isinstance(timeout, (int, float)):
+                    attempt_timeout = max(min(timeout, deadline - (time.monotonic() - started)), 0.1)
+
+                counters["requests"] += 1
+                attempt_start = time.monotonic()
+                try:
+                    response = self.session().request(method, url, timeout=attempt_timeout, **kwargs)
+                except requests.exceptions.RequestException as e:
+                    histogram.observe(time.monotonic() - attempt_start)
+                    delay = self._backoff(attempt)
+                    retryable = isinstance(e, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+                    if not retryable or attempt == self.max_retries or not self._fits(started, deadline, delay):
+                        counters["failures"] += 1
+                        raise
+                    logger.warning(f"{method} {host} failed ({type(e).__name__}), retrying in {delay:.2f}s")
+                    counters["retries"] += 1
+                    time.sleep(delay)
+                    continue
+
+                histogram.observe(time.monotonic() - attempt_start)
+                if response.status_code in retry_statuses:
+                    delay = self._backoff(attempt, response)
+                    if attempt < self.max_retries and self._fits(started, deadline, delay):
+                        logger.warning(f"{method} {host} returned {response.status_code}, retrying in {delay:.2f}s")
+                        counters["retries"] += 1
+                        response.close()
+                        time.sleep(delay)
+                        continue
+                    counters["failures"] += 1
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+                return response
+        except BaseException:
+            breaker.record_failure()
+            raise
+
+    @staticmethod
+    def _fits(started: float, deadline: Optional[float], delay: float) -> bool:
+        """Whether a retry after delay still leaves time before the deadline"""
+        return deadline is None or (time.monotonic() - started) + delay < deadline
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def stats(self) -> Dict:
+        """Per-host circuit state, counters and latency histogram for this process"""
+        with self._lock:
+            hosts = list(self._breakers)
+        return {
+            host: {
+                "circuit": self._breakers[host].state,
+                **self._counters[host],
+                "latency_seconds": self._histograms[host].snapshot()
+            }
+            for host in hosts
+        }
+
+
+# Global instance
+http_client = HTTPClient(
+    max_retries=settings.HTTP_MAX_RETRIES,
+    pool_maxsize=settings.HTTP_POOL_MAXSIZE,
+    failure_threshold=settings.HTTP_CIRCUIT_FAILURES,
+    reset_timeout=settings.HTTP_CIRCUIT_RESET_SECONDS
+)
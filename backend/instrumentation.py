@@ -0,0 +1,257 @@
+"""
+Per-stage instrumentation for visualization jobs
+Processor stages are wrapped in stage(name). While a JobInstrumentation is
+active in the current context, each stage records its wall time, RSS after the
+stage, RSS delta, the stage's peak RSS (sampled on a background thread while it
+runs) and bytes handled, after calling the job's on_stage_start hook (used to
+flush coalesced progress). Outside a job, stages are no-ops. The results are written to JobMetrics, and percentile summaries are
+served on /api/metrics/prometheus.
+"""
+
+import logging
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+import psutil
+
+logger = logging.getLogger(__name__)
+
+# Stages counted as Earth Engine and cartography time in JobMetrics
+GEE_STAGES = ('geometry', 'gee_composites', 'gee_statistics', 'download')
+CARTOGRAPHY_STAGES = ('render', 'save')
+
+QUANTILES = (0.5, 0.9, 0.99)
+
+# Seconds between RSS samples inside a stage; shorter spikes can be missed
+RSS_SAMPLE_INTERVAL = 0.05
+
+_current: ContextVar[Optional['JobInstrumentation']] = ContextVar('job_instrumentation', default=None)
+
+
+def _rss_mb() -> float:
+    return psutil.Process(os.getpid()).memory_info().rss / (1024 * 1024)
+
+
+class RSSSampler:
+    """Background thread tracking the highest RSS of this process until stop()"""
+
+    def __init__(self, interval: float = RSS_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.process = psutil.Process(os.getpid())
+        self.peak = 0.0
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, name='rss-sampler', daemon=True)
+
+    def sample(self) -> float:
+        rss = self.process.memory_info().rss / (1024 * 1024)
+        self.peak = max(self.peak, rss)
+        return rss
+
+    def _run(self):
+        while not self.stopped.wait(self.interval):
+            self.sample()
+
+    def start(self) -> 'RSSSampler':
+        self.sample()
+        self.thread.start()
+        return self
+
+    def stop(self) -> float:
+        """Stop sampling and return the peak RSS in MB, including a final sample"""
+        self.stopped.set()
+        self.thread.join()
+        self.sample()
+        return self.peak
+
+
+class JobInstrumentation:
+    """Stage recorder for one job; activate() makes it the target of stage()"""
+
+    def __init__(self, job_id: str, on_stage_start: Optional[Callable[[], None]] = None):
+        self.job_id = job_id
+        self.on_stage_start = on_stage_start
+        self.stages: Dict[str, Dict] = {}
+        self.started = time.monotonic()
+        self.cpu_started = time.process_time()
+
+    @contextmanager
+    def activate(self):
+        token = _current.set(self)
+        try:
+            yield self
+        finally:
+            _current.reset(token)
+
+    def stage_started(self, name: str):
+        if self.on_stage_start is None:
+            return
+        try:
+            self.on_stage_start()
+        except Exception as e:
+            logger.error(f"Stage start hook failed before {name} for job {self.job_id}: {e}")
+
+    def record(self, name: str, seconds: float, rss_before: float, peak_rss: float, nbytes: int = 0):
+        rss_after = _rss_mb()
+        # Repeated stages (e.g. retried downloads) accumulate
+        entry = self.stages.setdefault(name, {'seconds': 0.0, 'rss_delta_mb': 0.0, 'bytes': 0, 'calls': 0})
+        entry['seconds'] = round(entry['seconds'] + seconds, 4)
+        entry['rss_delta_mb'] = round(entry['rss_delta_mb'] + rss_after - rss_before, 2)
+        entry['rss_mb'] = round(rss_after, 2)
+        entry['peak_rss_mb'] = round(max(entry.get('peak_rss_mb', 0.0), peak_rss, rss_after), 2)
+        entry['bytes'] += nbytes
+        entry['calls'] += 1
+
+    def peak_rss_mb(self) -> float:
+        """Highest RSS sampled during any stage of the job"""
+        return max([entry['peak_rss_mb'] for entry in self.stages.values()] or [round(_rss_mb(), 2)])
+
+    def total_seconds(self, names) -> float:
+        return round(sum(self.stages[name]['seconds'] for name in names if name in self.stages), 4)
+
+    def elapsed_seconds(self) -> float:
+        return round(time.monotonic() - self.started, 4)
+
+    def cpu_percent(self) -> float:
+        wall = time.monotonic() - self.started
+        return round((time.process_time() - self.cpu_started) / wall * 100, 1) if wall > 0 else 0.0
+
+
+class StageRecord:
+    """Handle yielded by stage(); add_bytes() attributes data volume to the stage"""
+
+    def __init__(self):
+        self.bytes = 0
+
+    def add_bytes(self, nbytes: int):
+        self.bytes += int(nbytes or 0)
+
+
+@contextmanager
+def stage(name: str):
+    """Time a processing stage for the active job (no-op when none is active)"""
+    instrumentation = _current.get()
+    record = StageRecord()
+    if instrumentation is None:
+        yield record
+        return
+
+    instrumentation.stage_started(name)
+    rss_before = _rss_mb()
+    sampler = RSSSampler().start()
+    started = time.perf_counter()
+    try:
+        yield record
+    finally:
+        seconds = time.perf_counter() - started
+        instrumentation.record(name, seconds, rss_before, sampler.stop(), record.bytes)
+
+
+def output_size_mb(paths: Optional[Dict]) -> float:
+    return round(sum(os.path.getsize(path) for path in (paths or {}).values() if path and os.path.exists(path)) / (1024 * 1024), 3)
+
+
+def record_job_metrics(job_id: str, instrumentation: JobInstrumentation, total_seconds: float,
+                       geometry: Optional[Dict] = None, export_paths: Optional[Dict] = None):
+    """Write the JobMetrics row for a finished job; never raises"""
+    from .database import SessionLocal
+    from .models import JobMetrics, VisualizationJob
+    from .scheduling import geometry_area_km2
+
+    try:
+        with SessionLocal() as db:
+            job = db.query(VisualizationJob.created_at, VisualizationJob.started_at)\
+                    .filter(VisualizationJob.id == job_id).first()
+            queue_time = None
+            if job and job.created_at and job.started_at:
+                queue_time = (job.started_at.replace(tzinfo=None) - job.created_at.replace(tzinfo=None)).total_seconds()
+
+            db.add(JobMetrics(
+                job_id=job_id,
+                queue_time_seconds=queue_time,
+                gee_processing_time_seconds=instrumentation.total_seconds(GEE_STAGES),
+                cartography_time_seconds=instrumentation.total_seconds(CARTOGRAPHY_STAGES),
+                total_processing_time_seconds=total_seconds,
+                memory_usage_mb=instrumentation.peak_rss_mb(),
+                cpu_usage_percent=instrumentation.cpu_percent(),
+                input_geometry_area_km2=round(geometry_area_km2(geometry), 2) if geometry else None,
+                output_file_size_mb=output_size_mb(export_paths),
+                stage_timings=instrumentation.stages
+            ))
+            db.commit()
+    except Exception as e:
+        logger.error(f"Failed to record metrics for job {job_id}: {e}")
+
+
+def add_stage_metrics(job_id: str, name: str, seconds: float, nbytes: int = 0):
+    """Add a stage measured outside the job task (e.g. AI commentary) to the job's latest JobMetrics row"""
+    from .database import SessionLocal
+    from .models import JobMetrics
+
+    try:
+        with SessionLocal() as db:
+            metrics = db.query(JobMetrics).filter(JobMetrics.job_id == job_id)\
+                        .order_by(JobMetrics.recorded_at.desc()).first()
+            if not metrics:
+                return
+            stages = dict(metrics.stage_timings or {})
+            stages[name] = {'seconds': round(seconds, 4), 'bytes': nbytes, 'calls': 1}
+            metrics.stage_timings = stages
+            db.commit()
+    except Exception as e:
+        logger.error(f"Failed to add {name} metrics for job {job_id}: {e}")
+
+
+def quantile(values: List[float], q: float) -> float:
+    """Nearest-rank quantile of a sorted list"""
+    if not values:
+        return 0.0
+    return values[max(0, math.ceil(q * len(values)) - 1)]
+
+
+def stage_summaries(db, hours: int = 24, limit: int = 5000) -> Dict:
+    """
+    Per-stage summaries over recent jobs:
+    {'stages': {stage: {'seconds': [...], 'peak_rss_mb': [...], 'bytes': [...]}}, 'queue_time': [...], 'total': [...]}
+    with each list sorted, for percentile reporting
+    """
+    from .models import JobMetrics
+
+    rows = db.query(JobMetrics.stage_timings, JobMetrics.queue_time_seconds, JobMetrics.total_processing_time_seconds)\
+             .filter(JobMetrics.recorded_at >= datetime.utcnow() - timedelta(hours=hours))\
+             .order_by(JobMetrics.recorded_at.desc())\
+             .limit(limit)\
+             .all()
+
+    stages: Dict[str, Dict[str, List[float]]] = {}
+    queue_times, totals = [], []
+    for stage_timings, queue_time, total in rows:
+        for name, entry in (stage_timings or {}).items():
+            series = stages.setdefault(name, {'seconds': [], 'peak_rss_mb': [], 'bytes': []})
+            for key in series:
+                if entry.get(key) is not None:
+                    series[key].append(float(entry[key]))
+        if queue_time is not None:
+            queue_times.append(queue_time)
+        if total is not None:
+            totals.append(total)
+
+    for series in stages.values():
+        for values in series.values():
+            values.sort()
+    return {'stages': stages, 'queue_time': sorted(queue_times), 'total': sorted(totals)}
+
+
+def prometheus_summary(metric: str, values: List[float], labels: str = "") -> List[str]:
+    """Prometheus summary lines (quantiles, _sum, _count) for sorted values"""
+    prefix = f"{labels}," if labels else ""
+    lines = [f'{metric}{{{prefix}quantile="{q}"}} {round(quantile(values, q), 4)}' for q in QUANTILES]
+    suffix = f"{{{labels}}}" if labels else ""
+    lines.append(f"{metric}_sum{suffix} {round(sum(values), 4)}")
+    lines.append(f"{metric}_count{suffix} {len(values)}")
+    return lines
@@ -0,0 +1,99 @@
+"""
+Job event bus between Celery workers and the API's WebSocket connections
+Workers publish job updates to a Redis pub/sub channel; the API subscribes and
+forwards them to the clients watching that job. Without Redis, tasks run in the
+API process and events are delivered to in-process listeners directly.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+from typing import Awaitable, Callable, Dict, List
+
+from .config import settings
+
+JOB_EVENTS_CHANNEL = "yieldera:visualization:job_events"
+
+logger = logging.getLogger(__name__)
+
+_redis_client = None
+_redis_lock = threading.Lock()
+_local_listeners: List[Callable[[str, Dict], None]] = []
+
+
+def get_redis_client():
+    """Shared synchronous Redis client for publishing (None when Redis is not configured)"""
+    global _redis_client
+    if not settings.REDIS_URL:
+        return None
+    with _redis_lock:
+        if _redis_client is None:
+            import redis
+            _redis_client = redis.from_url(settings.REDIS_URL)
+        return _redis_client
+
+
+def add_local_listener(listener: Callable[[str, Dict], None]):
+    """Register an in-process listener called with (job_id, message) for every event"""
+    _local_listeners.append(listener)
+
+
+def publish_job_event(job_id: str, message: Dict):
+    """Publish a job update; never raises so a lost event cannot fail a job"""
+    for listener in list(_local_listeners):
+        try:
+            listener(job_id, dict(message))
+        except Exception as e:
+            logger.error(f"Local job event listener failed for job {job_id}: {e}")
+
+    try:
+        client = get_redis_client()
+        if client is not None:
+            client.publish(JOB_EVENTS_CHANNEL, json.dumps({"job_id": job_id, "message": message}, default=str))
+    except Exception as e:
+        logger.error(f"Failed to publish job event for job {job_id}: {e}")
+
+
+async def relay_job_events(send: Callable[[str, Dict], Awaitable[None]]):
+    """
+    Subscribe to the job event channel and pass each event to send(job_id, message).
+    Runs until cancelled, reconnecting with backoff when Redis drops the connection.
+    """
+    import redis.asyncio as aioredis
+
+    backoff = 1
+    while True:
+        client = None
+        pubsub = None
+        try:
+            client = aioredis.from_url(settings.REDIS_URL)
+            pubsub = client.pubsub(ignore_subscribe_messages=True)
+            await pubsub.subscribe(JOB_EVENTS_CHANNEL)
+            logger.info(f"Subscribed to job events on {JOB_EVENTS_CHANNEL}")
+            backoff = 1
+
+            while True:
+                event = await pubsub.get_message(timeout=1.0)
+                if event is None or event.get("type") != "message":
+                    continue
+                try:
+                    payload = json.loads(event["data"])
+                    await send(payload["job_id"], payload["message"])
+                except Exception as e:
+                    logger.error(f"Failed to relay job event: {e}")
+
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Job event subscription error: {e}, reconnecting in {backoff}s")
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30)
+        finally:
+            try:
+                if pubsub is not None:
+                    await pubsub.close()
+                if client is not None:
+                    await client.close()
+            except Exception:
+                pass
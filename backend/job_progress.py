@@ -0,0 +1,113 @@
+"""
+Throttled progress reporting for visualization jobs
+Progress ticks are coalesced so the job row, the Celery result backend and the
+job event channel are written at most once per minimum interval, with
+primary-key UPDATEs that skip the SELECT. A coalesced tick is flushed when the
+next instrumented stage starts, so a long stage shows its own message. Terminal
+states are always written, except over a cancelled job. Ticks are also
+cancellation points, checked at most once per minimum interval so coalesced
+ticks cost no Redis or database lookup.
+"""
+
+import logging
+import threading
+import time
+from typing import Optional
+
+from sqlalchemy import update
+
+from .cancellation import JobCancelled, is_cancelled
+from .config import settings
+from .database import SessionLocal
+from .job_events import publish_job_event
+from .models import VisualizationJob
+from .websocket_manager import format_job_progress_message
+
+logger = logging.getLogger(__name__)
+
+
+class JobProgressReporter:
+    """Coalescing progress writer for one job"""
+
+    def __init__(self, job_id: str, task=None, min_interval: Optional[float] = None):
+        self.job_id = job_id
+        self.task = task
+        self.min_interval = settings.PROGRESS_MIN_INTERVAL_SECONDS if min_interval is None else min_interval
+        self.last_flush = 0.0
+        self.last_cancel_check = 0.0
+        self.pending = None
+        self.lock = threading.Lock()
+        self.writes = 0
+        self.coalesced = 0
+
+    def update_job(self, **values) -> int:
+        """Primary-key UPDATE of the job row; returns the number of rows updated (0 once cancelled)"""
+        try:
+            with SessionLocal() as db:
+                result = db.execute(
+                    update(VisualizationJob)
+                    .where(VisualizationJob.id == self.job_id)
+                    .where(VisualizationJob.status != 'cancelled')
+                    .values(**values)
+                    .execution_options(synchronize_session=False)
+                )
+                db.commit()
+                self.writes += 1
+                return result.rowcount
+        except Exception as e:
+            logger.error(f"Failed to update job {self.job_id}: {e}")
+            return 0
+
+    def check_cancelled(self):
+        """Raise JobCancelled if the job has been cancelled"""
+        self.last_cancel_check = time.monotonic()
+        if is_cancelled(self.job_id):
+            raise JobCancelled(self.job_id)
+
+    def report(self, progress: int, message: str):
+        """
+        Progress callback: writes now if the interval has passed, otherwise keeps the latest tick.
+        Raises JobCancelled if the job has been cancelled (checked at most once per interval).
+        """
+        if time.monotonic() - self.last_cancel_check >= self.min_interval:
+            self.check_cancelled()
+        with self.lock:
+            now = time.monotonic()
+            if progress < 100 and now - self.last_flush < self.min_interval:
+                self.pending = (progress, message)
+                self.coalesced += 1
+                return
+            self.pending = None
+            self.last_flush = now
+        self._write(progress, message)
+
+    def flush(self):
+        """Write the latest coalesced tick, if any (called as each processing stage starts)"""
+        with self.lock:
+            pending, self.pending = self.pending, None
+            if pending:
+                self.last_flush = time.monotonic()
+        if pending:
+            self._write(*pending)
+
+    def finish(self, status: str, message: str, event: Optional[dict] = None, **values) -> int:
+        """
+        Terminal state (completed, failed, ...): written unless the job was cancelled,
+        pending ticks are dropped. Returns the number of rows updated.
+        """
+        with self.lock:
+            self.pending = None
+            self.last_flush = time.monotonic()
+        updated = self.update_job(status=status, message=message, **values)
+        if updated:
+            publish_job_event(self.job_id, event or {'type': 'status_update', 'status': status, 'message': message})
+        return updated
+
+    def _write(self, progress: int, message: str):
+        if self.task is not None:
+            try:
+                self.task.update_state(state='PROGRESS', meta={'progress': progress, 'message': message})
+            except Exception as e:
+                logger.error(f"Failed to update task state for job {self.job_id}: {e}")
+        self.update_job(progress=progress, message=message)
+        publish_job_event(self.job_id, format_job_progress_message(progress, message))
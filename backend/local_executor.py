@@ -0,0 +1,140 @@
+"""
+In-process task executor for single-node deployments without Redis
+Task bodies from celery_app run on a bounded thread pool in the API process,
+so requests return immediately instead of running the pipeline inline.
+Progress, job events and cooperative cancellation work as on Celery; retries
+are re-submitted after their countdown. Running tasks cannot be terminated.
+"""
+
+import logging
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from .config import settings
+
+# Finished task states kept for get_task_status
+MAX_TRACKED_TASKS = 1000
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+class LocalRetry(Exception):
+    """Returned by LocalTask.retry(); raising it ends the attempt like celery.exceptions.Retry"""
+
+
+class LocalTaskRequest:
+    def __init__(self, task_id: str, retries: int):
+        self.id = task_id
+        self.retries = retries
+
+
+class LocalTask:
+    """Stand-in for the bound Celery task passed to a task body"""
+
+    def __init__(self, executor: 'LocalExecutor', name: str, body: Callable, args: list,
+                 max_retries: int, task_id: str, retries: int = 0):
+        self.executor = executor
+        self.name = name
+        self.body = body
+        self.args = args
+        self.max_retries = max_retries
+        self.request = LocalTaskRequest(task_id, retries)
+
+    def update_state(self, state: str = None, meta: Optional[Dict] = None):
+        self.executor.set_state(self.request.id, state, meta)
+
+    def retry(self, countdown: float = 0, exc: Exception = None) -> LocalRetry:
+        self.executor.submit(self.name, self.body, self.args, self.max_retries,
+                             task_id=self.request.id, retries=self.request.retries + 1, countdown=countdown)
+        return LocalRetry(f"Retry in {countdown}s: {exc}")
+
+
+class LocalExecutor:
+    """Bounded thread pool running task bodies with Celery-like task states"""
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='viz-local')
+        self.states: 'OrderedDict[str, Dict]' = OrderedDict()
+        self.lock = threading.Lock()
+
+    def submit(self, name: str, body: Callable, args: list, max_retries: int = 0,
+               task_id: Optional[str] = None, retries: int = 0, countdown: float = 0) -> str:
+        """Queue body(task, *args) and return its task id (kept across retries)"""
+        task = LocalTask(self, name, body, list(args), max_retries, task_id or str(uuid.uuid4()), retries)
+        self.set_state(task.request.id, 'RETRY' if retries else 'PENDING', name=name)
+
+        if countdown:
+            timer = threading.Timer(countdown, self.pool.submit, args=(self._run, task))
+            timer.daemon = True
+            timer.start()
+        else:
+            self.pool.submit(self._run, task)
+        return task.request.id
+
+    def _run(self, task: LocalTask):
+        self.set_state(task.request.id, 'STARTED', started_at=datetime.utcnow().isoformat())
+        try:
+            result = task.body(task, *task.args)
+            self.set_state(task.request.id, 'SUCCESS', result=result)
+        except LocalRetry:
+            pass
+        except Exception as e:
+            logger.error(f"Local task {task.name} ({task.request.id}) failed: {e}")
+            self.set_state(task.request.id, 'FAILURE', result=str(e))
+
+    def set_state(self, task_id: str, state: Optional[str], meta: Optional[Dict] = None, **values):
+        with self.lock:
+            entry = self.states.pop(task_id, {'task_id': task_id})
+            if state:
+                entry['state'] = state
+            if meta is not None:
+                entry['meta'] = meta
+            entry.update(values)
+            self.states[task_id] = entry
+            while len(self.states) > MAX_TRACKED_TASKS:
+                self.states.popitem(last=False)
+
+    def status(self, task_id: str) -> Dict:
+        with self.lock:
+            entry = dict(self.states.get(task_id, {}))
+        return {
+            'task_id': task_id,
+            'status': entry.get('state', 'PENDING'),
+            'result': entry.get('result'),
+            'traceback': None,
+            'info': entry.get('meta')
+        }
+
+    def active(self) -> List[Dict]:
+        with self.lock:
+            return [dict(entry) for entry in self.states.values() if entry.get('state') in ('STARTED', 'PROGRESS')]
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+def get_local_executor() -> LocalExecutor:
+    """Executor shared by the whole API process, created on first use"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = LocalExecutor(settings.LOCAL_EXECUTOR_WORKERS)
+            logger.info(f"🧵 Local executor started with {settings.LOCAL_EXECUTOR_WORKERS} worker thread(s)")
+        return _executor
+
+
+def shutdown_local_executor():
+    """Drop queued tasks; tasks already running are left to finish"""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown()
+            _executor = None
@@ -21,19 +21,22 @@ import tempfile
 # Database imports
 from sqlalchemy.orm import Session
 from .database import get_db, engine
-from .models import VisualizationJob, Base
+from .models import VisualizationJob, Base, ensure_job_columns
 from .celery_app import process_visualization_job
 
 # API modules
 from .api.visualization import router as visualization_router
 from .api.health import router as health_router
 from .websocket_manager import ConnectionManager
+from .job_events import add_local_listener, relay_job_events
+from .local_executor import shutdown_local_executor
 
 # Configuration
 from .config import settings
 
 # Create tables
 Base.metadata.create_all(bind=engine)
+ensure_job_columns(engine)
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -176,12 +179,29 @@ async def startup_event():
     except Exception as e:
         logging.error(f"❌ Earth Engine initialization failed: {e}")
     
+    # Forward job events from the workers to WebSocket clients
+    if settings.REDIS_URL:
+        app.state.job_event_relay = asyncio.create_task(relay_job_events(manager.send_job_update))
+    else:
+        # Tasks run inside this process: deliver events on the event loop directly
+        loop = asyncio.get_running_loop()
+        add_local_listener(
+            lambda job_id, message: asyncio.run_coroutine_threadsafe(manager.send_job_update(job_id, message), loop)
+        )
+    
     logging.info("🎯 Yieldera Visualization API ready for requests")
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown"""
     logging.info("👋 Shutting down Yieldera Visualization API")
+    
+    relay = getattr(app.state, 'job_event_relay', None)
+    if relay:
+        relay.cancel()
+    
+    if settings.local_executor_enabled:
+        shutdown_local_executor()
 
 # =====================================
 # GLOBAL EXCEPTION HANDLERS
@@ -6,8 +6,10 @@ PostgreSQL setup for Render.com deployment
 from sqlalchemy import Column, String, DateTime, JSON, Integer, Text, Boolean, Float
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy import create_engine
-from datetime import datetime, timezone
+from sqlalchemy import create_engine, inspect, text
+from datetime import datetime, timezone, timedelta
+import logging
+import os
 import uuid
 from .config import settings
 
@@ -76,6 +78,15 @@ class VisualizationJob(Base):
     # Configuration
     visualization_config = Column(JSON)
     
+    # Deduplication: hash of the parameters that determine the output
+    fingerprint = Column(String, index=True)
+    
+    # Scheduling: cost-class queue the job was routed to
+    queue_class = Column(String, index=True)
+    
+    # Multi-region batch the job belongs to
+    batch_id = Column(String, index=True)
+    
     # Performance metrics
     processing_time_seconds = Column(Float)
     
@@ -98,6 +109,8 @@ class VisualizationJob(Base):
             'baseline_type': self.baseline_type,
             'baseline_config': self.baseline_config,
             'status': self.status,
+            'queue_class': self.queue_class,
+            'batch_id': self.batch_id,
             'progress': self.progress,
             'message': self.message,
             'statistics': self.statistics,
@@ -108,6 +121,16 @@ class VisualizationJob(Base):
             'export_paths': self.export_paths
         }
 
+class BatchJob(Base):
+    """Job listed in a multi-region batch (in-flight jobs a batch attached to keep their own batch_id)"""
+    __tablename__ = 'visualization_batch_jobs'
+    
+    batch_id = Column(String, primary_key=True)
+    job_id = Column(String, primary_key=True, index=True)
+    
+    def __repr__(self):
+        return f"<BatchJob(batch_id={self.batch_id}, job_id={self.job_id})>"
+
 class AnalysisPreset(Base):
     """Predefined analysis regions and parameters"""
     __tablename__ = 'analysis_presets'
@@ -165,6 +188,9 @@ class JobMetrics(Base):
     input_geometry_area_km2 = Column(Float)
     output_file_size_mb = Column(Float)
     
+    # Per-stage wall time, RSS and bytes: {stage: {seconds, rss_mb, rss_delta_mb, peak_rss_mb, bytes}}
+    stage_timings = Column(JSON)
+    
     # Timestamp
     recorded_at = Column(DateTime(timezone=True), default=datetime.utcnow)
     
@@ -218,6 +244,35 @@ def create_all_tables():
     """Create all database tables"""
     Base.metadata.create_all(bind=engine)
 
+# Columns added to existing tables after they were first created.
+# create_all() never alters existing tables, so these are added on startup.
+JOB_COLUMN_MIGRATIONS = {
+    'visualization_jobs': {
+        'fingerprint': ('VARCHAR', True),
+        'queue_class': ('VARCHAR', True),
+        'batch_id': ('VARCHAR', True),
+    },
+    'job_metrics': {
+        'stage_timings': ('JSON', False),
+    },
+}
+
+def ensure_job_columns(bind=None):
+    """Idempotently add missing job table columns and their indexes"""
+    bind = bind or engine
+    for table, columns in JOB_COLUMN_MIGRATIONS.items():
+        try:
+            existing = {column['name'] for column in inspect(bind).get_columns(table)}
+            with bind.begin() as conn:
+                for name, (ddl_type, indexed) in columns.items():
+                    if name not in existing:
+                        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {ddl_type}"))
+                        logging.info(f"Added column {table}.{name}")
+                    if indexed:
+                        conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_{table}_{name} ON {table} ({name})"))
+        except Exception as e:
+            logging.error(f"Failed to migrate {table} columns: {e}")
+
 def drop_all_tables():
     """Drop all database tables (development only)"""
     if settings.ENVIRONMENT == "development":
@@ -245,6 +300,8 @@ def get_active_jobs(db) -> list:
 
 def cleanup_old_jobs(db, days: int = 7):
     """Clean up old completed jobs"""
+    from .visualization.checkpoints import clear_checkpoints
+    
     cutoff_date = datetime.utcnow() - timedelta(days=days)
     
     old_jobs = db.query(VisualizationJob)\
@@ -252,7 +309,17 @@ def cleanup_old_jobs(db, days: int = 7):
                  .filter(VisualizationJob.status.in_(['completed', 'failed', 'cancelled']))\
                  .all()
     
+    old_ids = [job.id for job in old_jobs]
+    
     for job in old_jobs:
+        # Keep files still shared with newer jobs that reused this result
+        if job.map_image_path and db.query(VisualizationJob.id)\
+                .filter(VisualizationJob.map_image_path == job.map_image_path)\
+                .filter(~VisualizationJob.id.in_(old_ids))\
+                .first():
+            db.delete(job)
+            continue
+        
         # Delete associated files
         if job.map_image_path and os.path.exists(job.map_image_path):
             os.remove(job.map_image_path)
@@ -263,9 +330,14 @@ def cleanup_old_jobs(db, days: int = 7):
                 if os.path.exists(path):
                     os.remove(path)
         
+        # Delete stage checkpoints left by failed or cancelled jobs
+        clear_checkpoints(job.id)
+        
         # Delete database record
         db.delete(job)
     
+    if old_ids:
+        db.query(BatchJob).filter(BatchJob.job_id.in_(old_ids)).delete(synchronize_session=False)
     db.commit()
     return len(old_jobs)
 
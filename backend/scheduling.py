@@ -0,0 +1,137 @@
+"""
+Scheduling for visualization jobs
+Jobs are routed to a Celery queue by estimated cost (district, province or
+country sized area), carry a broker priority, and each user is limited to a
+fair share of in-flight jobs so one bulk submitter cannot starve the others.
+"""
+
+import math
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from .config import settings
+from .models import VisualizationJob
+
+QUEUE_DISTRICT = 'viz_district'
+QUEUE_PROVINCE = 'viz_province'
+QUEUE_COUNTRY = 'viz_country'
+QUEUE_CLASSES = (QUEUE_DISTRICT, QUEUE_PROVINCE, QUEUE_COUNTRY)
+
+# Broker priorities (Redis transport: 0 is served first, 9 last)
+PRIORITY_LEVELS = {'high': 0, 'normal': 3, 'low': 6}
+MAX_PRIORITY = 9
+
+KM_PER_DEGREE = 111.32
+
+
+class FairShareExceeded(Exception):
+    """Raised when a user already has their share of jobs in flight"""
+
+    def __init__(self, user_id: str, active_jobs: int, limit: int):
+        self.user_id = user_id
+        self.active_jobs = active_jobs
+        self.limit = limit
+        super().__init__(f"User {user_id} has {active_jobs} active jobs (limit {limit})")
+
+
+def _ring_area_km2(ring) -> float:
+    """Shoelace area of a lon/lat ring, scaled by the cosine of its mean latitude"""
+    if len(ring) < 3:
+        return 0.0
+    mean_lat = sum(point[1] for point in ring) / len(ring)
+    area = 0.0
+    for (x1, y1), (x2, y2) in zip(ring, ring[1:] + ring[:1]):
+        area += x1 * y2 - x2 * y1
+    return abs(area) / 2 * KM_PER_DEGREE ** 2 * math.cos(math.radians(mean_lat))
+
+
+def _polygon_area_km2(rings) -> float:
+    """Outer ring minus holes"""
+    if not rings:
+        return 0.0
+    rings = [[tuple(point[:2]) for point in ring] for ring in rings]
+    return max(_ring_area_km2(rings[0]) - sum(_ring_area_km2(hole) for hole in rings[1:]), 0.0)
+
+
+def geometry_area_km2(geometry: Optional[Dict]) -> float:
+    """Approximate area of a GeoJSON geometry, Feature or FeatureCollection in km²"""
+    if not geometry:
+        return 0.0
+    geometry_type = geometry.get('type')
+    if geometry_type == 'Feature':
+        return geometry_area_km2(geometry.get('geometry'))
+    if geometry_type == 'FeatureCollection':
+        return sum(geometry_area_km2(feature) for feature in geometry.get('features', []))
+    if geometry_type == 'GeometryCollection':
+        return sum(geometry_area_km2(part) for part in geometry.get('geometries', []))
+    if geometry_type == 'Polygon':
+        return _polygon_area_km2(geometry.get('coordinates', []))
+    if geometry_type == 'MultiPolygon':
+        return sum(_polygon_area_km2(polygon) for polygon in geometry.get('coordinates', []))
+    return 0.0
+
+
+def estimate_queue_class(geometry: Optional[Dict]) -> str:
+    """Cost class from the region area; processing cost grows with the pixels covered"""
+    area = geometry_area_km2(geometry)
+    if area <= settings.DISTRICT_MAX_AREA_KM2:
+        return QUEUE_DISTRICT
+    if area <= settings.PROVINCE_MAX_AREA_KM2:
+        return QUEUE_PROVINCE
+    return QUEUE_COUNTRY
+
+
+def count_active_jobs(db: Session, user_id: str) -> int:
+    """Pending and running jobs owned by user_id; a batch counts as one job"""
+    return db.query(func.count(func.distinct(func.coalesce(VisualizationJob.batch_id, VisualizationJob.id))))\
+        .filter(VisualizationJob.user_id == user_id)\
+        .filter(VisualizationJob.status.in_(['pending', 'running']))\
+        .scalar() or 0
+
+
+def check_fair_share(db: Session, user_id: str) -> int:
+    """Active job count for user_id; raises FairShareExceeded when at the limit"""
+    active = count_active_jobs(db, user_id)
+    if active >= settings.USER_MAX_ACTIVE_JOBS:
+        raise FairShareExceeded(user_id, active, settings.USER_MAX_ACTIVE_JOBS)
+    return active
+
+
+def job_priority(requested: str, active_jobs: int) -> int:
+    """Broker priority: the requested level, lowered by one step per job the user already has in flight"""
+    return min(PRIORITY_LEVELS.get(requested, PRIORITY_LEVELS['normal']) + active_jobs, MAX_PRIORITY)
+
+
+def queue_stats(db: Session) -> Dict:
+    """Per queue class: jobs waiting, age of the oldest waiting job and mean wait of jobs started in the last hour"""
+    now = datetime.utcnow()
+    since = now - timedelta(hours=1)
+    stats = {}
+
+    for queue_class in QUEUE_CLASSES:
+        waiting = db.query(func.count(VisualizationJob.id), func.min(VisualizationJob.created_at))\
+            .filter(VisualizationJob.queue_class == queue_class)\
+            .filter(VisualizationJob.status == 'pending')\
+            .one()
+        started = db.query(VisualizationJob.created_at, VisualizationJob.started_at)\
+            .filter(VisualizationJob.queue_class == queue_class)\
+            .filter(VisualizationJob.started_at >= since)\
+            .all()
+
+        waits = [
+            (started_at.replace(tzinfo=None) - created_at.replace(tzinfo=None)).total_seconds()
+            for created_at, started_at in started if created_at and started_at
+        ]
+        oldest = waiting[1].replace(tzinfo=None) if waiting[1] else None
+
+        stats[queue_class] = {
+            'depth': waiting[0] or 0,
+            'oldest_wait_seconds': round((now - oldest).total_seconds(), 1) if oldest else 0,
+            'avg_wait_seconds': round(sum(waits) / len(waits), 1) if waits else 0,
+            'started_last_hour': len(waits)
+        }
+
+    return stats
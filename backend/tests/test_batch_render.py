@@ -0,0 +1,88 @@
+"""
+Batch map rendering from inside a daemonic Celery prefork child
+"""
+
+import logging
+import os
+
+import billiard
+import numpy as np
+import pytest
+
+EXTENT = [30.0, 31.0, -18.5, -17.5]
+
+
+def render_in_daemonic_child(queue):
+    """Stand-in for a prefork pool child running the batch task"""
+    try:
+        queue.put(render_batch_maps())
+    except Exception as e:
+        queue.put(e)
+
+
+def natural_earth_available() -> bool:
+    """Whether the base map layers can be loaded (cached by pre_cache_map_data, or downloadable)"""
+    import cartopy.feature as cfeature
+
+    try:
+        for feature in (cfeature.COASTLINE, cfeature.BORDERS, cfeature.RIVERS, cfeature.LAKES, cfeature.OCEAN):
+            list(feature.intersecting_geometries(EXTENT))
+        return True
+    except Exception:
+        return False
+
+
+def render_batch_maps():
+    # Imported here so the processor points cartopy at the configured data directory first
+    from backend.visualization import batch
+
+    if not natural_earth_available():
+        return None
+
+    warnings = []
+
+    class Recorder(logging.Handler):
+        def emit(self, record):
+            warnings.append(record.getMessage())
+
+    batch.logger.addHandler(Recorder(level=logging.WARNING))
+    rng = np.random.default_rng(0)
+    tasks = [{
+        'job_id': f'job-{i}',
+        'data': np.ma.masked_greater(rng.normal(0, 0.03, (20, 20)), 0.06),
+        'extent': EXTENT,
+        'region_name': f'Region {i}',
+        'start_date': '2024-01-01',
+        'end_date': '2024-02-01',
+        'statistics': {'mean_anomaly': 0.01, 'percentage_change': 5.0},
+        'analysis_type': 'anomaly',
+        'region_type': 'custom'
+    } for i in range(3)]
+    results = list(batch.render_all(tasks, workers=2))
+    return billiard.current_process().daemon, results, warnings
+
+
+def test_render_pool_starts_in_daemonic_worker(tmp_path, monkeypatch):
+    # Inherited by the daemonic child and the spawned render processes
+    monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / 'jobs.sqlite3'}")
+    monkeypatch.setenv('VISUALIZATION_STORAGE_PATH', str(tmp_path / 'maps'))
+
+    queue = billiard.Queue()
+    child = billiard.Process(target=render_in_daemonic_child, args=(queue,), daemon=True)
+    child.start()
+    outcome = queue.get(timeout=300)
+    child.join()
+    if isinstance(outcome, Exception):
+        raise outcome
+    if outcome is None:
+        pytest.skip("Natural Earth data not cached (run python -m backend.scripts.pre_cache_map_data) and not downloadable")
+
+    daemon, results, warnings = outcome
+    assert daemon
+    assert sorted(result['job_id'] for result in results) == ['job-0', 'job-1', 'job-2']
+    for result in results:
+        assert result['success'], result.get('error')
+        assert os.path.dirname(result['map_image_path']) == str(tmp_path / 'maps')
+        assert os.path.exists(result['map_image_path'])
+    # The pool started instead of falling back to sequential rendering
+    assert not any('Render pool unavailable' in message for message in warnings)
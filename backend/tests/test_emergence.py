@@ -0,0 +1,77 @@
+"""
+Equivalence of the single-pass slope scan with the original quadratic look-back
+"""
+
+import random
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from backend.agronomy.emergence import (
+    MAX_SLOPE_DAYS,
+    MIN_SLOPE_DELTA,
+    THRESHOLD_WHEAT_WINTER,
+    find_slope_baselines,
+)
+from backend.agronomy.series import as_index_series
+
+
+def reference_slope_baselines(series, eligible):
+    """Original nested scan: earliest qualifying baseline among the previous MAX_SLOPE_DAYS points"""
+    values = series.values.tolist()
+    ordinals = series.ordinals.tolist()
+    baselines = np.full(len(values), -1, dtype=np.int64)
+
+    for i in range(len(values)):
+        if not eligible[i]:
+            continue
+        for j in range(max(0, i - MAX_SLOPE_DAYS), i):
+            if values[j] >= THRESHOLD_WHEAT_WINTER:
+                continue
+            days_diff = ordinals[i] - ordinals[j]
+            if days_diff <= MAX_SLOPE_DAYS and days_diff > 0:
+                if values[i] - values[j] >= MIN_SLOPE_DELTA:
+                    baselines[i] = j
+                    break
+
+    return baselines
+
+
+def generate_points(rng, count, max_gap):
+    """Random NDVI readings around the wheat threshold; a gap of 0 repeats the day"""
+    day = date(2024, 4, 1)
+    points = []
+    for _ in range(count):
+        day += timedelta(days=rng.randint(0, max_gap))
+        points.append({
+            'date': day.strftime('%Y-%m-%d'),
+            'ndvi': round(rng.uniform(0.05, 0.3), 3),
+            'cloud_percentage': 0
+        })
+    return points
+
+
+@pytest.mark.parametrize("max_gap", [0, 1, 3, 6, 15])
+def test_slope_scan_matches_quadratic_reference(max_gap):
+    rng = random.Random(max_gap)
+    for _ in range(200):
+        series = as_index_series(generate_points(rng, rng.randint(1, 60), max_gap))
+        eligible = np.array([rng.random() < 0.8 for _ in range(len(series))])
+
+        baselines = find_slope_baselines(series, eligible)
+        expected = reference_slope_baselines(series, eligible)
+
+        # Same candidates; the linear scan may pick a lower baseline than the earliest one
+        np.testing.assert_array_equal(baselines >= 0, expected >= 0)
+        for i in np.flatnonzero(baselines >= 0):
+            j = baselines[i]
+            assert i - MAX_SLOPE_DAYS <= j < i
+            assert 0 < series.ordinals[i] - series.ordinals[j] <= MAX_SLOPE_DAYS
+            assert series.values[j] < THRESHOLD_WHEAT_WINTER
+            assert series.values[i] - series.values[j] >= MIN_SLOPE_DELTA
+
+
+def test_slope_scan_empty_series():
+    series = as_index_series([])
+    assert len(find_slope_baselines(series, np.zeros(0, dtype=bool))) == 0
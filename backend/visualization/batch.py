@@ -0,0 +1,289 @@
+"""
+Batch processor for multi-region visualization jobs
+All regions in a batch share one set of current and baseline composites.
+Statistics come from reduceRegions over a FeatureCollection of the regions,
+the result raster is downloaded once and cropped per region, and the maps are
+rendered on a billiard process pool (sequentially when a pool cannot be started).
+billiard is Celery's multiprocessing fork: unlike multiprocessing it may start
+children from the daemonic prefork worker processes the batch task runs in.
+"""
+
+import logging
+import time
+from typing import Callable, Dict, Iterator, List, Tuple
+
+import billiard
+import ee
+import numpy as np
+
+from ..config import settings
+from ..instrumentation import stage
+from .processor import GEE_AUTH_ERRORS, VisualizationProcessor
+
+logger = logging.getLogger(__name__)
+
+# Reduction scales matching the single-job statistics
+MOISTURE_SCALE = 15000
+SURFACE_SCALE = 5000
+
+# Render-only processor for this process (no Earth Engine session)
+_renderer = None
+
+
+def _coordinates(value) -> Iterator[Tuple[float, float]]:
+    """All (lon, lat) positions in a GeoJSON coordinates array"""
+    if value and isinstance(value[0], (int, float)):
+        yield value[0], value[1]
+        return
+    for item in value or []:
+        yield from _coordinates(item)
+
+
+def geojson_bounds(geometry: Dict, padding: float = 0.05) -> List[float]:
+    """[min_lon, max_lon, min_lat, max_lat] of a GeoJSON geometry with the same padding as single jobs"""
+    if geometry.get('type') == 'GeometryCollection':
+        points = [point for part in geometry.get('geometries', []) for point in _coordinates(part.get('coordinates'))]
+    else:
+        points = list(_coordinates(geometry.get('coordinates')))
+    lons = [lon for lon, _ in points]
+    lats = [lat for _, lat in points]
+    lon_pad = (max(lons) - min(lons)) * padding
+    lat_pad = (max(lats) - min(lats)) * padding
+    return [min(lons) - lon_pad, max(lons) + lon_pad, min(lats) - lat_pad, max(lats) + lat_pad]
+
+
+def union_extent(extents: List[List[float]]) -> List[float]:
+    return [
+        min(e[0] for e in extents), max(e[1] for e in extents),
+        min(e[2] for e in extents), max(e[3] for e in extents)
+    ]
+
+
+def crop_to_region(data: np.ma.MaskedArray, transform, extent: List[float], geometry: Dict) -> Tuple:
+    """
+    Window of the shared raster covering extent, masked outside the region
+    geometry. Returns (masked array, pixel-aligned extent of the window).
+    """
+    from rasterio.features import geometry_mask
+    from rasterio.windows import Window, bounds as window_bounds, from_bounds, transform as window_transform
+
+    window = from_bounds(extent[0], extent[2], extent[1], extent[3], transform)
+    window = window.round_offsets(op='floor').round_lengths(op='ceil')
+    window = window.intersection(Window(0, 0, data.shape[1], data.shape[0]))
+
+    rows, cols = window.toslices()
+    subset = data[rows, cols]
+    outside = geometry_mask([geometry], out_shape=subset.shape, transform=window_transform(window, transform))
+    cropped = np.ma.array(np.ma.getdata(subset), mask=np.ma.getmaskarray(subset) | outside)
+
+    left, bottom, right, top = window_bounds(window, transform)
+    return cropped, [left, right, bottom, top]
+
+
+def render_region(task: Dict) -> Dict:
+    """Render and save one region's map; runs in the render pool or inline"""
+    global _renderer
+    try:
+        if _renderer is None:
+            _renderer = VisualizationProcessor(initialize_gee=False)
+
+        map_result = _renderer.generate_cartography(
+            task['data'], task['extent'], task['region_name'],
+            task['start_date'], task['end_date'], task['statistics'],
+            task['analysis_type'], task['region_type']
+        )
+        if not map_result['success']:
+            return {'job_id': task['job_id'], 'success': False, 'error': map_result['error']}
+
+        output_paths = _renderer.save_outputs(
+            task['job_id'], map_result, {'statistics': task['statistics'], 'extent': task['extent']}
+        )
+        return {
+            'job_id': task['job_id'],
+            'success': True,
+            'map_image_path': output_paths['map_image'],
+            'export_paths': output_paths
+        }
+    except Exception as e:
+        return {'job_id': task['job_id'], 'success': False, 'error': str(e)}
+
+
+def render_all(tasks: List[Dict], workers: int) -> Iterator[Dict]:
+    """Yield render results as they finish, falling back to inline rendering if the pool fails"""
+    done = set()
+
+    if workers > 1 and len(tasks) > 1:
+        try:
+            pool = billiard.get_context('spawn').Pool(processes=min(workers, len(tasks)))
+            try:
+                for result in pool.imap_unordered(render_region, tasks):
+                    done.add(result['job_id'])
+                    yield result
+                pool.close()
+            finally:
+                pool.terminate()
+                pool.join()
+            return
+        except Exception as e:
+            logger.warning(f"⚠️ Render pool unavailable ({e}), rendering remaining regions sequentially")
+
+    for task in tasks:
+        if task['job_id'] not in done:
+            yield render_region(task)
+
+
+def process_batch(processor: VisualizationProcessor, batch_id: str, regions: List[Dict], batch_data: Dict,
+                  progress_callback: Callable = None, result_callback: Callable = None) -> Dict[str, Dict]:
+    """
+    Process every region of a batch against shared composites.
+    regions: [{'job_id', 'region_name', 'region_type', 'geometry'}].
+    result_callback(job_id, result) is called as each region finishes; results
+    have the same shape as VisualizationProcessor.process_job. Errors that
+    affect the whole batch (Earth Engine, download) are raised.
+    """
+    start_date = batch_data['start_date']
+    end_date = batch_data['end_date']
+    analysis_type = batch_data['analysis_type']
+    results = {}
+
+    def finish(job_id: str, result: Dict):
+        results[job_id] = result
+        if result_callback:
+            result_callback(job_id, result)
+
+    try:
+        if not processor.ensure_gee():
+            raise Exception("Google Earth Engine not initialized")
+
+        logger.info(f"🚀 Starting batch {batch_id} with {len(regions)} regions")
+        started = time.monotonic()
+
+        extents = {region['job_id']: geojson_bounds(region['geometry']) for region in regions}
+        shared_extent = union_extent(list(extents.values()))
+        area = ee.Geometry.Rectangle([shared_extent[0], shared_extent[2], shared_extent[1], shared_extent[3]])
+        collection = ee.FeatureCollection([
+            ee.Feature(ee.Geometry(region['geometry']), {'job_id': region['job_id']}) for region in regions
+        ])
+
+        # 1. Shared composites over the union of all regions
+        with stage('gee_composites'):
+            composites = processor.build_composites(
+                area, start_date, end_date, analysis_type,
+                batch_data.get('baseline_type', 'same-period'),
+                batch_data.get('baseline_config'),
+                progress_callback
+            )
+        anomaly = composites['result']
+
+        if progress_callback:
+            progress_callback(55, "Calculating statistics for all regions...")
+
+        # 2. Per-region statistics with reduceRegions, fetched in one round trip
+        moisture = ee.Image.cat([
+            anomaly.select([0]).rename('anomaly'),
+            composites['current'].select([0]).rename('current'),
+            composites['baseline'].select([0]).rename('baseline')
+        ]).reduceRegions(
+            collection=collection,
+            reducer=ee.Reducer.mean().combine(reducer2=ee.Reducer.minMax(), sharedInputs=True),
+            scale=MOISTURE_SCALE
+        )
+        surface = ee.Image.cat([
+            composites['ndvi'].select([0]).rename('ndvi'),
+            composites['baseline_ndvi'].select([0]).rename('baseline_ndvi'),
+            composites['rainfall'].select([0]).rename('rainfall'),
+            composites['baseline_rainfall'].select([0]).rename('baseline_rainfall')
+        ]).reduceRegions(collection=collection, reducer=ee.Reducer.mean(), scale=SURFACE_SCALE)
+        risk = processor.risk_image(anomaly, composites['ndvi']).select([0]).reduceRegions(
+            collection=collection, reducer=ee.Reducer.sum().setOutputs(['risk_area']), scale=SURFACE_SCALE
+        )
+        zones = processor.zonal_stack(
+            anomaly, composites['current'], composites['baseline'], composites['ndvi'],
+            composites['rainfall'], composites['baseline_rainfall']
+        ).reduceRegions(collection=collection, reducer=processor.zonal_reducer(), scale=SURFACE_SCALE)
+
+        with stage('gee_statistics'):
+            reduced = ee.Dictionary({'moisture': moisture, 'surface': surface, 'risk': risk, 'zones': zones}).getInfo()
+        properties = {name: {} for name in reduced}
+        for name, feature_collection in reduced.items():
+            for feature in feature_collection.get('features', []):
+                props = feature.get('properties', {})
+                properties[name][props.get('job_id')] = props
+
+        statistics = {}
+        for region in regions:
+            job_id = region['job_id']
+            m = properties['moisture'].get(job_id)
+            s = properties['surface'].get(job_id)
+            if m is None or s is None:
+                finish(job_id, {'success': False, 'error': 'No statistics returned for region'})
+                continue
+            stats = processor.compose_statistics(
+                m.get('anomaly_mean', 0), m.get('anomaly_min', 0), m.get('anomaly_max', 0),
+                m.get('current_mean', 0), m.get('baseline_mean', 0),
+                s.get('ndvi', 0), s.get('baseline_ndvi', 0),
+                s.get('rainfall', 0), s.get('baseline_rainfall', 0),
+                processor.parse_zonal_groups(properties['zones'].get(job_id, {}).get('groups')),
+                (properties['risk'].get(job_id, {}).get('risk_area') or 0) / 10000
+            )
+            stats['analysis_period'] = {'start': start_date, 'end': end_date}
+            statistics[job_id] = stats
+
+        if progress_callback:
+            progress_callback(65, "Downloading shared raster...")
+
+        # 3. One raster download for the whole batch, cropped per region
+        data, transform = processor.export_image_raster(anomaly, shared_extent)
+        logger.info(f"Batch {batch_id}: statistics and raster for {len(statistics)} regions in {time.monotonic() - started:.1f}s")
+
+    except Exception as e:
+        if any(fragment in str(e).lower() for fragment in GEE_AUTH_ERRORS):
+            # Expired or revoked credentials: re-initialize on the next job
+            processor.is_initialized = False
+        raise
+
+    from .intelligence import ai_intel
+
+    tasks = []
+    crop_extents = {}
+    for region in regions:
+        job_id = region['job_id']
+        if job_id not in statistics:
+            continue
+        try:
+            region_data, region_extent = crop_to_region(data, transform, extents[job_id], region['geometry'])
+        except Exception as e:
+            finish(job_id, {'success': False, 'error': f'Failed to crop raster: {e}'})
+            continue
+        crop_extents[job_id] = region_extent
+        tasks.append({
+            'job_id': job_id,
+            'data': region_data,
+            'extent': region_extent,
+            'region_name': region['region_name'],
+            'region_type': region.get('region_type') or 'custom',
+            'start_date': start_date,
+            'end_date': end_date,
+            'analysis_type': analysis_type,
+            'statistics': statistics[job_id]
+        })
+
+    # 4. Fan rendering out per region
+    names = {region['job_id']: region['region_name'] for region in regions}
+    for rendered, result in enumerate(render_all(tasks, settings.BATCH_RENDER_WORKERS), start=1):
+        job_id = result.pop('job_id')
+        if result['success']:
+            stats = statistics[job_id]
+            result.update({
+                'statistics': stats,
+                'ai_commentary': ai_intel.template_commentary(
+                    statistics=stats, region_name=names[job_id], analysis_type=analysis_type
+                ),
+                'ai_commentary_source': 'template',
+                'extent': crop_extents[job_id]
+            })
+        finish(job_id, result)
+        if progress_callback:
+            progress_callback(70 + int(30 * rendered / max(len(tasks), 1)), f"Rendered {rendered} of {len(tasks)} maps")
+
+    return results
@@ -0,0 +1,138 @@
+"""
+Stage checkpoints for visualization jobs
+Each completed stage (GEE statistics, downloaded raster, rendered outputs,
+commentary) is persisted under {storage}/checkpoints/{job_id}/ and recorded in
+a manifest, so a retried job resumes from the first incomplete stage instead
+of re-running the Earth Engine analysis and download.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..config import settings
+
+STAGES = ('gee_statistics', 'raster', 'rendered', 'commentary')
+
+logger = logging.getLogger(__name__)
+
+
+def checkpoint_dir(job_id: str) -> str:
+    return os.path.join(settings.VISUALIZATION_STORAGE_PATH, 'checkpoints', job_id)
+
+
+def clear_checkpoints(job_id: str):
+    """Remove a job's checkpoints (after it completes or finally fails)"""
+    shutil.rmtree(checkpoint_dir(job_id), ignore_errors=True)
+
+
+class JobCheckpoints:
+    """Manifest-backed stage checkpoints for one job"""
+
+    def __init__(self, job_id: str, job_data: Dict):
+        self.job_id = job_id
+        self.directory = checkpoint_dir(job_id)
+        self.manifest_path = os.path.join(self.directory, 'manifest.json')
+        # Checkpoints written for different parameters are never reused
+        self.params_hash = hashlib.sha256(
+            json.dumps(job_data, sort_keys=True, default=str).encode('utf-8')
+        ).hexdigest()
+        self.manifest = self._load_manifest()
+
+    def _load_manifest(self) -> Dict:
+        try:
+            with open(self.manifest_path) as f:
+                manifest = json.load(f)
+            if manifest.get('params_hash') == self.params_hash:
+                return manifest
+            logger.info(f"Job {self.job_id} parameters changed, discarding checkpoints")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"⚠️ Unreadable checkpoint manifest for job {self.job_id}: {e}")
+        return {'job_id': self.job_id, 'params_hash': self.params_hash, 'stages': {}}
+
+    def _write_manifest(self):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.manifest, f, indent=2, default=str)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def mark(self, stage: str, files: List[str], data: Optional[Dict] = None):
+        """Record a stage as complete once its files are written"""
+        self.manifest['stages'][stage] = {
+            'completed_at': datetime.utcnow().isoformat(),
+            'files': files,
+            'data': data or {}
+        }
+        self._write_manifest()
+
+    def is_complete(self, stage: str) -> bool:
+        entry = self.manifest['stages'].get(stage)
+        return bool(entry) and all(os.path.exists(path) for path in entry['files'])
+
+    def first_incomplete(self) -> Optional[str]:
+        return next((stage for stage in STAGES if not self.is_complete(stage)), None)
+
+    def stage_data(self, stage: str) -> Dict:
+        return self.manifest['stages'][stage]['data']
+
+    # GEE statistics and map extent
+
+    def save_statistics(self, statistics: Dict, extent: List[float]):
+        path = self._path('statistics.json')
+        os.makedirs(self.directory, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump({'statistics': statistics, 'extent': extent}, f, default=str)
+        self.mark('gee_statistics', [path])
+
+    def load_statistics(self) -> Optional[Tuple[Dict, List[float]]]:
+        if not self.is_complete('gee_statistics'):
+            return None
+        with open(self._path('statistics.json')) as f:
+            saved = json.load(f)
+        return saved['statistics'], saved['extent']
+
+    # Downloaded raster
+
+    def save_raster(self, data: np.ndarray):
+        path = self._path('raster.npz')
+        os.makedirs(self.directory, exist_ok=True)
+        np.savez_compressed(path, data=np.ma.getdata(data), mask=np.ma.getmaskarray(data))
+        self.mark('raster', [path])
+
+    def load_raster(self) -> Optional[np.ma.MaskedArray]:
+        if not self.is_complete('raster'):
+            return None
+        with np.load(self._path('raster.npz')) as saved:
+            return np.ma.array(saved['data'], mask=saved['mask'])
+
+    # Rendered outputs (files live in the storage directory, not the checkpoint)
+
+    def save_rendered(self, output_paths: Dict):
+        self.mark('rendered', list(output_paths.values()), {'output_paths': output_paths})
+
+    def load_rendered(self) -> Optional[Dict]:
+        if not self.is_complete('rendered'):
+            return None
+        return self.stage_data('rendered')['output_paths']
+
+    # Commentary
+
+    def save_commentary(self, commentary: str, source: str):
+        self.mark('commentary', [], {'commentary': commentary, 'source': source})
+
+    def load_commentary(self) -> Optional[Dict]:
+        if not self.is_complete('commentary'):
+            return None
+        return self.stage_data('commentary')
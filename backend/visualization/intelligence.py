@@ -4,9 +4,10 @@ Generates professional commentary from geospatial statistics
 """
 
 import logging
-import requests
 from typing import Dict, Optional
 from ..config import settings
+from ..http_client import http_client
+from .narrative import build_executive_summary
 
 class AIIntelligence:
     """Service to generate AI-driven insights from GIS data"""
@@ -15,12 +16,28 @@ class AIIntelligence:
         self.api_key = settings.OPENAI_API_KEY
         self.logger = logging.getLogger(__name__)
         
-    def generate_commentary(self, statistics: Dict, region_name: str, analysis_type: str) -> str:
-        """Generates executive summary using OpenAI with enhanced statistics"""
+    def generate_commentary(self, statistics: Dict, region_name: str, analysis_type: str,
+                            budget_seconds: Optional[float] = None) -> str:
+        """Executive summary text (LLM when available in time, template otherwise)"""
+        return self.generate_commentary_result(statistics, region_name, analysis_type, budget_seconds)['commentary']
+    
+    def template_commentary(self, statistics: Dict, region_name: str, analysis_type: str) -> str:
+        """Deterministic executive summary built from the statistics"""
+        return build_executive_summary(statistics, region_name, analysis_type)
+    
+    def generate_commentary_result(self, statistics: Dict, region_name: str, analysis_type: str,
+                                   budget_seconds: Optional[float] = None) -> Dict:
+        """
+        Generates executive summary using OpenAI with enhanced statistics.
+        Falls back to the template summary when no API key is set, the call fails or
+        it exceeds the latency budget. Returns {'commentary', 'source'} with source
+        'llm' or 'template'.
+        """
         
         if not self.api_key:
-            return "AI Commentary unavailable (API Key not set). Please provide an OpenAI API Key."
-            
+            return {'commentary': self.template_commentary(statistics, region_name, analysis_type), 'source': 'template'}
+        
+        budget = settings.AI_COMMENTARY_BUDGET_SECONDS if budget_seconds is None else budget_seconds
         try:
             # Prepare the prompt with enriched data
             percentage_total = statistics.get('percentage_change', 0)
@@ -74,8 +91,8 @@ class AIIntelligence:
             7. LIMIT: Maximum 160 words. No markdown headers. One cohesive, executive paragraph.
             """
             
-            response = requests.post(
-                "https://api.openai.com/v1/chat/completions",
+            response = http_client.post(
+                f"{settings.OPENAI_BASE_URL}/chat/completions",
                 headers={
                     "Authorization": f"Bearer {self.api_key}",
                     "Content-Type": "application/json"
@@ -88,16 +105,19 @@ class AIIntelligence:
                     ],
                     "temperature": 0.7
                 },
-                timeout=25
+                timeout=budget,
+                deadline=budget
             )
             
             if response.status_code == 200:
-                return response.json()['choices'][0]['message']['content'].strip()
+                return {'commentary': response.json()['choices'][0]['message']['content'].strip(), 'source': 'llm'}
             else:
-                return f"Analysis complete. However, AI summary generation failed (Status: {response.status_code})."
+                self.logger.warning(f"AI summary generation failed (Status: {response.status_code}), using template summary")
                 
         except Exception as e:
-            return f"Analysis complete. AI Commentary generation error: {str(e)}"
+            self.logger.warning(f"AI Commentary generation error: {str(e)}, using template summary")
+        
+        return {'commentary': self.template_commentary(statistics, region_name, analysis_type), 'source': 'template'}
 
 # Global instance
 ai_intel = AIIntelligence()
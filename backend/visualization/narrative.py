@@ -0,0 +1,68 @@
+"""
+Template Executive Summary for Yieldera Visualization
+Turns the comparative statistics and zonal impact into a short executive
+paragraph without calling the LLM (used when OpenAI is slow or unavailable)
+"""
+
+from typing import Dict
+
+DROUGHT_ZONES = ('extreme_drought', 'severe_drought', 'moderate_drought')
+
+
+def describe_deviation(value: float) -> str:
+    """'12.3% below normal' / '4.0% above normal' / 'close to normal'"""
+    if value is None or abs(value) < 0.5:
+        return "close to normal"
+    return f"{abs(value):.1f}% {'below' if value < 0 else 'above'} normal"
+
+
+def summarize_zones(zonal_impact: Dict) -> Dict:
+    """Area shares of the drought zones and the largest zone"""
+    total_area = sum(zone.get('area_ha', 0) or 0 for zone in zonal_impact.values())
+    drought_area = sum((zonal_impact.get(name) or {}).get('area_ha', 0) or 0 for name in DROUGHT_ZONES)
+    dominant = max(zonal_impact.items(), key=lambda item: item[1].get('area_ha', 0) or 0, default=(None, {}))
+    return {
+        'total_area_ha': total_area,
+        'drought_area_ha': drought_area,
+        'drought_share': (drought_area / total_area * 100) if total_area > 0 else 0,
+        'dominant_zone': dominant[0] if total_area > 0 else None,
+        'dominant_share': ((dominant[1].get('area_ha', 0) or 0) / total_area * 100) if total_area > 0 else 0
+    }
+
+
+def outlook(moisture_change: float, drought_share: float) -> str:
+    """Bottom line for yield security from the moisture deviation and drought extent"""
+    if moisture_change <= -20 or drought_share >= 40:
+        return "yield security is at elevated risk, and drought-affected areas should be prioritised for monitoring and support"
+    if moisture_change <= -5 or drought_share >= 20:
+        return "conditions are drier than normal, so crop stress should be watched closely over the coming weeks"
+    if moisture_change >= 5:
+        return "moisture conditions currently support yield security across most of the region"
+    return "conditions are close to normal and present no immediate threat to yield security"
+
+
+def build_executive_summary(statistics: Dict, region_name: str, analysis_type: str = None) -> str:
+    """Executive summary paragraph in the same shape the LLM is asked for"""
+    moisture_change = statistics.get('percentage_change', 0) or 0
+    rain_change = statistics.get('rainfall_change', 0) or 0
+    ndvi_change = statistics.get('ndvi_change', 0) or 0
+    risk_area = statistics.get('multi_peril_risk_hectares', 0) or 0
+    zones = summarize_zones(statistics.get('zonal_impact', {}) or {})
+
+    sentences = [
+        f"In {region_name}, soil moisture is {describe_deviation(moisture_change)} against the historical reference, "
+        f"with rainfall {describe_deviation(rain_change)} and vegetation health (NDVI) {describe_deviation(ndvi_change)}."
+    ]
+
+    if zones['dominant_zone']:
+        sentences.append(
+            f"The largest share of the area ({zones['dominant_share']:.0f}%) falls under "
+            f"{zones['dominant_zone'].replace('_', ' ')} conditions, and {zones['drought_share']:.0f}% "
+            f"({zones['drought_area_ha']:,.0f} ha) is in moderate to extreme drought."
+        )
+    if risk_area >= 1:
+        sentences.append(f"About {risk_area:,.0f} ha combine a moisture deficit with weak vegetation and carry multi-peril risk.")
+
+    sentences.append(f"Bottom line: {outlook(moisture_change, zones['drought_share'])}.")
+    sentences.append("Map colours indicate the soil moisture anomaly against the historical baseline.")
+    return " ".join(sentences)
@@ -6,6 +6,9 @@ Handles GEE analysis and cartographic generation
 import os
 import logging
 from ..config import settings
+from ..cancellation import JobCancelled
+from ..http_client import http_client
+from ..instrumentation import stage
 
 # CRITICAL: Configure cartopy cache directory before ANY OTHER cartopy/matplotlib imports
 # This ensures that global constants in cartopy.feature use the correct path
@@ -33,17 +36,92 @@ import io
 import base64
 import tempfile
 from datetime import datetime, timedelta
-import requests
 import json
 from typing import Dict, List, Optional, Tuple, Callable
+from functools import lru_cache
+import threading
+
+# Fragments of Earth Engine error messages that mean the session must be re-initialized
+GEE_AUTH_ERRORS = ('credential', 'unauthorized', 'unauthenticated', 'invalid_grant', 'token', 'not initialized', '401')
+
+# Local administrative boundary shapefiles for the context map
+PROVINCE_SHAPEFILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'nationalProv_ZWE_1.shp')
+DISTRICT_SHAPEFILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'zim_district.shp')
+
+# Drought intensity zones derived from the anomaly thresholds
+ZONE_LABELS = {
+    1: 'extreme_drought',
+    2: 'severe_drought',
+    3: 'moderate_drought',
+    4: 'normal',
+    5: 'wet_conditions'
+}
+
+@lru_cache(maxsize=8)
+def load_shapefile(shp_path: str) -> Tuple:
+    """Geometries and (attributes, geometry) records of a shapefile, read once per process"""
+    # Set config to restore/create .shx if missing
+    os.environ['SHAPE_RESTORE_SHX'] = 'YES'
+    import cartopy.io.shapereader as shpreader
+    
+    reader = shpreader.Reader(shp_path)
+    geometries = tuple(reader.geometries())
+    records = None
+    if os.path.exists(shp_path.replace('.shp', '.dbf')):
+        records = tuple((record.attributes, record.geometry) for record in reader.records())
+    return geometries, records
+
+@lru_cache(maxsize=None)
+def load_color_scheme(analysis_type: str) -> Tuple:
+    """Colormap and norm for an analysis type, built once per process"""
+    
+    if analysis_type == 'anomaly':
+        # Enhanced drought to wet color scheme with better contrast
+        colors = [
+            '#8B0000',  # Extreme Drought (dark red)
+            '#DC143C',  # Severe Drought (crimson)
+            '#FF6347',  # Moderate Drought (tomato)
+            '#FFD700',  # Below Normal (gold)
+            '#FFFFFF',  # Normal (white)
+            '#87CEEB',  # Above Normal (sky blue)
+            '#4169E1',  # Much Above Normal (royal blue)
+            '#000080'   # Exceptional (navy)
+        ]
+        boundaries = [-0.08, -0.05, -0.03, -0.01, 0.01, 0.03, 0.05, 0.08]
+        
+    elif analysis_type == 'percentage':
+        # Percentage change color scheme
+        colors = ['#8B0000', '#FF6347', '#FFD700', '#FFFFFF', '#87CEEB', '#4169E1', '#000080']
+        boundaries = [-50, -25, -10, 0, 10, 25, 50]
+        
+    else:  # absolute
+        # Absolute moisture color scheme
+        colors = ['#8B4513', '#CD853F', '#F4A460', '#F5DEB3', '#E0FFFF', '#B0E0E6', '#4682B4']
+        boundaries = [0.1, 0.15, 0.2, 0.25, 0.3, 0.35, 0.4]
+    
+    cmap = ListedColormap(colors)
+    norm = BoundaryNorm(boundaries, cmap.N)
+    
+    return cmap, norm
 
 class VisualizationProcessor:
     """Main processor for GEE analysis and cartographic generation"""
     
-    def __init__(self):
+    def __init__(self, initialize_gee: bool = True):
         self.logger = logging.getLogger(__name__)
         self.is_initialized = False
-        self.initialize_gee()
+        self.gee_lock = threading.Lock()
+        # Render-only instances (batch render pool) skip the Earth Engine session
+        if initialize_gee:
+            self.initialize_gee()
+    
+    def ensure_gee(self) -> bool:
+        """Initialize Earth Engine if this process has no valid session (first use or after an auth error)"""
+        if not self.is_initialized:
+            with self.gee_lock:
+                if not self.is_initialized:
+                    self.initialize_gee()
+        return self.is_initialized
     
     def initialize_gee(self):
         """Initialize Google Earth Engine"""
@@ -66,15 +144,20 @@ class VisualizationProcessor:
             self.is_initialized = False
     
     def process_job(self, job_id: str, job_data: Dict, progress_callback: Callable = None) -> Dict:
-        """Main entry point for processing visualization jobs"""
+        """
+        Main entry point for processing visualization jobs.
+        Completed stages are checkpointed, so a retry resumes from the first incomplete stage.
+        """
         
         try:
-            if not self.is_initialized:
-                raise Exception("Google Earth Engine not initialized")
+            from .checkpoints import JobCheckpoints
+            checkpoints = JobCheckpoints(job_id, job_data)
+            resume_stage = checkpoints.first_incomplete()
+            if resume_stage != 'gee_statistics':
+                self.logger.info(f"♻️ Resuming job {job_id} from stage: {resume_stage or 'all stages complete'}")
             
             # Extract parameters
             region_name = job_data['region_name']
-            geometry = job_data['geometry']
             start_date = job_data['start_date']
             end_date = job_data['end_date']
             analysis_type = job_data['analysis_type']
@@ -82,67 +165,66 @@ class VisualizationProcessor:
             
             self.logger.info(f"🚀 Starting visualization job {job_id} for {region_name} ({region_type})")
             
-            # Update progress
-            if progress_callback:
-                progress_callback(10, "Converting geometry and loading data...")
-            
-            # If it's a country, try to use official LSIB boundaries for strict masking
-            ee_geometry = ee.Geometry(geometry)
-            if region_type == 'country':
-                try:
-                    # Search specifically for the country in official administrative boundaries
-                    # Filter by country name to get the precise polygon
-                    clean_name = region_name.replace("(Complete Country)", "").strip()
-                    lsib = ee.FeatureCollection('USDOS/LSIB_SIMPLE/2017')
-                    country_feature = lsib.filter(ee.Filter.eq('country_na', clean_name)).first()
-                    
-                    if country_feature.geometry():
-                         ee_geometry = country_feature.geometry()
-                         self.logger.info(f"📍 Using precise administrative boundaries for {clean_name}")
-                except Exception as e:
-                    self.logger.warning(f"⚠️ Could not fetch precise boundaries for {region_name}: {e}. Falling back to provided geometry.")
-
-            # Run GEE analysis
-            gee_result = self.run_gee_analysis(
-                ee_geometry, start_date, end_date, analysis_type, 
-                job_data.get('baseline_type', 'same-period'),
-                job_data.get('baseline_config'),
-                progress_callback,
-                region_type  # Pass region_type for dynamic scaling
-            )
+            # Statistics and raster from an earlier attempt: no Earth Engine work needed
+            saved_statistics = checkpoints.load_statistics()
+            saved_raster = checkpoints.load_raster()
+            if saved_statistics and saved_raster is not None:
+                gee_result = {
+                    'success': True,
+                    'data': saved_raster,
+                    'extent': saved_statistics[1],
+                    'statistics': saved_statistics[0]
+                }
+            else:
+                gee_result = self.run_job_analysis(job_data, progress_callback, checkpoints)
             
             if not gee_result['success']:
                 raise Exception(gee_result['error'])
             
-            # Update progress
-            if progress_callback:
-                progress_callback(70, "Generating professional cartography...")
-            
-            # Generate cartographic visualization
-            map_result = self.generate_cartography(
-                gee_result['data'], 
-                gee_result['extent'],
-                region_name,
-                start_date,
-                end_date,
-                gee_result['statistics'],
-                analysis_type,
-                region_type  # Pass region type for inset map logic
-            )
-            
-            # Save files
-            output_paths = self.save_outputs(job_id, map_result, gee_result)
-            
-            # Generate AI Commentary (Executive Summary)
-            if progress_callback:
-                progress_callback(85, "Generating AI Executive Summary...")
-            
-            from .intelligence import ai_intel
-            ai_commentary = ai_intel.generate_commentary(
-                statistics=gee_result['statistics'],
-                region_name=region_name,
-                analysis_type=analysis_type
-            )
+            output_paths = checkpoints.load_rendered()
+            if output_paths is None:
+                # Update progress
+                if progress_callback:
+                    progress_callback(70, "Generating professional cartography...")
+                
+                # Generate cartographic visualization
+                with stage('render') as record:
+                    map_result = self.generate_cartography(
+                        gee_result['data'], 
+                        gee_result['extent'],
+                        region_name,
+                        start_date,
+                        end_date,
+                        gee_result['statistics'],
+                        analysis_type,
+                        region_type  # Pass region type for inset map logic
+                    )
+                    if map_result['success']:
+                        record.add_bytes(map_result['image_buffer'].getbuffer().nbytes)
+                if not map_result['success']:
+                    raise Exception(map_result['error'])
+                
+                # Save files
+                with stage('save') as record:
+                    output_paths = self.save_outputs(job_id, map_result, gee_result)
+                    record.add_bytes(sum(os.path.getsize(path) for path in output_paths.values()))
+                checkpoints.save_rendered(output_paths)
+            
+            # Template Executive Summary so the map is usable immediately; the AI
+            # commentary runs as a follow-up task and replaces it when it arrives
+            commentary = checkpoints.load_commentary()
+            if commentary is None:
+                from .intelligence import ai_intel
+                with stage('commentary'):
+                    commentary = {
+                        'commentary': ai_intel.template_commentary(
+                            statistics=gee_result['statistics'],
+                            region_name=region_name,
+                            analysis_type=analysis_type
+                        ),
+                        'source': 'template'
+                    }
+                checkpoints.save_commentary(commentary['commentary'], commentary['source'])
             
             # Update progress
             if progress_callback:
@@ -151,107 +233,113 @@ class VisualizationProcessor:
             return {
                 'success': True,
                 'statistics': gee_result['statistics'],
-                'ai_commentary': ai_commentary,
+                'ai_commentary': commentary['commentary'],
+                'ai_commentary_source': commentary['source'],
                 'map_image_path': output_paths['map_image'],
                 'export_paths': output_paths,
                 'extent': gee_result['extent']
             }
         
+        except JobCancelled:
+            self.logger.info(f"🛑 Job {job_id} cancelled, stopping at stage boundary")
+            raise
         except Exception as e:
             self.logger.error(f"❌ Job {job_id} failed: {str(e)}")
+            if any(fragment in str(e).lower() for fragment in GEE_AUTH_ERRORS):
+                # Expired or revoked credentials: re-initialize on the next job
+                self.is_initialized = False
             return {'success': False, 'error': str(e)}
     
+    def run_job_analysis(self, job_data: Dict, progress_callback: Callable = None, checkpoints=None) -> Dict:
+        """Earth Engine part of a job: region geometry, statistics and raster download"""
+        
+        if not self.ensure_gee():
+            raise Exception("Google Earth Engine not initialized")
+        
+        region_name = job_data['region_name']
+        region_type = job_data.get('region_type', 'custom')
+        
+        # Update progress
+        if progress_callback:
+            progress_callback(10, "Converting geometry and loading data...")
+        
+        with stage('geometry'):
+            # If it's a country, try to use official LSIB boundaries for strict masking
+            ee_geometry = ee.Geometry(job_data['geometry'])
+            if region_type == 'country':
+                try:
+                    # Search specifically for the country in official administrative boundaries
+                    # Filter by country name to get the precise polygon
+                    clean_name = region_name.replace("(Complete Country)", "").strip()
+                    lsib = ee.FeatureCollection('USDOS/LSIB_SIMPLE/2017')
+                    country_feature = lsib.filter(ee.Filter.eq('country_na', clean_name)).first()
+                    
+                    if country_feature.geometry():
+                         ee_geometry = country_feature.geometry()
+                         self.logger.info(f"📍 Using precise administrative boundaries for {clean_name}")
+                except Exception as e:
+                    self.logger.warning(f"⚠️ Could not fetch precise boundaries for {region_name}: {e}. Falling back to provided geometry.")
+
+        # Run GEE analysis
+        return self.run_gee_analysis(
+            ee_geometry, job_data['start_date'], job_data['end_date'], job_data['analysis_type'], 
+            job_data.get('baseline_type', 'same-period'),
+            job_data.get('baseline_config'),
+            progress_callback,
+            region_type,  # Pass region_type for dynamic scaling
+            checkpoints
+        )
+    
     def run_gee_analysis(self, geometry: ee.Geometry, start_date: str, end_date: str, 
                         analysis_type: str, baseline_type: str = 'same-period',
                         baseline_config: Dict = None, progress_callback: Callable = None,
-                        region_type: str = 'country') -> Dict:
-        """Execute GEE analysis for soil moisture anomaly with dynamic baselines"""
+                        region_type: str = 'country', checkpoints=None) -> Dict:
+        """
+        Execute GEE analysis for soil moisture anomaly with dynamic baselines.
+        With checkpoints, saved statistics are reused and new statistics and
+        the downloaded raster are persisted as they complete.
+        """
         
         try:
-            if progress_callback:
-                progress_callback(15, "Loading ERA5-Land satellite data...")
+            saved_statistics = checkpoints.load_statistics() if checkpoints else None
             
-            # Load ERA5-Land data
-            era5_land = ee.ImageCollection('ECMWF/ERA5_LAND/DAILY_AGGR') \
-                         .select(['volumetric_soil_water_layer_1']) \
-                         .filterBounds(geometry)
-            
-            self.logger.info(f"ERA5-Land collection size: {era5_land.size().getInfo()}")
-            
-            if progress_callback:
-                progress_callback(25, "Processing current period data...")
-            
-            # Current period analysis
-            current_period = era5_land \
-                .filterDate(start_date, end_date) \
-                .mean() \
-                .clip(geometry)
-            
-            if progress_callback:
-                progress_callback(35, "Calculating historical baseline...")
-            
-            # Historical baseline calculation
-            baseline = self.calculate_baseline(era5_land, start_date, end_date, geometry, baseline_type, baseline_config)
-            
-            if progress_callback:
-                progress_callback(40, "Loading MODIS Vegetation Health (NDVI)...")
-            
-            # Load MODIS NDVI (MOD13Q1.061)
-            # MODIS NDVI is a 16-day composite, scale factor 0.0001
-            modis_coll = ee.ImageCollection("MODIS/061/MOD13Q1").filterBounds(geometry)
-            
-            modis_v61 = modis_coll \
-                          .filterDate(start_date, end_date) \
-                          .select('NDVI') \
-                          .mean() \
-                          .multiply(0.0001) \
-                          .clip(geometry)
-            
-            # Historical NDVI baseline
-            baseline_ndvi = self.calculate_ndvi_baseline(modis_coll, start_date, end_date, geometry, baseline_type, baseline_config)
-
-            if progress_callback:
-                progress_callback(42, "Loading CHIRPS Precipitation data...")
-
-            # Load CHIRPS Rainfall data
-            chirps = ee.ImageCollection("UCSB-CHG/CHIRPS/DAILY") \
-                       .select('precipitation') \
-                       .filterBounds(geometry)
-            
-            # Total rainfall for current period
-            current_rainfall = chirps.filterDate(start_date, end_date).sum().clip(geometry)
-            
-            # Historical rainfall for context (synchronized baseline)
-            baseline_rainfall = self.calculate_rainfall_baseline(chirps, start_date, end_date, geometry, baseline_type, baseline_config)
-            
-            if progress_callback:
-                progress_callback(45, "Computing anomalies & multi-peril correlation...")
+            with stage('gee_composites'):
+                composites = self.build_composites(
+                    geometry, start_date, end_date, analysis_type,
+                    baseline_type, baseline_config, progress_callback
+                )
+            current_period = composites['current']
+            baseline = composites['baseline']
+            result_image = composites['result']
+            modis_v61 = composites['ndvi']
             
-            # Calculate Soil Moisture anomalies
-            if analysis_type == 'percentage':
-                result_image = current_period.subtract(baseline).divide(baseline).multiply(100)
-            elif analysis_type == 'absolute':
-                result_image = current_period
+            if saved_statistics:
+                statistics, extent = saved_statistics
             else:
-                result_image = current_period.subtract(baseline)  # Default to anomaly
-            
-            if progress_callback:
-                progress_callback(55, "Calculating statistics & Zonal Area...")
-            
-            # Calculate comprehensive statistics and ZONAL AREA
-            statistics = self.calculate_advanced_statistics(
-                current_period, baseline, result_image, modis_v61, baseline_ndvi, current_rainfall, baseline_rainfall, geometry
-            )
-            
-            # Capture period context for the report
-            statistics['analysis_period'] = {'start': start_date, 'end': end_date}
+                if progress_callback:
+                    progress_callback(55, "Calculating statistics & Zonal Area...")
+                
+                with stage('gee_statistics'):
+                    # Calculate comprehensive statistics and ZONAL AREA
+                    statistics = self.calculate_advanced_statistics(
+                        current_period, baseline, result_image, modis_v61, composites['baseline_ndvi'],
+                        composites['rainfall'], composites['baseline_rainfall'], geometry
+                    )
+                    
+                    # Capture period context for the report
+                    statistics['analysis_period'] = {'start': start_date, 'end': end_date}
+                    
+                    extent = self.get_geometry_bounds(geometry)
+                if checkpoints:
+                    checkpoints.save_statistics(statistics, extent)
             
             if progress_callback:
                 progress_callback(65, "Preparing visualization data...")
             
             # Get data for visualization
-            extent = self.get_geometry_bounds(geometry)
             data_array = self.export_image_data(result_image, extent)
+            if checkpoints:
+                checkpoints.save_raster(data_array)
             
             return {
                 'success': True,
@@ -264,10 +352,94 @@ class VisualizationProcessor:
                 'ndvi_image': modis_v61
             }
             
+        except JobCancelled:
+            raise
         except Exception as e:
             self.logger.error(f"❌ GEE analysis failed: {str(e)}")
             return {'success': False, 'error': str(e)}
-            
+    
+    def build_composites(self, geometry: ee.Geometry, start_date: str, end_date: str,
+                         analysis_type: str, baseline_type: str = 'same-period',
+                         baseline_config: Dict = None, progress_callback: Callable = None) -> Dict:
+        """Current and baseline ERA5-Land, MODIS NDVI and CHIRPS composites plus the result image"""
+        
+        if progress_callback:
+            progress_callback(15, "Loading ERA5-Land satellite data...")
+        
+        # Load ERA5-Land data
+        era5_land = ee.ImageCollection('ECMWF/ERA5_LAND/DAILY_AGGR') \
+                     .select(['volumetric_soil_water_layer_1']) \
+                     .filterBounds(geometry)
+        
+        self.logger.info(f"ERA5-Land collection size: {era5_land.size().getInfo()}")
+        
+        if progress_callback:
+            progress_callback(25, "Processing current period data...")
+        
+        # Current period analysis
+        current_period = era5_land \
+            .filterDate(start_date, end_date) \
+            .mean() \
+            .clip(geometry)
+        
+        if progress_callback:
+            progress_callback(35, "Calculating historical baseline...")
+        
+        # Historical baseline calculation
+        baseline = self.calculate_baseline(era5_land, start_date, end_date, geometry, baseline_type, baseline_config)
+        
+        if progress_callback:
+            progress_callback(40, "Loading MODIS Vegetation Health (NDVI)...")
+        
+        # Load MODIS NDVI (MOD13Q1.061)
+        # MODIS NDVI is a 16-day composite, scale factor 0.0001
+        modis_coll = ee.ImageCollection("MODIS/061/MOD13Q1").filterBounds(geometry)
+        
+        modis_v61 = modis_coll \
+                      .filterDate(start_date, end_date) \
+                      .select('NDVI') \
+                      .mean() \
+                      .multiply(0.0001) \
+                      .clip(geometry)
+        
+        # Historical NDVI baseline
+        baseline_ndvi = self.calculate_ndvi_baseline(modis_coll, start_date, end_date, geometry, baseline_type, baseline_config)
+
+        if progress_callback:
+            progress_callback(42, "Loading CHIRPS Precipitation data...")
+
+        # Load CHIRPS Rainfall data
+        chirps = ee.ImageCollection("UCSB-CHG/CHIRPS/DAILY") \
+                   .select('precipitation') \
+                   .filterBounds(geometry)
+        
+        # Total rainfall for current period
+        current_rainfall = chirps.filterDate(start_date, end_date).sum().clip(geometry)
+        
+        # Historical rainfall for context (synchronized baseline)
+        baseline_rainfall = self.calculate_rainfall_baseline(chirps, start_date, end_date, geometry, baseline_type, baseline_config)
+        
+        if progress_callback:
+            progress_callback(45, "Computing anomalies & multi-peril correlation...")
+        
+        # Calculate Soil Moisture anomalies
+        if analysis_type == 'percentage':
+            result_image = current_period.subtract(baseline).divide(baseline).multiply(100)
+        elif analysis_type == 'absolute':
+            result_image = current_period
+        else:
+            result_image = current_period.subtract(baseline)  # Default to anomaly
+        
+        return {
+            'current': current_period,
+            'baseline': baseline,
+            'ndvi': modis_v61,
+            'baseline_ndvi': baseline_ndvi,
+            'rainfall': current_rainfall,
+            'baseline_rainfall': baseline_rainfall,
+            'result': result_image
+        }
+
     def calculate_baseline(self, collection: ee.ImageCollection, start_date: str, 
                           end_date: str, geometry: ee.Geometry, 
                           baseline_type: str = 'same-period', baseline_config: Dict = None) -> ee.Image:
@@ -355,25 +527,48 @@ class VisualizationProcessor:
             anomaly, current, baseline, ndvi, rainfall, baseline_rain, geometry
         )
         
-        # 5. Total Area calculation (for percentages)
-        total_area_ha = sum(z['area_ha'] for z in zonal_impact.values())
-        for zone in zonal_impact.values():
-            zone['percentage'] = (zone['area_ha'] / total_area_ha * 100) if total_area_ha > 0 else 0
-        
-        # 6. Multi-Peril Collision Correlation
-        # Identify "High Risk" zones: where Soil Moisture Anomaly < -0.03 AND NDVI < 0.4
-        risk_zones = anomaly.lt(-0.03).And(ndvi.lt(0.4))
-        risk_area = risk_zones.multiply(ee.Image.pixelArea()).reduceRegion(
+        # 5. Multi-Peril Collision Correlation
+        risk_area = self.risk_image(anomaly, ndvi).reduceRegion(
             reducer=ee.Reducer.sum(),
             geometry=geometry,
             scale=5000,
             maxPixels=1e9
         ).getInfo().get('volumetric_soil_water_layer_1', 0) / 10000 
         
+        return self.compose_statistics(
+            anomaly_stats.get('volumetric_soil_water_layer_1_mean', 0),
+            anomaly_stats.get('volumetric_soil_water_layer_1_min', 0),
+            anomaly_stats.get('volumetric_soil_water_layer_1_max', 0),
+            current_mean, baseline_mean, ndvi_current, baseline_ndvi,
+            rain_total, baseline_rain_total, zonal_impact, risk_area
+        )
+    
+    def risk_image(self, anomaly: ee.Image, ndvi: ee.Image) -> ee.Image:
+        """Pixel area of "High Risk" zones: Soil Moisture Anomaly < -0.03 AND NDVI < 0.4"""
+        return anomaly.lt(-0.03).And(ndvi.lt(0.4)).multiply(ee.Image.pixelArea())
+    
+    def compose_statistics(self, mean_anomaly: float, min_anomaly: float, max_anomaly: float,
+                           current_mean: float, baseline_mean: float,
+                           ndvi_current: float, baseline_ndvi: float,
+                           rain_total: float, baseline_rain_total: float,
+                           zonal_impact: Dict, risk_area: float) -> Dict:
+        """Statistics dictionary from the reduced values, with zone shares and relative changes"""
+        current_mean = current_mean or 0
+        baseline_mean = baseline_mean or 0
+        ndvi_current = ndvi_current or 0
+        baseline_ndvi = baseline_ndvi or 0
+        rain_total = rain_total or 0
+        baseline_rain_total = baseline_rain_total or 0
+        
+        # Total Area calculation (for percentages)
+        total_area_ha = sum(z['area_ha'] for z in zonal_impact.values())
+        for zone in zonal_impact.values():
+            zone['percentage'] = (zone['area_ha'] / total_area_ha * 100) if total_area_ha > 0 else 0
+        
         return {
-            'mean_anomaly': anomaly_stats.get('volumetric_soil_water_layer_1_mean', 0),
-            'min_anomaly': anomaly_stats.get('volumetric_soil_water_layer_1_min', 0),
-            'max_anomaly': anomaly_stats.get('volumetric_soil_water_layer_1_max', 0),
+            'mean_anomaly': mean_anomaly,
+            'min_anomaly': min_anomaly,
+            'max_anomaly': max_anomaly,
             'current_mean': current_mean,
             'baseline_mean': baseline_mean,
             'total_area_ha': total_area_ha,
@@ -394,16 +589,41 @@ class VisualizationProcessor:
                                       geometry: ee.Geometry) -> Dict[str, Dict]:
         """Calculates COMPARATIVE hectares, moisture, and rainfall for each drought intensity zone"""
         
-        # 1. Categories based on anomaly thresholds
+        stack = self.zonal_stack(
+            anomaly, current_moisture, baseline_moisture, ndvi, current_rain, baseline_rain
+        ).clip(geometry)
+        
+        try:
+            raw_stats = stack.reduceRegion(
+                reducer=self.zonal_reducer(),
+                geometry=geometry,
+                scale=5000,
+                maxPixels=1e9
+            ).get('groups')
+            
+            if raw_stats:
+                return self.parse_zonal_groups(raw_stats.getInfo())
+        
+        except Exception as e:
+            self.logger.error(f"❌ Enhanced Zonal Reduction Failed: {e}")
+            
+        return self.parse_zonal_groups([])
+    
+    def zonal_stack(self, anomaly: ee.Image, current_moisture: ee.Image,
+                    baseline_moisture: ee.Image, ndvi: ee.Image,
+                    current_rain: ee.Image, baseline_rain: ee.Image) -> ee.Image:
+        """Band stack for the grouped zonal reducer, with the drought zone as the last band"""
+        
+        # Categories based on anomaly thresholds
         zones = ee.Image(0).where(anomaly.lt(-0.05), 1) \
                           .where(anomaly.lt(-0.03).And(anomaly.gte(-0.05)), 2) \
                           .where(anomaly.lt(-0.01).And(anomaly.gte(-0.03)), 3) \
                           .where(anomaly.lt(0.01).And(anomaly.gte(-0.01)), 4) \
                           .where(anomaly.gt(0.01), 5)
         
-        # 2. Strict Band Stacking for Comparative Stats
+        # Strict Band Stacking for Comparative Stats
         # Band 0: area, Band 1: cur_moist, Band 2: bas_moist, Band 3: cur_rain, Band 4: bas_rain, Band 5: ndvi, Band 6: zone
-        stack = ee.Image.cat([
+        return ee.Image.cat([
             ee.Image.pixelArea(),
             current_moisture.select([0]),
             baseline_moisture.select([0]),
@@ -411,58 +631,38 @@ class VisualizationProcessor:
             baseline_rain.select([0]),
             ndvi.select([0]),
             zones.select([0])
-        ]).clip(geometry)
-        
-        # 3. Build Safe Grouped Reducer
-        reducer = ee.Reducer.sum().setOutputs(['sum']) \
-                   .combine(ee.Reducer.mean().setOutputs(['cur_moist']), '', False) \
-                   .combine(ee.Reducer.mean().setOutputs(['bas_moist']), '', False) \
-                   .combine(ee.Reducer.mean().setOutputs(['cur_rain']), '', False) \
-                   .combine(ee.Reducer.mean().setOutputs(['bas_rain']), '', False) \
-                   .combine(ee.Reducer.mean().setOutputs(['ndvi']), '', False) \
-                   .group(groupField=6, groupName='zone')
-        
-        # 4. Map Zone IDs to labels
-        zone_map = {
-            1: 'extreme_drought',
-            2: 'severe_drought',
-            3: 'moderate_drought',
-            4: 'normal',
-            5: 'wet_conditions'
-        }
-        
+        ])
+    
+    def zonal_reducer(self) -> ee.Reducer:
+        """Safe grouped reducer over zonal_stack: area sum and comparative means per zone"""
+        return ee.Reducer.sum().setOutputs(['sum']) \
+                 .combine(ee.Reducer.mean().setOutputs(['cur_moist']), '', False) \
+                 .combine(ee.Reducer.mean().setOutputs(['bas_moist']), '', False) \
+                 .combine(ee.Reducer.mean().setOutputs(['cur_rain']), '', False) \
+                 .combine(ee.Reducer.mean().setOutputs(['bas_rain']), '', False) \
+                 .combine(ee.Reducer.mean().setOutputs(['ndvi']), '', False) \
+                 .group(groupField=6, groupName='zone')
+    
+    def parse_zonal_groups(self, groups: List[Dict]) -> Dict[str, Dict]:
+        """Zone label -> comparative stats from the grouped reducer output"""
         impact_data = {label: {
             'area_ha': 0.0, 
             'current_moisture': 0.0, 'baseline_moisture': 0.0,
             'current_rain': 0.0, 'baseline_rain': 0.0,
             'mean_ndvi': 0.0
-        } for label in zone_map.values()}
-        
-        try:
-            # 5. Execute
-            raw_stats = stack.reduceRegion(
-                reducer=reducer,
-                geometry=geometry,
-                scale=5000,
-                maxPixels=1e9
-            ).get('groups')
-            
-            if raw_stats:
-                groups = raw_stats.getInfo()
-                for group in groups:
-                    z_id = group.get('zone')
-                    if z_id in zone_map:
-                        label = zone_map[z_id]
-                        impact_data[label]['area_ha'] = group.get('sum', 0) / 10000.0
-                        impact_data[label]['current_moisture'] = group.get('cur_moist', 0)
-                        impact_data[label]['baseline_moisture'] = group.get('bas_moist', 0)
-                        impact_data[label]['current_rain'] = group.get('cur_rain', 0)
-                        impact_data[label]['baseline_rain'] = group.get('bas_rain', 0)
-                        impact_data[label]['mean_ndvi'] = group.get('ndvi', 0)
+        } for label in ZONE_LABELS.values()}
+        
+        for group in groups or []:
+            z_id = group.get('zone')
+            if z_id in ZONE_LABELS:
+                label = ZONE_LABELS[z_id]
+                impact_data[label]['area_ha'] = group.get('sum', 0) / 10000.0
+                impact_data[label]['current_moisture'] = group.get('cur_moist', 0)
+                impact_data[label]['baseline_moisture'] = group.get('bas_moist', 0)
+                impact_data[label]['current_rain'] = group.get('cur_rain', 0)
+                impact_data[label]['baseline_rain'] = group.get('bas_rain', 0)
+                impact_data[label]['mean_ndvi'] = group.get('ndvi', 0)
         
-        except Exception as e:
-            self.logger.error(f"❌ Enhanced Zonal Reduction Failed: {e}")
-            
         return impact_data
     
     def calculate_zonal_impact(self, anomaly: ee.Image, geometry: ee.Geometry) -> Dict[str, float]:
@@ -547,6 +747,10 @@ class VisualizationProcessor:
     
     def export_image_data(self, image: ee.Image, extent: List[float]) -> np.ndarray:
         """Export EE image to NumPy array using exact bounding box extent"""
+        return self.export_image_raster(image, extent)[0]
+    
+    def export_image_raster(self, image: ee.Image, extent: List[float]) -> Tuple:
+        """Export EE image as (masked array, affine transform) for the bounding box extent"""
         
         # Convert extent [min_lon, max_lon, min_lat, max_lat] to ee.Geometry.Rectangle
         # coords: [min_lon, min_lat, max_lon, max_lat]
@@ -559,17 +763,23 @@ class VisualizationProcessor:
             'format': 'GEO_TIFF'
         })
         
-        response = requests.get(url)
-        with tempfile.NamedTemporaryFile(suffix='.tif') as tmp_file:
-            tmp_file.write(response.content)
+        # Stream the GeoTIFF to disk over the shared pooled connection
+        with stage('download') as record, \
+                http_client.get(url, stream=True, timeout=(10, 300)) as response, \
+                tempfile.NamedTemporaryFile(suffix='.tif') as tmp_file:
+            response.raise_for_status()
+            for chunk in response.iter_content(chunk_size=1024 * 1024):
+                tmp_file.write(chunk)
+                record.add_bytes(len(chunk))
             tmp_file.flush()
             
             import rasterio
             with rasterio.open(tmp_file.name) as src:
                 # Use masked=True to handle transparency for non-land areas
                 data = src.read(1, masked=True)
+                transform = src.transform
                 
-        return data
+        return data, transform
     
     def generate_cartography(self, data: np.ndarray, extent: List[float], 
                            region_name: str, start_date: str, end_date: str,
@@ -655,35 +865,7 @@ class VisualizationProcessor:
     
     def create_color_scheme(self, analysis_type: str) -> Tuple:
         """Create professional color scheme with enhanced contrast"""
-        
-        if analysis_type == 'anomaly':
-            # Enhanced drought to wet color scheme with better contrast
-            colors = [
-                '#8B0000',  # Extreme Drought (dark red)
-                '#DC143C',  # Severe Drought (crimson)
-                '#FF6347',  # Moderate Drought (tomato)
-                '#FFD700',  # Below Normal (gold)
-                '#FFFFFF',  # Normal (white)
-                '#87CEEB',  # Above Normal (sky blue)
-                '#4169E1',  # Much Above Normal (royal blue)
-                '#000080'   # Exceptional (navy)
-            ]
-            boundaries = [-0.08, -0.05, -0.03, -0.01, 0.01, 0.03, 0.05, 0.08]
-            
-        elif analysis_type == 'percentage':
-            # Percentage change color scheme
-            colors = ['#8B0000', '#FF6347', '#FFD700', '#FFFFFF', '#87CEEB', '#4169E1', '#000080']
-            boundaries = [-50, -25, -10, 0, 10, 25, 50]
-            
-        else:  # absolute
-            # Absolute moisture color scheme
-            colors = ['#8B4513', '#CD853F', '#F4A460', '#F5DEB3', '#E0FFFF', '#B0E0E6', '#4682B4']
-            boundaries = [0.1, 0.15, 0.2, 0.25, 0.3, 0.35, 0.4]
-        
-        cmap = ListedColormap(colors)
-        norm = BoundaryNorm(boundaries, cmap.N)
-        
-        return cmap, norm
+        return load_color_scheme(analysis_type)
     
     def add_base_features(self, ax):
         """Add base cartographic features"""
@@ -726,28 +908,21 @@ class VisualizationProcessor:
         """Add context by masking outside the region (clipping) and showing neighbors"""
         
         try:
-            import os
-            # Set config to restore/create .shx if missing
-            os.environ['SHAPE_RESTORE_SHX'] = 'YES'
-            
-            import cartopy.io.shapereader as shpreader
-            from shapely.geometry import box, Polygon, MultiPolygon
+            from shapely.geometry import box
             
             # Paths to local shapefiles
-            base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            prov_shp_path = os.path.join(base_dir, 'data', 'nationalProv_ZWE_1.shp')
-            dist_shp_path = os.path.join(base_dir, 'data', 'zim_district.shp')
+            prov_shp_path = PROVINCE_SHAPEFILE
+            dist_shp_path = DISTRICT_SHAPEFILE
             
             if not os.path.exists(prov_shp_path):
                 return
 
-            # Check for sidecar files
-            prov_dbf_path = prov_shp_path.replace('.shp', '.dbf')
-            has_attributes = os.path.exists(prov_dbf_path)
+            # Read shapefiles (cached per worker process)
+            zim_provinces, prov_records = load_shapefile(prov_shp_path)
+            dist_records = load_shapefile(dist_shp_path)[1] if os.path.exists(dist_shp_path) else None
             
-            # Read shapefiles
-            prov_reader = shpreader.Reader(prov_shp_path)
-            dist_reader = shpreader.Reader(dist_shp_path) if os.path.exists(dist_shp_path) else None
+            # Check for sidecar files
+            has_attributes = prov_records is not None
             
             # Clean region name
             clean_name = region_name.lower()
@@ -758,11 +933,10 @@ class VisualizationProcessor:
             # 1. FIND THE TARGET REGION GEOMETRY
             best_match_geometry = None
             best_match_score = 0
-            selected_reader = dist_reader if region_type == 'district' and dist_reader else prov_reader
+            selected_records = dist_records if region_type == 'district' and dist_records else prov_records
             
             if has_attributes:
-                for record in selected_reader.records():
-                    attrs = record.attributes
+                for attrs, record_geometry in selected_records:
                     admin_name = str(attrs.get('NAME_1', attrs.get('NAME_2', attrs.get('name', '')))).lower()
                     clean_admin = admin_name.replace(' province', '').replace(' district', '').strip()
                     
@@ -776,7 +950,7 @@ class VisualizationProcessor:
                     
                     if match_score > best_match_score:
                         best_match_score = match_score
-                        best_match_geometry = record.geometry
+                        best_match_geometry = record_geometry
             
             # 2. APPLY INVERSE MASK (Clipping Effect)
             # If we found the geometry, we mask everything OUTSIDE it
@@ -821,7 +995,6 @@ class VisualizationProcessor:
             # 3. DRAW NEIGHBOR CONTEXT
             # Draw all province boundaries faint gray on top of the mask
             # This restores context that might have been masked out
-            zim_provinces = list(prov_reader.geometries())
             ax_map.add_geometries(
                 zim_provinces,
                 ccrs.PlateCarree(),
@@ -1028,3 +1201,17 @@ class VisualizationProcessor:
         output_paths['metadata'] = metadata_path
         
         return output_paths
+
+# One processor (and Earth Engine session) per worker process
+_processor = None
+_processor_pid = None
+_processor_lock = threading.Lock()
+
+def get_processor() -> VisualizationProcessor:
+    """Process-wide VisualizationProcessor, created on first use or after a fork"""
+    global _processor, _processor_pid
+    with _processor_lock:
+        if _processor is None or _processor_pid != os.getpid():
+            _processor = VisualizationProcessor()
+            _processor_pid = os.getpid()
+        return _processor
@@ -0,0 +1,121 @@
+"""
+Memory watchdog for Celery worker processes
+matplotlib, cartopy and rasterio leave memory behind after each render. After
+every task the watchdog releases what it can, logs the task's RSS delta and
+publishes the process's leak figures to Redis for /api/metrics. Once the
+process's peak RSS (ru_maxrss, the figure Celery checks for
+worker_max_memory_per_child) exceeds WORKER_MAX_MEMORY_MB, Celery replaces the
+child process after its current task has finished, never mid-job. A single
+large render therefore recycles the process even if the memory was released.
+"""
+
+import gc
+import json
+import logging
+import os
+import resource
+import socket
+import sys
+import threading
+from typing import Dict, List, Optional
+
+import psutil
+
+from .config import settings
+from .job_events import get_redis_client
+
+WORKER_MEMORY_KEY_PREFIX = "yieldera:visualization:worker_memory:"
+# Stats of recycled or stopped processes expire after this many seconds
+WORKER_MEMORY_TTL_SECONDS = 3600
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_task_rss: Dict[str, float] = {}
+_process_stats: Dict = {}
+
+
+def rss_mb() -> float:
+    return psutil.Process(os.getpid()).memory_info().rss / (1024 * 1024)
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is the process high-water mark in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def release_memory():
+    """Close leftover matplotlib figures and run a full collection"""
+    if 'matplotlib.pyplot' in sys.modules:
+        sys.modules['matplotlib.pyplot'].close('all')
+    gc.collect()
+
+
+def task_started(task_id: str):
+    with _lock:
+        _task_rss[task_id] = rss_mb()
+        if not _process_stats:
+            _process_stats.update({
+                'worker': f"{socket.gethostname()}:{os.getpid()}",
+                'baseline_mb': round(_task_rss[task_id], 1),
+                'tasks': 0,
+                'max_task_delta_mb': 0.0
+            })
+
+
+def task_finished(task_id: str, task_name: str) -> Optional[Dict]:
+    """Release memory, log the task's RSS delta and publish this process's stats"""
+    with _lock:
+        before = _task_rss.pop(task_id, None)
+    if before is None:
+        return None
+
+    release_memory()
+    after = rss_mb()
+    delta = after - before
+    peak = peak_rss_mb()
+    limit = settings.WORKER_MAX_MEMORY_MB
+
+    with _lock:
+        _process_stats['tasks'] += 1
+        _process_stats['rss_mb'] = round(after, 1)
+        _process_stats['peak_rss_mb'] = round(peak, 1)
+        _process_stats['last_task_delta_mb'] = round(delta, 1)
+        _process_stats['max_task_delta_mb'] = round(max(_process_stats['max_task_delta_mb'], delta), 1)
+        growth = after - _process_stats['baseline_mb']
+        _process_stats['growth_mb'] = round(growth, 1)
+        _process_stats['growth_per_task_mb'] = round(growth / _process_stats['tasks'], 2)
+        _process_stats['recycle_pending'] = bool(limit) and peak > limit
+        stats = dict(_process_stats)
+
+    message = f"{task_name} RSS {before:.0f} → {after:.0f} MB ({delta:+.1f} MB), {stats['growth_mb']:+.1f} MB over {stats['tasks']} tasks"
+    if stats['recycle_pending']:
+        logger.warning(f"⚠️ {message}; peak {peak:.0f} MB is above the {limit} MB ceiling, recycling worker process after this task")
+    else:
+        logger.info(f"🧠 {message}")
+
+    publish_stats(stats)
+    return stats
+
+
+def publish_stats(stats: Dict):
+    try:
+        client = get_redis_client()
+        if client is not None:
+            client.set(f"{WORKER_MEMORY_KEY_PREFIX}{stats['worker']}", json.dumps(stats), ex=WORKER_MEMORY_TTL_SECONDS)
+    except Exception as e:
+        logger.error(f"Failed to publish worker memory stats: {e}")
+
+
+def worker_memory_stats() -> List[Dict]:
+    """Latest stats of every live worker process (this process only without Redis)"""
+    try:
+        client = get_redis_client()
+        if client is None:
+            with _lock:
+                return [dict(_process_stats)] if _process_stats.get('tasks') else []
+        keys = list(client.scan_iter(match=f"{WORKER_MEMORY_KEY_PREFIX}*"))
+        return [json.loads(value) for value in client.mget(keys) if value] if keys else []
+    except Exception as e:
+        logger.error(f"Failed to read worker memory stats: {e}")
+        return []